@@ -3,13 +3,22 @@
 # ==========================================
 
 import streamlit as st
-import qiskit
-from qiskit import QuantumCircuit
-from qiskit_aer import AerSimulator
-from qiskit.visualization import plot_histogram
-from qiskit.quantum_info import Statevector
-import matplotlib.pyplot as plt
-import numpy as np
+from quantum_sim.backends import BACKEND_NAMES, METHOD_LABELS, get_backend
+from quantum_sim.chart_panel import chart_style_toggle, show_histogram, show_lines
+from quantum_sim.communication import EXACT_MAX_QUBITS, MAX_QUBITS, iter_communication
+from quantum_sim.exact import get_exact_probabilities, probabilities_to_dict
+from quantum_sim.job_panel import start_job, track_job, wait_for_job
+from quantum_sim.lazy import lazy_import, package_version, warm_imports
+from quantum_sim.noise import MAX_ERROR_RATE, NOISY_MAX_QUBITS, NoisyBackend, noise_cache, total_variation_distance
+from quantum_sim.perf_panel import begin_rerun, finish_rerun
+from quantum_sim.qkd import DEFAULT_QKD_QUBITS, QKD_QUBIT_OPTIONS, iter_bb84, iter_key_rate_sweep
+from quantum_sim.render import render_cache, render_circuit
+from quantum_sim.resources import circuit_cache
+from quantum_sim.result_store import SeededBackend, get_result_store
+from quantum_sim.superdense import MAX_MESSAGE_BYTES, PAYLOAD_SIZES, SUPERDENSE_OPS, iter_superdense
+
+# Heavy modules load on first use so the page paints immediately
+np = lazy_import('numpy')
 
 # Configure the page
 st.set_page_config(
@@ -18,6 +27,9 @@ st.set_page_config(
     layout="wide"
 )
 
+# Time every stage of this rerun for the Performance panel
+perf = begin_rerun()
+
 # Custom CSS for modern styling
 st.markdown("""
 <style>
@@ -76,14 +88,49 @@ st.markdown("""
 # Header
 st.markdown('<div class="main-header">📡 Quantum Communication Simulator</div>', unsafe_allow_html=True)
 
-# Initialize simulator
-sim = AerSimulator()
+# Wider registers are not drawn, and their bitstrings are shortened
+MAX_DRAWN_QUBITS = 12
+MAX_LABEL_BITS = 12
+
+# Outcomes listed one metric each, most frequent first
+MAX_STATE_METRICS = 16
+
+
+def state_label(state):
+    """Bitstring for display, keeping only both ends of a wide register."""
+    if len(state) <= MAX_LABEL_BITS:
+        return state
+    return f"{state[:4]}…{state[-4:]}"
+
+
+def label_counts(counts):
+    """``counts`` keyed by :func:`state_label`, adding up outcomes that share a label."""
+    labelled = {}
+    for state, count in counts.items():
+        label = state_label(state)
+        labelled[label] = labelled.get(label, 0) + count
+    return labelled
+
 
 # Initialize session state
 if 'run_simulation' not in st.session_state:
     st.session_state.run_simulation = False
 if 'results' not in st.session_state:
     st.session_state.results = None
+if 'communication_job' not in st.session_state:
+    st.session_state.communication_job = None
+if 'run_superdense' not in st.session_state:
+    st.session_state.run_superdense = False
+if 'superdense_results' not in st.session_state:
+    st.session_state.superdense_results = None
+if 'superdense_job' not in st.session_state:
+    st.session_state.superdense_job = None
+if 'run_qkd' not in st.session_state:
+    st.session_state.run_qkd = False
+if 'qkd_results' not in st.session_state:
+    st.session_state.qkd_results = None
+if 'qkd_job' not in st.session_state:
+    st.session_state.qkd_job = None
 
 # Sidebar for configuration
 with st.sidebar:
@@ -104,15 +151,114 @@ with st.sidebar:
     
     st.markdown("---")
     st.markdown("#### Simulation Settings")
-    shots = st.slider("Number of Shots", 100, 5000, 1000, help="Number of times to run the simulation")
+    execution_mode = st.radio(
+        "Execution mode:",
+        ["sampled", "exact"],
+        format_func=lambda x: {
+            "sampled": "🎲 Sampled (simulator backend)",
+            "exact": "🎯 Exact (Statevector)"
+        }[x],
+        help="Exact mode computes the probabilities once and draws counts from them"
+    )
+    noise = None
+    if execution_mode == "sampled" and st.checkbox(
+        "🌫️ Simulate noise", help="Density-matrix simulation with gate and readout errors"
+    ):
+        backend_name = "noisy"
+        noise = (
+            st.slider("Depolarizing error per gate", 0.0, MAX_ERROR_RATE, 0.01, step=0.005, format="%.3f"),
+            st.slider("Amplitude damping per gate", 0.0, MAX_ERROR_RATE, 0.01, step=0.005, format="%.3f"),
+            st.slider("Readout error per qubit", 0.0, MAX_ERROR_RATE, 0.02, step=0.005, format="%.3f")
+        )
+    elif execution_mode == "sampled":
+        backend_name = st.selectbox(
+            "Simulator backend:",
+            BACKEND_NAMES,
+            format_func=lambda x: {
+                "auto": "⚡ Auto (NumPy for small circuits, Aer otherwise)",
+                "numpy": "🧮 NumPy state vector",
+                "aer": "🔬 Qiskit Aer"
+            }[x]
+        )
+    else:
+        backend_name = "auto"
+    backend = NoisyBackend(*noise) if noise else get_backend(backend_name)
+    seed = None
+    if st.checkbox(
+        "🔁 Seeded runs", help="The same seed draws the same shots; results are stored on disk and reused after restarts"
+    ):
+        seed = int(st.number_input("Simulation seed", min_value=0, value=42, step=1))
+        backend = SeededBackend(backend, seed, get_result_store())
+    if execution_mode == "exact":
+        max_qubits = EXACT_MAX_QUBITS
+    elif noise:
+        max_qubits = NOISY_MAX_QUBITS
+    else:
+        max_qubits = MAX_QUBITS
+    num_qubits = st.slider(
+        "Number of qubits", 2, max_qubits, 2,
+        help="More than two qubits extends the Bell pair to a GHZ state (Clifford, so it runs on the stabilizer method)"
+    )
+    max_shots = 1_000_000 if execution_mode == "exact" else 5000
+    shots = st.slider("Number of Shots", 100, max_shots, 1000, help="Number of times to run the simulation")
+    
+    chart_style_toggle()
     
     st.markdown("---")
     st.markdown("#### Qiskit Info")
-    st.write(f"🔬 Qiskit version: {qiskit.__version__}")
+    st.write(f"🔬 Qiskit version: {package_version('qiskit')}")
+    cache_stats = circuit_cache.stats()
+    st.write(f"♻️ Circuit cache: {cache_stats['hits']} hits / {cache_stats['misses']} misses")
+    render_stats = render_cache.stats()
+    st.write(f"🖼️ Render cache: {render_stats['hits']} hits / {render_stats['misses']} misses")
+    noise_stats = noise_cache.stats()
+    st.write(f"🌫️ Noise models: {noise_stats['hits']} hits / {noise_stats['misses']} misses")
+    if seed is not None:
+        # Only seeded runs use the store, so others never create or scan it
+        store_stats = get_result_store().stats()
+        st.write(
+            f"💾 Result store: {store_stats['hits']} hits / {store_stats['misses']} misses · "
+            f"{store_stats['bytes'] / 2 ** 20:.1f} MB"
+        )
     
     st.markdown("---")
     if st.button("🚀 Run Quantum Simulation", use_container_width=True):
         st.session_state.run_simulation = True
+    
+    st.markdown("---")
+    st.markdown("#### 📨 Superdense Coding")
+    payload_kind = st.radio(
+        "Payload:",
+        ["text", "random"],
+        format_func=lambda x: {"text": "✍️ Text message", "random": "🎲 Random bytes"}[x],
+        horizontal=True
+    )
+    if payload_kind == "text":
+        payload = st.text_area("Message", "Hello from Alice!", max_chars=MAX_MESSAGE_BYTES)
+    else:
+        payload = st.select_slider(
+            "Payload size (bytes)", options=PAYLOAD_SIZES, value=PAYLOAD_SIZES[1], format_func=lambda x: f"{x:,}"
+        )
+    st.caption("Two bits per Bell pair with I, X, Z or XZ; the whole message runs as one batched job")
+    if st.button("📨 Send Message", use_container_width=True):
+        st.session_state.run_superdense = True
+    
+    st.markdown("---")
+    st.markdown("#### 🔐 BB84 Key Distribution")
+    qkd_qubits = st.select_slider(
+        "Qubits sent", options=QKD_QUBIT_OPTIONS, value=DEFAULT_QKD_QUBITS, format_func=lambda x: f"{x:,}"
+    )
+    qkd_sweep = st.checkbox(
+        "Sweep eavesdropping probability", help="One run per 10% step from 0% to 100%, charting the secure key rate"
+    )
+    eve_probability = 0.0
+    if not qkd_sweep:
+        eve_probability = st.slider(
+            "Eavesdropping probability", 0.0, 1.0, 0.0, step=0.05,
+            help="Share of qubits Eve intercepts, measures in a random basis and resends"
+        )
+    if st.button("🔐 Distribute Key", use_container_width=True):
+        st.session_state.run_qkd = True
 
 # Main content area
 col1, col2 = st.columns([1, 2])
@@ -144,94 +290,125 @@ with col1:
     st.info(gate_info[alice_op])
 
 with col2:
+    # A run started with other settings is cancelled rather than finished
+    job_params = (alice_op, shots, execution_mode, backend_name, noise, num_qubits, seed)
+    track_job('communication_job', job_params)
+
     if st.session_state.run_simulation:
-        with st.spinner("🔄 Running quantum simulation..."):
-            try:
-                # Create quantum circuit
-                qc1 = QuantumCircuit(2, 2)
-
-                # Create Bell state
-                qc1.h(0)
-                qc1.cx(0, 1)
-
-                # Alice applies an operation
-                if alice_op == 'x':
-                    qc1.x(0)
-                elif alice_op == 'z':
-                    qc1.z(0)
-                elif alice_op == 'h':
-                    qc1.h(0)
-                # 'i' does nothing (identity)
-
-                qc1.measure([0,1],[0,1])
-
-                # Run simulation
-                job1 = sim.run(qc1, shots=shots)
-                result1 = job1.result()
-                counts1 = result1.get_counts()
-                
-                # Store results
-                st.session_state.results = {
-                    'counts': counts1,
-                    'circuit': qc1,
-                    'alice_op': alice_op,
-                    'shots': shots
-                }
-                
-            except Exception as e:
-                st.error(f"Error running simulation: {e}")
+        # Simulate in the background so the page stays responsive
+        start_job(
+            'communication_job', job_params, iter_communication,
+            alice_op, shots, execution_mode, backend,
+            rng=None if seed is None else np.random.default_rng(seed), num_qubits=num_qubits
+        )
+        st.session_state.run_simulation = False
+
+    job = wait_for_job(
+        'communication_job',
+        "🔄 Running quantum simulation...",
+        show_partial=lambda partial: st.caption(
+            "Counts so far: " + " · ".join(
+                f"|{label}⟩ {count}" for label, count in sorted(label_counts(partial['record'].counts()).items())
+            )
+        )
+    )
+    if job is not None:
+        try:
+            results1 = job.result()
+
+            # Store results
+            results1.update({'alice_op': alice_op, 'shots': shots, 'noise': noise, 'num_qubits': num_qubits})
+            st.session_state.results = results1
+            
+        except Exception as e:
+            st.error(f"Error running simulation: {e}")
 
     if st.session_state.results is not None:
         results = st.session_state.results
         
+        num_qubits_run = results['circuit'].num_qubits
+        # Counts are rebuilt from the packed shots on each rerun
+        counts = results['record'].counts()
+        
         st.markdown(f"### 📊 Results (Alice's Operation: {results['alice_op'].upper()})")
+        st.caption(f"⚙️ {num_qubits_run} qubits simulated with: {METHOD_LABELS[results['method']]}")
         
         # Display circuit
         st.markdown("#### 🔧 Quantum Circuit")
-        fig_circuit, ax_circuit = plt.subplots(figsize=(10, 4))
-        results['circuit'].draw('mpl', ax=ax_circuit)
-        ax_circuit.set_title(f"Quantum Communication Circuit\n(Alice applies {results['alice_op'].upper()} gate)", fontsize=14, fontweight='bold')
-        plt.tight_layout()
-        st.pyplot(fig_circuit)
+        if num_qubits_run <= MAX_DRAWN_QUBITS:
+            st.image(
+                render_circuit(
+                    results['circuit'],
+                    f"Quantum Communication Circuit\n(Alice applies {results['alice_op'].upper()} gate)"
+                ),
+                use_column_width=True
+            )
+        else:
+            st.caption(
+                f"H on qubit 0, a chain of {num_qubits_run - 1} CX gates, Alice's "
+                f"{results['alice_op'].upper()} on qubit 0, then {num_qubits_run} measurements"
+            )
         
         # Display results in columns
         col_results1, col_results2 = st.columns(2)
         
         with col_results1:
             st.markdown("#### 📈 Measurement Results")
-            fig_hist, ax_hist = plt.subplots(figsize=(8, 5))
-            plot_histogram(results['counts'], ax=ax_hist, color=['#ff6b6b', '#4ecdc4', '#45b7d1', '#96ceb4'])
-            ax_hist.set_title("Measurement Outcomes Distribution", fontweight='bold')
-            ax_hist.grid(True, alpha=0.3)
-            plt.tight_layout()
-            st.pyplot(fig_hist)
+            show_histogram(label_counts(counts), "Measurement Outcomes Distribution")
             
         with col_results2:
             st.markdown("#### 🔢 Detailed Statistics")
             total_shots = results['shots']
             
-            # Create metrics for each state
-            for state, count in sorted(results['counts'].items()):
+            # Create metrics for the most frequent states
+            labelled = label_counts(counts)
+            listed = sorted(sorted(labelled.items()), key=lambda item: item[1], reverse=True)[:MAX_STATE_METRICS]
+            for label, count in sorted(listed):
                 percentage = (count / total_shots) * 100
                 st.metric(
-                    label=f"State |{state}⟩",
+                    label=f"State |{label}⟩",
                     value=f"{count} shots",
                     delta=f"{percentage:.1f}%"
                 )
+            if len(labelled) > len(listed):
+                st.caption(f"…and {len(labelled) - len(listed):,} rarer outcomes, shown in the histogram")
+            
+            if results.get('probabilities'):
+                st.markdown("#### 🎯 Exact Probabilities")
+                for label, probability in sorted(label_counts(results['probabilities']).items()):
+                    st.write(f"|{label}⟩: **{probability:.1%}**")
             
             st.markdown("#### 💡 Interpretation")
-            total = sum(results['counts'].values())
             
-            if len(results['counts']) == 1:
-                state = list(results['counts'].keys())[0]
-                st.success(f"✅ **Deterministic Outcome**: Always measured |{state}⟩")
+            if results.get('noise'):
+                depolarizing, amplitude_damping, readout = results['noise']
+                ideal = probabilities_to_dict(
+                    get_exact_probabilities(
+                        ('communication', results['alice_op'], num_qubits_run), results['circuit']
+                    ),
+                    num_qubits_run
+                )
+                st.warning(
+                    f"🌫️ **Noisy run** (depolarizing {depolarizing:.1%}, damping {amplitude_damping:.1%}, "
+                    f"readout {readout:.1%}): {total_variation_distance(counts, ideal):.1%} "
+                    "of the distribution has moved away from the ideal outcome"
+                )
+            elif len(counts) == 1:
+                state = list(counts.keys())[0]
+                st.success(f"✅ **Deterministic Outcome**: Always measured |{state_label(state)}⟩")
                 st.info("This shows perfect quantum correlation due to entanglement!")
             else:
                 st.warning("🔍 **Probabilistic Outcomes**: Quantum superposition at work!")
                 
             # Theoretical explanation
             st.markdown("#### 🧪 Theoretical Analysis")
-            if results['alice_op'] == 'i':
+            if num_qubits_run > 2:
+                st.write(f"**{num_qubits_run}-qubit GHZ state (|0…0⟩ + |1…1⟩)/√2**")
+                st.write("- Every qubit shares the correlation, not just a pair")
+                st.write("- Alice's gate acts on qubit 0 only; the other qubits stay all-equal")
+                st.write("- Clifford throughout, so the stabilizer method scales to hundreds of qubits")
+                
+            elif results['alice_op'] == 'i':
                 st.write("**Bell State |Φ⁺⟩ = (|00⟩ + |11⟩)/√2**")
                 st.write("- Perfect correlation: both qubits same")
                 st.write("- 50% |00⟩, 50% |11⟩")
@@ -251,6 +428,148 @@ with col2:
                 st.write("- Creates equal superposition of all states")
                 st.write("- More complex probability distribution")
 
+    superdense_params = (payload_kind, payload, backend_name, noise, seed)
+    track_job('superdense_job', superdense_params)
+
+    if st.session_state.run_superdense:
+        if payload_kind == "text":
+            message = payload.encode('utf-8')
+        else:
+            message = np.random.default_rng(seed).bytes(payload)
+        start_job('superdense_job', superdense_params, iter_superdense, message, backend)
+        st.session_state.run_superdense = False
+
+    job = wait_for_job(
+        'superdense_job',
+        "📨 Sending the message over Bell pairs...",
+        show_partial=lambda partial: st.caption(
+            f"{partial['bits']:,} bits decoded · {partial['throughput'] / 1000:,.1f} kbit/s so far"
+        )
+    )
+    if job is not None:
+        try:
+            transfer = job.result()
+            transfer['payload_kind'] = payload_kind
+            st.session_state.superdense_results = transfer
+        except Exception as e:
+            st.error(f"Error sending message: {e}")
+
+    if st.session_state.superdense_results is not None:
+        transfer = st.session_state.superdense_results
+
+        st.markdown("### 📨 Superdense Coding Transfer")
+        st.caption(
+            f"{len(transfer['sent']):,} bytes over {transfer['bits'] // 2:,} Bell pairs · simulated with: "
+            + ", ".join(METHOD_LABELS[method] for method in transfer['methods'])
+        )
+
+        col_dense1, col_dense2, col_dense3, col_dense4 = st.columns(4)
+        with col_dense1:
+            st.metric("Bits Sent", f"{transfer['bits']:,}")
+        with col_dense2:
+            st.metric("Bit Error Rate", f"{transfer['bit_error_rate']:.3%}")
+        with col_dense3:
+            st.metric("Throughput", f"{transfer['throughput'] / 1000:,.1f} kbit/s")
+        with col_dense4:
+            st.metric("Wall Time", f"{transfer['elapsed']:.2f} s")
+
+        if transfer['bit_errors'] == 0:
+            st.success("✅ Bob decoded every bit Alice sent")
+        else:
+            st.warning(f"🌫️ {transfer['bit_errors']:,} of {transfer['bits']:,} bits arrived flipped")
+
+        col_dense5, col_dense6 = st.columns(2)
+        with col_dense5:
+            show_histogram(
+                {f"{op.upper()} ({symbol:02b})": transfer['symbol_counts'][op]
+                 for symbol, op in enumerate(SUPERDENSE_OPS)},
+                "Bell Pairs per Encoding Operation"
+            )
+        with col_dense6:
+            st.markdown("#### 📬 Bob's Decoded Message")
+            if transfer['payload_kind'] == "text":
+                st.code(transfer['received'].decode('utf-8', errors='replace')[:2000], language=None)
+            else:
+                st.code(transfer['received'][:64].hex(' '), language=None)
+                st.caption("First 64 bytes")
+
+    qkd_params = (qkd_qubits, qkd_sweep, eve_probability, backend_name, noise, seed)
+    track_job('qkd_job', qkd_params)
+
+    if st.session_state.run_qkd:
+        qkd_rng = None if seed is None else np.random.default_rng(seed)
+        if qkd_sweep:
+            start_job('qkd_job', qkd_params, iter_key_rate_sweep, qkd_qubits, backend=backend, rng=qkd_rng)
+        else:
+            start_job('qkd_job', qkd_params, iter_bb84, qkd_qubits, eve_probability, backend, qkd_rng)
+        st.session_state.run_qkd = False
+
+    job = wait_for_job(
+        'qkd_job',
+        "🔐 Distributing a key...",
+        show_partial=lambda partial: st.caption(
+            f"{len(partial['eve_probabilities'])} eavesdropping levels done" if 'eve_probabilities' in partial
+            else f"{partial['qubits']:,} qubits sent"
+        )
+    )
+    if job is not None:
+        try:
+            st.session_state.qkd_results = job.result()
+        except Exception as e:
+            st.error(f"Error distributing key: {e}")
+
+    if st.session_state.qkd_results is not None:
+        qkd = st.session_state.qkd_results
+
+        st.markdown("### 🔐 BB84 Key Distribution")
+        st.caption(
+            f"{qkd['qubits']:,} qubits per run · simulated with: "
+            + ", ".join(METHOD_LABELS[method] for method in qkd['methods'])
+        )
+
+        if 'eve_probabilities' in qkd:
+            eve_percent = [100 * probability for probability in qkd['eve_probabilities']]
+            col_qkd1, col_qkd2 = st.columns(2)
+            with col_qkd1:
+                show_lines(
+                    eve_percent,
+                    {'measured': qkd['key_rate'], 'theory': qkd['expected_key_rate']},
+                    "Secure Key Rate", xlabel="Eavesdropping probability (%)", ylabel="Key bits per qubit sent"
+                )
+            with col_qkd2:
+                show_lines(
+                    eve_percent,
+                    {'measured': qkd['qber'], 'estimated': qkd['qber_estimate'], 'theory': qkd['expected_qber']},
+                    "Quantum Bit Error Rate", xlabel="Eavesdropping probability (%)", ylabel="QBER"
+                )
+            secure = [probability for probability, rate in zip(eve_percent, qkd['key_rate']) if rate > 0]
+            if secure:
+                st.info(f"🔑 A secure key survives eavesdropping on up to {max(secure):.0f}% of the qubits")
+        else:
+            col_qkd1, col_qkd2, col_qkd3, col_qkd4 = st.columns(4)
+            with col_qkd1:
+                st.metric("Sifted Bits", f"{qkd['sifted_bits']:,}")
+            with col_qkd2:
+                st.metric("Estimated QBER", f"{qkd['qber_estimate']:.2%}",
+                          delta=f"{qkd['qber_estimate'] - qkd['expected_qber']:+.2%} vs theory", delta_color="off")
+            with col_qkd3:
+                st.metric("Secure Key", f"{qkd['key_bits']:,} bits")
+            with col_qkd4:
+                st.metric("Key Rate", f"{qkd['key_rate']:.3f} bits/qubit")
+
+            if qkd['key_bits'] > 0:
+                st.success(
+                    f"✅ {qkd['key_bits']:,}-bit key distilled in {qkd['elapsed']:.2f} s "
+                    f"({qkd['secure_fraction']:.1%} of the undisclosed sifted bits kept)"
+                )
+                st.code(np.packbits(qkd['key'][:256]).tobytes().hex(' '), language=None)
+                st.caption("First 256 key bits")
+            else:
+                st.error(
+                    f"🚨 QBER {qkd['qber_estimate']:.1%} is too high: no secure key remains, "
+                    f"so Alice and Bob abort ({qkd['intercepted']:,} qubits were intercepted)"
+                )
+
 # Footer
 st.markdown("---")
 st.markdown(
@@ -258,4 +577,10 @@ st.markdown(
     "Built with Qiskit ⚛️ | Quantum Communication Simulator"
     "</div>",
     unsafe_allow_html=True
-)
\ No newline at end of file
+)
+
+# Load the heavy stack in the background now that the page is on screen
+warm_imports()
+
+# Record this rerun's timings and draw the Performance panel
+finish_rerun(perf)
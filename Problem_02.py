@@ -2,14 +2,47 @@
 # Problem 2 – Quantum Coin Game Simulator
 # ==========================================
 
+import os
+
 import streamlit as st
-import qiskit
-from qiskit import QuantumCircuit
-from qiskit_aer import AerSimulator
-from qiskit.visualization import plot_histogram
-import matplotlib.pyplot as plt
-import numpy as np
-import random
+from quantum_sim.backends import BACKEND_NAMES, METHOD_LABELS, get_backend
+from quantum_sim.chart_panel import chart_style_toggle, show_heatmap, show_lines
+from quantum_sim.coin_game import (
+    PLAYER_STRATEGIES,
+    REFEREE_MOVES,
+    coin_circuit,
+    expected_win_rate,
+    iter_coin_games,
+    iter_stream_history,
+    win_probabilities
+)
+from quantum_sim.game_history import DEFAULT_RETENTION, RETENTION_OPTIONS, GameHistory
+from quantum_sim.job_panel import start_job, track_job, wait_for_job
+from quantum_sim.lazy import lazy_import, package_version, warm_imports
+from quantum_sim.noise import MAX_ERROR_RATE, NoisyBackend, noise_cache
+from quantum_sim.perf_panel import begin_rerun, finish_rerun
+from quantum_sim.render import render_cache, render_circuit
+from quantum_sim.resources import circuit_cache
+from quantum_sim.result_store import SeededBackend, get_result_store
+from quantum_sim.strategy_search import (
+    DEFAULT_CONFIRM_GAMES,
+    DEFAULT_SEARCH_RESOLUTION,
+    SEARCH_RESOLUTIONS,
+    iter_strategy_search
+)
+from quantum_sim.tournament import (
+    PLAYER_STRATEGY_PRESETS,
+    REFEREE_POLICIES,
+    default_workers,
+    format_strategy,
+    iter_tournament,
+    parse_policy,
+    parse_strategy
+)
+
+# Heavy modules load on first use so the page paints immediately
+np = lazy_import('numpy')
+pd = lazy_import('pandas')
 
 # Configure the page
 st.set_page_config(
@@ -18,6 +51,9 @@ st.set_page_config(
     layout="wide"
 )
 
+# Time every stage of this rerun for the Performance panel
+perf = begin_rerun()
+
 # Custom CSS for modern styling
 st.markdown("""
 <style>
@@ -67,40 +103,73 @@ st.markdown("""
         border-radius: 25px;
         font-weight: bold;
     }
-    .win-card {
-        background: linear-gradient(135deg, #4ecdc4 0%, #44a08d 100%);
-        color: white;
-        padding: 1rem;
-        border-radius: 10px;
-        text-align: center;
-        margin: 0.5rem 0;
-    }
-    .loss-card {
-        background: linear-gradient(135deg, #ff6b6b 0%, #c44d4d 100%);
-        color: white;
-        padding: 1rem;
-        border-radius: 10px;
-        text-align: center;
-        margin: 0.5rem 0;
-    }
 </style>
 """, unsafe_allow_html=True)
 
 # Header
 st.markdown('<div class="main-header">🪙 Quantum Coin Game Simulator</div>', unsafe_allow_html=True)
 
-# Initialize simulator
-sim = AerSimulator()
+# Individual results are paged; the rolling win rate is downsampled when charted
+PAGE_SIZE_OPTIONS = [25, 100, 500]
+ROLLING_WINDOWS = [10, 100, 1_000, 10_000]
+
+
+def show_stream_estimate(history, expected, tolerance, confidence):
+    """Metrics, progress and convergence chart for a streaming estimate."""
+    latest = history[-1]
+
+    col_est1, col_est2, col_est3 = st.columns(3)
+    with col_est1:
+        st.metric("Games Simulated", f"{latest['games']:,}")
+    with col_est2:
+        st.metric("Win Rate", f"{latest['win_rate']:.2%}",
+                  delta=f"{latest['win_rate'] - expected:+.2%} vs theory", delta_color="off")
+    with col_est3:
+        st.metric(f"{confidence:.0%} Interval", f"±{latest['half_width']:.2%}")
+
+    st.progress(min(1.0, tolerance / latest['half_width']) if latest['half_width'] > 0 else 1.0,
+                text=f"Precision target ±{tolerance:.2%}")
+
+    games = [entry['games'] for entry in history]
+    show_lines(
+        games,
+        {
+            'win rate': [entry['win_rate'] for entry in history],
+            'CI low': [entry['ci_low'] for entry in history],
+            'CI high': [entry['ci_high'] for entry in history],
+            'theory': [expected] * len(history)
+        },
+        "Win-Rate Convergence", xlabel="Games", ylabel="Win rate"
+    )
+
 
 # Initialize session state
 if 'game_results' not in st.session_state:
     st.session_state.game_results = None
-if 'games_played' not in st.session_state:
-    st.session_state.games_played = 0
-if 'wins' not in st.session_state:
-    st.session_state.wins = 0
+if 'game_history' not in st.session_state:
+    st.session_state.game_history = GameHistory()
 if 'run_game' not in st.session_state:
     st.session_state.run_game = False
+if 'stream_results' not in st.session_state:
+    st.session_state.stream_results = None
+if 'run_stream' not in st.session_state:
+    st.session_state.run_stream = False
+if 'game_job' not in st.session_state:
+    st.session_state.game_job = None
+if 'stream_job' not in st.session_state:
+    st.session_state.stream_job = None
+if 'tournament_results' not in st.session_state:
+    st.session_state.tournament_results = None
+if 'run_tournament' not in st.session_state:
+    st.session_state.run_tournament = False
+if 'tournament_job' not in st.session_state:
+    st.session_state.tournament_job = None
+if 'search_results' not in st.session_state:
+    st.session_state.search_results = None
+if 'run_search' not in st.session_state:
+    st.session_state.run_search = False
+if 'search_job' not in st.session_state:
+    st.session_state.search_job = None
 
 # Sidebar for configuration
 with st.sidebar:
@@ -110,7 +179,7 @@ with st.sidebar:
     st.markdown("#### 🎯 Player's Strategy")
     player_strategy = st.selectbox(
         "Choose your quantum strategy:",
-        ["quantum", "classical"],
+        PLAYER_STRATEGIES,
         format_func=lambda x: {
             "quantum": "🧬 Quantum Strategy (H gate)", 
             "classical": "📊 Classical Strategy (No gate)"
@@ -119,15 +188,181 @@ with st.sidebar:
     
     st.markdown("---")
     st.markdown("#### 🎲 Game Settings")
-    num_games = st.slider("Number of Games to Play", 1, 10, 5, help="Number of coin flip games to simulate")
+    num_games = st.select_slider(
+        "Number of Games to Play",
+        options=[1, 5, 10, 100, 1_000, 10_000, 100_000, 1_000_000],
+        value=5,
+        help="Number of coin flip games to simulate"
+    )
+    history_retention = st.select_slider(
+        "Games kept in history",
+        options=RETENTION_OPTIONS,
+        value=DEFAULT_RETENTION,
+        help="Older games are dropped from the per-game history; session totals still count them"
+    )
+    st.session_state.game_history.set_retention(history_retention)
+    noise = None
+    if st.checkbox("🌫️ Simulate noise", help="Density-matrix simulation with gate and readout errors"):
+        backend_name = "noisy"
+        noise = (
+            st.slider("Depolarizing error per gate", 0.0, MAX_ERROR_RATE, 0.01, step=0.005, format="%.3f"),
+            st.slider("Amplitude damping per gate", 0.0, MAX_ERROR_RATE, 0.01, step=0.005, format="%.3f"),
+            st.slider("Readout error per qubit", 0.0, MAX_ERROR_RATE, 0.02, step=0.005, format="%.3f")
+        )
+    else:
+        backend_name = st.selectbox(
+            "Simulator backend:",
+            BACKEND_NAMES,
+            format_func=lambda x: {
+                "auto": "⚡ Auto (NumPy for small circuits, Aer otherwise)",
+                "numpy": "🧮 NumPy state vector",
+                "aer": "🔬 Qiskit Aer"
+            }[x]
+        )
+    backend = NoisyBackend(*noise) if noise else get_backend(backend_name)
+    seed = None
+    if st.checkbox(
+        "🔁 Seeded runs", help="The same seed draws the same shots; results are stored on disk and reused after restarts"
+    ):
+        seed = int(st.number_input("Simulation seed", min_value=0, value=42, step=1))
+        backend = SeededBackend(backend, seed, get_result_store())
+    
+    chart_style_toggle()
     
     st.markdown("---")
     st.markdown("#### Qiskit Info")
-    st.write(f"🔬 Qiskit version: {qiskit.__version__}")
+    st.write(f"🔬 Qiskit version: {package_version('qiskit')}")
+    cache_stats = circuit_cache.stats()
+    st.write(f"♻️ Circuit cache: {cache_stats['hits']} hits / {cache_stats['misses']} misses")
+    render_stats = render_cache.stats()
+    st.write(f"🖼️ Render cache: {render_stats['hits']} hits / {render_stats['misses']} misses")
+    noise_stats = noise_cache.stats()
+    st.write(f"🌫️ Noise models: {noise_stats['hits']} hits / {noise_stats['misses']} misses")
+    if seed is not None:
+        # Only seeded runs use the store, so others never create or scan it
+        store_stats = get_result_store().stats()
+        st.write(
+            f"💾 Result store: {store_stats['hits']} hits / {store_stats['misses']} misses · "
+            f"{store_stats['bytes'] / 2 ** 20:.1f} MB"
+        )
     
     st.markdown("---")
     if st.button("🎮 Play Quantum Coin Game", use_container_width=True):
         st.session_state.run_game = True
+    
+    st.markdown("---")
+    st.markdown("#### 📈 Streaming Estimate")
+    stream_tolerance = st.select_slider(
+        "Target precision (± win rate)",
+        options=[0.05, 0.02, 0.01, 0.005, 0.002, 0.001],
+        value=0.01,
+        format_func=lambda x: f"±{x:.1%}",
+        help="Keep playing until the confidence interval is this narrow"
+    )
+    stream_confidence = st.select_slider(
+        "Confidence level",
+        options=[0.90, 0.95, 0.99],
+        value=0.95,
+        format_func=lambda x: f"{x:.0%}"
+    )
+    if st.button("📈 Estimate Win Rate", use_container_width=True):
+        st.session_state.run_stream = True
+    
+    st.markdown("---")
+    st.markdown("#### 🏆 Strategy Tournament")
+    tournament_presets = st.multiselect(
+        "Player strategies:",
+        list(PLAYER_STRATEGY_PRESETS),
+        default=['classical', 'quantum', 'meyer'],
+        format_func=lambda x: f"{x} ({format_strategy(PLAYER_STRATEGY_PRESETS[x])})"
+    )
+    custom_strategies = st.text_input(
+        "Custom strategies (one per ';'):",
+        placeholder="u(1.2,0,0) R h; ry(0.8) R sdg",
+        help="Single-qubit gates separated by spaces, with R marking each referee turn"
+    )
+    tournament_policies = st.multiselect(
+        "Referee policies:",
+        list(REFEREE_POLICIES),
+        default=list(REFEREE_POLICIES),
+        format_func=lambda x: f"{x} (I:X:H = {':'.join(str(w) for w in REFEREE_POLICIES[x])})"
+    )
+    custom_policies = st.text_input(
+        "Custom policies (one per ';'):",
+        placeholder="1:3:1; 2:1:1",
+        help="Relative weights of the referee's I, X and H moves"
+    )
+    tournament_games = st.select_slider(
+        "Games per matchup",
+        options=[1_000, 10_000, 100_000, 1_000_000, 10_000_000, 100_000_000],
+        value=100_000
+    )
+    tournament_workers = int(st.number_input(
+        "Worker processes", min_value=0, max_value=os.cpu_count() or 1, value=0,
+        help="Strategies are shared out over this many processes; 0 runs small tournaments "
+             "in-process and large ones on every core"
+    ))
+    tournament_seed = st.number_input("Seed", min_value=0, value=0, step=1,
+                                      help="The same seed reproduces the same payoff matrix")
+
+    tournament_strategies = {name: PLAYER_STRATEGY_PRESETS[name] for name in tournament_presets}
+    referee_policies = {name: REFEREE_POLICIES[name] for name in tournament_policies}
+    tournament_error = None
+    try:
+        for spec in filter(None, (text.strip() for text in custom_strategies.split(';'))):
+            tournament_strategies[spec] = parse_strategy(spec)
+        for spec in filter(None, (text.strip() for text in custom_policies.split(';'))):
+            referee_policies[spec] = parse_policy(spec)
+    except ValueError as e:
+        tournament_error = str(e)
+        st.error(tournament_error)
+    num_matchups = len(tournament_strategies) * len(referee_policies)
+    planned_workers = min(
+        tournament_workers or default_workers(tournament_strategies.values(), referee_policies.values()),
+        max(1, len(tournament_strategies))
+    )
+    st.caption(f"{num_matchups} matchups spread over {planned_workers} process(es)")
+    if st.button("🏆 Run Tournament", use_container_width=True,
+                 disabled=num_matchups == 0 or tournament_error is not None):
+        st.session_state.run_tournament = True
+    
+    st.markdown("---")
+    st.markdown("#### 🧭 Optimal Strategy Search")
+    search_policy_name = st.selectbox(
+        "Referee policy to beat:",
+        list(REFEREE_POLICIES),
+        format_func=lambda x: f"{x} (I:X:H = {':'.join(str(w) for w in REFEREE_POLICIES[x])})"
+    )
+    search_policy_text = st.text_input(
+        "Custom policy (overrides the choice above):",
+        placeholder="1:3:1",
+        help="Relative weights of the referee's I, X and H moves"
+    )
+    search_second_move = st.checkbox(
+        "Allow a second move after the referee's",
+        value=True,
+        help="Searches u(θ, φ, λ) before the referee's move and the best u gate after it"
+    )
+    search_resolution = st.select_slider(
+        "Grid points per angle", options=SEARCH_RESOLUTIONS, value=DEFAULT_SEARCH_RESOLUTION,
+        help="First-pass (θ, φ) grid; three zoomed passes follow around the best point"
+    )
+    search_confirm_games = st.select_slider(
+        "Games confirming the winner",
+        options=[10_000, 100_000, 1_000_000],
+        value=DEFAULT_CONFIRM_GAMES,
+        help="Played on Qiskit Aer (its noisy simulator when noise is on), whichever backend is selected above"
+    )
+    search_weights = REFEREE_POLICIES[search_policy_name]
+    search_error = None
+    if search_policy_text.strip():
+        try:
+            search_weights = parse_policy(search_policy_text)
+        except ValueError as e:
+            search_error = str(e)
+            st.error(search_error)
+    if st.button("🧭 Find Optimal Strategy", use_container_width=True, disabled=search_error is not None):
+        st.session_state.run_search = True
 
 # Main content area
 col1, col2 = st.columns([1, 2])
@@ -174,84 +409,71 @@ with col1:
     
     # Statistics
     st.markdown("### 📊 Game Statistics")
+    game_history = st.session_state.game_history
     col_stat1, col_stat2 = st.columns(2)
     with col_stat1:
-        st.metric("Games Played", st.session_state.games_played)
+        st.metric("Games Played", f"{game_history.games_played:,}")
     with col_stat2:
-        if st.session_state.games_played > 0:
-            win_rate = (st.session_state.wins / st.session_state.games_played) * 100
+        if game_history.games_played > 0:
+            win_rate = (game_history.wins / game_history.games_played) * 100
             st.metric("Win Rate", f"{win_rate:.1f}%")
+    if len(game_history):
+        st.caption(
+            f"{len(game_history):,} most recent games kept "
+            f"({game_history.outcomes.nbytes * 3 / 1024:.1f} kB of history)"
+        )
 
 with col2:
+    # A run started with other settings is cancelled rather than finished
+    game_params = (player_strategy, num_games, backend_name, noise, seed)
+    track_job('game_job', game_params)
+
     if st.session_state.run_game:
-        with st.spinner("🔄 Playing quantum coin games..."):
-            try:
-                # Initialize game results
-                game_history = []
-                wins = 0
-                
-                for game_num in range(num_games):
-                    # Create quantum circuit for one coin flip
-                    qc = QuantumCircuit(1, 1)
-                    
-                    # Player's move
-                    if player_strategy == "quantum":
-                        qc.h(0)  # Apply Hadamard for quantum strategy
-                    
-                    # Referee's random move
-                    referee_move = random.choice(['i', 'x', 'h'])
-                    if referee_move == 'x':
-                        qc.x(0)
-                    elif referee_move == 'h':
-                        qc.h(0)
-                    # 'i' does nothing (identity)
-                    
-                    # Measure the coin
-                    qc.measure(0, 0)
-                    
-                    # Run simulation (1 shot per game)
-                    job = sim.run(qc, shots=1)
-                    result = job.result()
-                    counts = result.get_counts()
-                    
-                    # Determine winner (Heads = 0 = Win)
-                    outcome = list(counts.keys())[0]
-                    is_win = (outcome == '0')
-                    if is_win:
-                        wins += 1
-                    
-                    # Store game result
-                    game_history.append({
-                        'game_number': game_num + 1,
-                        'circuit': qc,
-                        'referee_move': referee_move,
-                        'outcome': outcome,
-                        'is_win': is_win,
-                        'counts': counts
-                    })
-                
-                # Store overall results
-                st.session_state.game_results = {
-                    'game_history': game_history,
-                    'total_games': num_games,
-                    'wins': wins,
-                    'player_strategy': player_strategy,
-                    'win_rate': (wins / num_games) * 100
-                }
-                
-                # Update session statistics
-                st.session_state.games_played += num_games
-                st.session_state.wins += wins
-                st.session_state.run_game = False
-                
-            except Exception as e:
-                st.error(f"Error running game simulation: {e}")
+        # Play in background chunks so the page stays responsive
+        start_job(
+            'game_job', game_params, iter_coin_games, player_strategy, num_games, backend,
+            None if seed is None else np.random.default_rng(seed)
+        )
+        st.session_state.run_game = False
+
+    job = wait_for_job(
+        'game_job',
+        "🔄 Playing quantum coin games...",
+        show_partial=lambda games: st.caption(
+            f"{games[1].size:,} games played so far · win rate "
+            f"{1 - np.count_nonzero(games[1]) / games[1].size:.1%}"
+        )
+    )
+    if job is not None:
+        try:
+            referee_codes, outcomes, circuits = job.result()
+
+            # Heads = 0 = Win
+            wins = int(num_games - np.count_nonzero(outcomes))
+
+            # Per-game codes go to the bounded history; results keep the summary
+            game_history = st.session_state.game_history
+            move_games, move_wins = game_history.append(player_strategy, referee_codes, outcomes)
+            st.session_state.game_results = {
+                'first_game': game_history.recorded - num_games,
+                'total_games': num_games,
+                'wins': wins,
+                'move_games': move_games.tolist(),
+                'move_wins': move_wins.tolist(),
+                'player_strategy': player_strategy,
+                'win_rate': (wins / num_games) * 100,
+                'methods': sorted({backend.method_for(circuit) for circuit in circuits.values()})
+            }
+            
+        except Exception as e:
+            st.error(f"Error running game simulation: {e}")
 
     if st.session_state.game_results is not None:
         results = st.session_state.game_results
         
         # Overall results
         st.markdown("### 📊 Game Results Summary")
+        st.caption("⚙️ Simulated with: " + ", ".join(METHOD_LABELS[method] for method in results['methods']))
         
         col_sum1, col_sum2, col_sum3 = st.columns(3)
         with col_sum1:
@@ -269,59 +491,259 @@ with col2:
         else:
             st.warning(f"💡 Try switching to quantum strategy for better results!")
         
-        # Individual game results
+        # Individual game results: one paged table, however many games were played
         st.markdown("#### 🎮 Individual Game Results")
-        
-        for game in results['game_history']:
-            col_game1, col_game2, col_game3, col_game4 = st.columns([2, 2, 1, 2])
-            
-            with col_game1:
-                st.write(f"**Game {game['game_number']}**")
-            
-            with col_game2:
-                referee_move_name = {
-                    'i': 'No Move (I)',
-                    'x': 'Flip (X)',
-                    'h': 'Superposition (H)'
-                }[game['referee_move']]
-                st.write(f"Referee: {referee_move_name}")
-            
-            with col_game3:
-                outcome_symbol = "🪙 Heads" if game['outcome'] == '0' else "🪙 Tails"
-                st.write(outcome_symbol)
-            
-            with col_game4:
-                if game['is_win']:
-                    st.markdown('<div class="win-card">🎉 WIN!</div>', unsafe_allow_html=True)
-                else:
-                    st.markdown('<div class="loss-card">💥 Loss</div>', unsafe_allow_html=True)
+        game_history = st.session_state.game_history
+        total_games = results['total_games']
+        run_end = results['first_game'] + total_games
+        run_start = max(results['first_game'], game_history.first_retained)
+
+        move_names = {'i': 'No Move (I)', 'x': 'Flip (X)', 'h': 'Superposition (H)'}
+        by_move = pd.DataFrame({
+            'Referee move': [move_names[move] for move in REFEREE_MOVES],
+            'Games': results['move_games'],
+            'Wins': results['move_wins']
+        })
+        by_move['Win rate'] = by_move['Wins'] / by_move['Games'].where(by_move['Games'] > 0)
+        st.dataframe(by_move.style.format({'Win rate': "{:.1%}"}, na_rep="–"),
+                     hide_index=True, use_container_width=True)
+
+        if run_start < run_end:
+            window = st.select_slider("Rolling window (games)", options=ROLLING_WINDOWS, value=100)
+            show_lines(
+                np.arange(run_start, run_end) - results['first_game'] + 1,
+                {'rolling win rate': game_history.rolling_win_rate(window, start=run_start)},
+                f"Rolling Win Rate ({window:,}-game window)", xlabel="Game", ylabel="Win rate"
+            )
+
+            col_page1, col_page2 = st.columns(2)
+            with col_page1:
+                page_size = st.selectbox("Games per page", PAGE_SIZE_OPTIONS, index=1)
+            num_pages = -(-(run_end - run_start) // page_size)
+            with col_page2:
+                page = int(st.number_input("Page", min_value=1, max_value=num_pages, value=num_pages, step=1))
+            page_start = run_start + (page - 1) * page_size
+            numbers, _, referee_codes, outcomes = game_history.games(page_start, page_start + page_size)
+            st.dataframe(
+                pd.DataFrame({
+                    'Game': numbers - results['first_game'] + 1,
+                    'Referee': np.array([move_names[move] for move in REFEREE_MOVES])[referee_codes],
+                    'Coin': np.where(outcomes == 0, "🪙 Heads", "🪙 Tails"),
+                    'Result': np.where(outcomes == 0, "🎉 WIN!", "💥 Loss")
+                }),
+                hide_index=True, use_container_width=True
+            )
+        if run_start > results['first_game']:
+            st.caption(f"Only the last {run_end - run_start:,} of {total_games:,} games are kept in the history")
         
         # Circuit visualization for last game
         st.markdown("#### 🔧 Quantum Circuit (Last Game)")
-        if results['game_history']:
-            last_game = results['game_history'][-1]
-            fig_circuit, ax_circuit = plt.subplots(figsize=(8, 3))
-            last_game['circuit'].draw('mpl', ax=ax_circuit)
-            ax_circuit.set_title(f"Game {last_game['game_number']} Circuit\n(Referee: {last_game['referee_move'].upper()})", 
-                               fontsize=12, fontweight='bold')
-            plt.tight_layout()
-            st.pyplot(fig_circuit)
+        last_game = game_history.last_game()
+        if last_game is not None:
+            # Only the drawn circuit is materialized, from the circuit cache
+            last_strategy, last_move, _ = last_game
+            st.image(
+                render_circuit(
+                    coin_circuit(last_strategy, last_move),
+                    f"Game {total_games} Circuit\n(Referee: {last_move.upper()})",
+                    figsize=(8, 3),
+                    title_fontsize=12
+                ),
+                use_column_width=True
+            )
         
         # Theoretical win probabilities
         st.markdown("#### 📈 Theoretical Analysis")
         
-        if results['player_strategy'] == 'quantum':
-            st.write("**Quantum Strategy Win Probability:**")
-            st.write("- Against I gate: 50%")
-            st.write("- Against X gate: 50%") 
-            st.write("- Against H gate: 100%")
-            st.write("**Overall expected: ~67%** 🚀")
+        move_labels = {'i': 'I', 'x': 'X', 'h': 'H'}
+        probabilities = win_probabilities(results['player_strategy'])
+        expected = sum(probabilities.values()) / len(probabilities)
+        strategy_name = 'Quantum' if results['player_strategy'] == 'quantum' else 'Classical'
+        st.write(f"**{strategy_name} Strategy Win Probability:**")
+        for referee_move, probability in probabilities.items():
+            st.write(f"- Against {move_labels[referee_move]} gate: {probability:.0%}")
+        st.write(f"**Overall expected: {expected:.1%}** {'🚀' if expected > 0.5 else '📊'}")
+
+    stream_params = (player_strategy, backend_name, noise, stream_tolerance, stream_confidence, seed)
+    track_job('stream_job', stream_params)
+    # Exact win rate only when a stream needs it, so first paint skips the Qiskit import
+    expected = None
+    if st.session_state.run_stream or st.session_state.stream_job is not None:
+        expected = expected_win_rate(player_strategy)
+
+    if st.session_state.run_stream:
+        start_job(
+            'stream_job', stream_params, iter_stream_history,
+            player_strategy, backend, stream_tolerance, stream_confidence, expected,
+            None if seed is None else np.random.default_rng(seed)
+        )
+        st.session_state.run_stream = False
+
+    if st.session_state.stream_job is not None or st.session_state.stream_results is not None:
+        st.markdown("### 📈 Streaming Win-Rate Estimate")
+
+    # Each finished chunk redraws the partial view, so the estimate tightens on screen
+    job = wait_for_job(
+        'stream_job',
+        "📈 Estimating win rate...",
+        show_partial=lambda history: show_stream_estimate(history, expected, stream_tolerance, stream_confidence)
+    )
+    if job is not None:
+        try:
+            history = job.result()
+            st.session_state.stream_results = {
+                'history': history,
+                'expected': expected,
+                'player_strategy': player_strategy,
+                'tolerance': stream_tolerance,
+                'confidence': stream_confidence
+            }
+            st.session_state.game_history.add_totals(history[-1]['games'], history[-1]['wins'])
+        except Exception as e:
+            st.error(f"Error running streaming estimate: {e}")
+
+    if st.session_state.stream_results is not None:
+        stream = st.session_state.stream_results
+        show_stream_estimate(stream['history'], stream['expected'], stream['tolerance'], stream['confidence'])
+        latest = stream['history'][-1]
+        interval = f"[{latest['ci_low']:.2%}, {latest['ci_high']:.2%}]"
+        if latest['stop_reason'] == 'precision':
+            st.success(
+                f"✅ Reached ±{stream['tolerance']:.2%} after {latest['games']:,} games: "
+                f"{stream['confidence']:.0%} interval {interval} "
+                f"(theory {stream['expected']:.1%})"
+            )
+        elif latest['stop_reason'] == 'separated':
+            st.warning(
+                f"⚠️ After {latest['games']:,} games the interval {interval} excludes the "
+                f"theoretical {stream['expected']:.1%}"
+            )
         else:
-            st.write("**Classical Strategy Win Probability:**")
-            st.write("- Against I gate: 100%")
-            st.write("- Against X gate: 0%")
-            st.write("- Against H gate: 50%")
-            st.write("**Overall expected: ~50%** 📊")
+            st.info(f"⏱️ Stopped at the {latest['games']:,}-game budget with interval {interval}")
+
+    tournament_params = (
+        tuple(tournament_strategies.items()), tuple(referee_policies.items()),
+        tournament_games, tournament_workers, tournament_seed
+    )
+    track_job('tournament_job', tournament_params)
+
+    if st.session_state.run_tournament:
+        start_job(
+            'tournament_job', tournament_params, iter_tournament,
+            tournament_strategies, referee_policies, tournament_games, tournament_workers, int(tournament_seed)
+        )
+        st.session_state.run_tournament = False
+
+    job = wait_for_job(
+        'tournament_job',
+        "🏆 Playing the tournament...",
+        show_partial=lambda results: st.caption(
+            f"{int(np.count_nonzero(~np.isnan(results['expected'][:, 0])))} of "
+            f"{len(results['strategies'])} strategies finished"
+        )
+    )
+    if job is not None:
+        try:
+            st.session_state.tournament_results = job.result()
+        except Exception as e:
+            st.error(f"Error running tournament: {e}")
+
+    if st.session_state.tournament_results is not None:
+        tournament = st.session_state.tournament_results
+
+        st.markdown("### 🏆 Strategy Tournament")
+        st.caption(
+            f"{tournament['games']:,} games per matchup · seed {tournament['seed']} "
+            "(the same seed reproduces this matrix on any number of workers)"
+        )
+
+        best_row = int(np.argmax(tournament['win_rate'].min(axis=1)))
+        st.success(
+            f"🥇 Best worst-case strategy: **{tournament['strategies'][best_row]}** wins at least "
+            f"{tournament['win_rate'][best_row].min():.1%} against every referee policy"
+        )
+
+        show_heatmap(
+            tournament['win_rate'], tournament['strategies'], tournament['policies'],
+            "Player Win Rate\n(rows: strategies, columns: referee policies)",
+            figsize=(8, max(3, 0.6 * len(tournament['strategies']) + 1.5)),
+            xlabel="Referee policy", ylabel="Player strategy"
+        )
+
+        with st.expander("📋 Payoff matrix"):
+            payoff = pd.DataFrame(tournament['win_rate'], index=tournament['strategies'],
+                                  columns=tournament['policies'])
+            st.dataframe(payoff.style.format("{:.2%}"), use_container_width=True)
+            st.write("**Theoretical win probabilities:**")
+            theory = pd.DataFrame(tournament['expected'], index=tournament['strategies'],
+                                  columns=tournament['policies'])
+            st.dataframe(theory.style.format("{:.2%}"), use_container_width=True)
+
+    search_params = (search_weights, search_second_move, search_resolution, search_confirm_games, noise, seed)
+    track_job('search_job', search_params)
+
+    if st.session_state.run_search:
+        # The winner is always confirmed on Aer, never on the NumPy engine
+        search_backend = NoisyBackend(*noise) if noise else get_backend('aer')
+        if seed is not None:
+            search_backend = SeededBackend(search_backend, seed, get_result_store())
+        start_job(
+            'search_job', search_params, iter_strategy_search,
+            search_weights, search_second_move, search_resolution, search_confirm_games, search_backend,
+            None if seed is None else np.random.default_rng(seed)
+        )
+        st.session_state.run_search = False
+
+    job = wait_for_job(
+        'search_job',
+        "🧭 Searching for the optimal strategy...",
+        show_partial=lambda search: st.caption(
+            f"Best of {search['candidates']:,} candidates: {format_strategy(search['steps'])} · "
+            f"{search['games']:,} confirmation games played"
+        )
+    )
+    if job is not None:
+        try:
+            st.session_state.search_results = job.result()
+        except Exception as e:
+            st.error(f"Error searching for a strategy: {e}")
+
+    if st.session_state.search_results is not None:
+        search = st.session_state.search_results
+
+        st.markdown("### 🧭 Optimal Strategy")
+        st.caption(
+            f"{search['candidates']:,} candidate gates scored against I:X:H = "
+            f"{':'.join(f'{w:g}' for w in search['weights'])} · confirmed with: "
+            + ", ".join(METHOD_LABELS[method] for method in search['methods'])
+        )
+        st.code(format_strategy(search['steps']), language=None)
+
+        col_opt1, col_opt2, col_opt3 = st.columns(3)
+        with col_opt1:
+            st.metric("Exact Win Probability", f"{search['win_probability']:.2%}")
+        with col_opt2:
+            st.metric("Sampled Win Rate", f"{search['win_rate']:.2%}",
+                      delta=f"{search['win_rate'] - search['win_probability']:+.2%} vs exact", delta_color="off")
+        with col_opt3:
+            st.metric(f"{search['confidence']:.0%} Interval", f"{search['ci_low']:.2%} – {search['ci_high']:.2%}")
+
+        if search['ci_low'] <= search['win_probability'] <= search['ci_high']:
+            st.success(f"✅ {search['games']:,} sampled games agree with the exact win probability")
+        else:
+            st.warning(f"⚠️ The exact win probability lies outside the interval of {search['games']:,} sampled games")
+
+        move_labels = {'i': 'No Move (I)', 'x': 'Flip (X)', 'h': 'Superposition (H)'}
+        st.dataframe(
+            pd.DataFrame({
+                'Referee move': [move_labels[move] for move in REFEREE_MOVES],
+                'Exact': [search['move_probabilities'][move] for move in REFEREE_MOVES],
+                'Games': search['move_games'],
+                'Sampled': [wins / games if games else float('nan')
+                            for games, wins in zip(search['move_games'], search['move_wins'])]
+            }).style.format({'Exact': "{:.2%}", 'Sampled': "{:.2%}"}, na_rep="–"),
+            hide_index=True, use_container_width=True
+        )
 
 # Footer
 st.markdown("---")
@@ -330,4 +752,10 @@ st.markdown(
     "Built with Qiskit ⚛️ | Quantum Coin Game Simulator"
     "</div>",
     unsafe_allow_html=True
-)
\ No newline at end of file
+)
+
+# Load the heavy stack in the background now that the page is on screen
+warm_imports()
+
+# Record this rerun's timings and draw the Performance panel
+finish_rerun(perf)
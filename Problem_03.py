@@ -3,13 +3,41 @@
 # ==========================================
 
 import streamlit as st
-import qiskit
-from qiskit import QuantumCircuit
-from qiskit_aer import AerSimulator
-from qiskit.visualization import plot_histogram
-from qiskit.quantum_info import Statevector
-import matplotlib.pyplot as plt
-import numpy as np
+from quantum_sim.backends import BACKEND_NAMES, METHOD_LABELS, get_backend
+from quantum_sim.chart_panel import chart_style_toggle, show_heatmap, show_histogram
+from quantum_sim.bell import (
+    CLASSICAL_BOUND,
+    TSIRELSON_BOUND,
+    chsh_scan
+)
+from quantum_sim.correlations import (
+    CORE_SETTINGS,
+    ROTATIONS,
+    correlation_metrics,
+    iter_correlation,
+    iter_sweep
+)
+from quantum_sim.job_panel import start_job, track_job, wait_for_job
+from quantum_sim.jobs import single_step
+from quantum_sim.exact import get_exact_probabilities
+from quantum_sim.lazy import lazy_import, package_version, warm_imports
+from quantum_sim.multipair import (
+    MAX_GRAPH_QUBITS,
+    TOPOLOGIES,
+    cluster_labels,
+    cluster_mask,
+    iter_graph_correlations,
+    topology_edges
+)
+from quantum_sim.noise import MAX_ERROR_RATE, NOISY_MAX_QUBITS, NoisyBackend, noise_cache
+from quantum_sim.perf_panel import begin_rerun, finish_rerun
+from quantum_sim.render import render_cache, render_circuit
+from quantum_sim.resources import circuit_cache
+from quantum_sim.result_store import SeededBackend, get_result_store
+
+# Heavy modules load on first use so the page paints immediately
+np = lazy_import('numpy')
+pd = lazy_import('pandas')
 
 # Configure the page
 st.set_page_config(
@@ -18,6 +46,9 @@ st.set_page_config(
     layout="wide"
 )
 
+# Time every stage of this rerun for the Performance panel
+perf = begin_rerun()
+
 # Custom CSS for modern styling
 st.markdown("""
 <style>
@@ -98,14 +129,49 @@ st.markdown("""
 # Header
 st.markdown('<div class="main-header">🔗 Quantum Correlation Explorer</div>', unsafe_allow_html=True)
 
-# Initialize simulator
-sim = AerSimulator()
+# Display names for the rotation choices and core gate settings
+ROTATION_LABELS = {
+    "none": "No rotation",
+    "h": "Hadamard (H)",
+    "s": "Phase (S)",
+    "t": "T gate",
+    "x": "Pauli-X",
+    "y": "Pauli-Y",
+    "z": "Pauli-Z"
+}
+CORE_LABELS = {
+    (True, True): "H + CX (Bell state)",
+    (True, False): "H only",
+    (False, True): "CX only",
+    (False, False): "No core gates"
+}
+
 
 # Initialize session state
 if 'entanglement_results' not in st.session_state:
     st.session_state.entanglement_results = None
 if 'run_simulation' not in st.session_state:
     st.session_state.run_simulation = False
+if 'sweep_results' not in st.session_state:
+    st.session_state.sweep_results = None
+if 'run_sweep' not in st.session_state:
+    st.session_state.run_sweep = False
+if 'chsh_results' not in st.session_state:
+    st.session_state.chsh_results = None
+if 'run_chsh' not in st.session_state:
+    st.session_state.run_chsh = False
+if 'correlation_job' not in st.session_state:
+    st.session_state.correlation_job = None
+if 'sweep_job' not in st.session_state:
+    st.session_state.sweep_job = None
+if 'chsh_job' not in st.session_state:
+    st.session_state.chsh_job = None
+if 'graph_results' not in st.session_state:
+    st.session_state.graph_results = None
+if 'run_graph' not in st.session_state:
+    st.session_state.run_graph = False
+if 'graph_job' not in st.session_state:
+    st.session_state.graph_job = None
 
 # Sidebar for configuration
 with st.sidebar:
@@ -122,43 +188,154 @@ with st.sidebar:
     
     rotation_qubit0 = st.selectbox(
         "Rotation on Qubit 0:",
-        ["none", "h", "s", "t", "x", "y", "z"],
-        format_func=lambda x: {
-            "none": "No rotation",
-            "h": "Hadamard (H)",
-            "s": "Phase (S)",
-            "t": "T gate",
-            "x": "Pauli-X",
-            "y": "Pauli-Y", 
-            "z": "Pauli-Z"
-        }[x]
+        ROTATIONS,
+        format_func=ROTATION_LABELS.get
     )
     
     rotation_qubit1 = st.selectbox(
         "Rotation on Qubit 1:",
-        ["none", "h", "s", "t", "x", "y", "z"],
-        format_func=lambda x: {
-            "none": "No rotation",
-            "h": "Hadamard (H)",
-            "s": "Phase (S)",
-            "t": "T gate",
-            "x": "Pauli-X",
-            "y": "Pauli-Y",
-            "z": "Pauli-Z"
-        }[x]
+        ROTATIONS,
+        format_func=ROTATION_LABELS.get
     )
     
     st.markdown("---")
     st.markdown("#### 📊 Simulation Settings")
-    shots = st.slider("Number of Shots", 100, 5000, 1024, help="Number of measurement repetitions")
+    execution_mode = st.radio(
+        "Execution mode:",
+        ["sampled", "exact"],
+        format_func=lambda x: {
+            "sampled": "🎲 Sampled (simulator backend)",
+            "exact": "🎯 Exact (Statevector)"
+        }[x],
+        help="Exact mode computes the probabilities once and draws counts from them"
+    )
+    noise = None
+    if execution_mode == "sampled" and st.checkbox(
+        "🌫️ Simulate noise", help="Density-matrix simulation with gate and readout errors"
+    ):
+        backend_name = "noisy"
+        noise = (
+            st.slider("Depolarizing error per gate", 0.0, MAX_ERROR_RATE, 0.01, step=0.005, format="%.3f"),
+            st.slider("Amplitude damping per gate", 0.0, MAX_ERROR_RATE, 0.01, step=0.005, format="%.3f"),
+            st.slider("Readout error per qubit", 0.0, MAX_ERROR_RATE, 0.02, step=0.005, format="%.3f")
+        )
+    elif execution_mode == "sampled":
+        backend_name = st.selectbox(
+            "Simulator backend:",
+            BACKEND_NAMES,
+            format_func=lambda x: {
+                "auto": "⚡ Auto (NumPy for small circuits, Aer otherwise)",
+                "numpy": "🧮 NumPy state vector",
+                "aer": "🔬 Qiskit Aer"
+            }[x]
+        )
+    else:
+        backend_name = "auto"
+    backend = NoisyBackend(*noise) if noise else get_backend(backend_name)
+    seed = None
+    if st.checkbox(
+        "🔁 Seeded runs", help="The same seed draws the same shots; results are stored on disk and reused after restarts"
+    ):
+        seed = int(st.number_input("Simulation seed", min_value=0, value=42, step=1))
+        backend = SeededBackend(backend, seed, get_result_store())
+    max_shots = 1_000_000 if execution_mode == "exact" else 5000
+    shots = st.slider("Number of Shots", 100, max_shots, 1024, help="Number of measurement repetitions")
+    
+    chart_style_toggle()
     
     st.markdown("---")
     st.markdown("#### Qiskit Info")
-    st.write(f"🔬 Qiskit version: {qiskit.__version__}")
+    st.write(f"🔬 Qiskit version: {package_version('qiskit')}")
+    cache_stats = circuit_cache.stats()
+    st.write(f"♻️ Circuit cache: {cache_stats['hits']} hits / {cache_stats['misses']} misses")
+    render_stats = render_cache.stats()
+    st.write(f"🖼️ Render cache: {render_stats['hits']} hits / {render_stats['misses']} misses")
+    noise_stats = noise_cache.stats()
+    st.write(f"🌫️ Noise models: {noise_stats['hits']} hits / {noise_stats['misses']} misses")
+    if seed is not None:
+        # Only seeded runs use the store, so others never create or scan it
+        store_stats = get_result_store().stats()
+        st.write(
+            f"💾 Result store: {store_stats['hits']} hits / {store_stats['misses']} misses · "
+            f"{store_stats['bytes'] / 2 ** 20:.1f} MB"
+        )
     
     st.markdown("---")
     if st.button("🚀 Explore Quantum Correlations", use_container_width=True):
         st.session_state.run_simulation = True
+    
+    st.markdown("---")
+    st.markdown("#### 🧭 Configuration Sweep")
+    sweep_core = st.multiselect(
+        "Core gate settings:", CORE_SETTINGS, default=CORE_SETTINGS, format_func=CORE_LABELS.get
+    )
+    sweep_rotations0 = st.multiselect(
+        "Qubit 0 rotations:", ROTATIONS, default=ROTATIONS, format_func=ROTATION_LABELS.get
+    )
+    sweep_rotations1 = st.multiselect(
+        "Qubit 1 rotations:", ROTATIONS, default=ROTATIONS, format_func=ROTATION_LABELS.get
+    )
+    num_sweep_configs = len(sweep_core) * len(sweep_rotations0) * len(sweep_rotations1)
+    sweep_how = "evolved exactly" if execution_mode == "exact" else "sampled in one batched job"
+    st.caption(f"{num_sweep_configs} configurations, {sweep_how} with the settings above")
+    if st.button("🧭 Sweep Configurations", use_container_width=True, disabled=num_sweep_configs == 0):
+        st.session_state.run_sweep = True
+    
+    st.markdown("---")
+    st.markdown("#### 📐 Bell Test (CHSH)")
+    chsh_resolution = st.select_slider(
+        "Measurement angles per qubit",
+        options=[8, 16, 24, 32, 48, 64],
+        value=32,
+        help="ry(θ) angles sampled evenly over [0°, 360°) for each qubit"
+    )
+    chsh_phi0 = st.slider("Qubit 0 phase rz(φ₀) [°]", 0, 360, 0, step=15)
+    chsh_phi1 = st.slider("Qubit 1 phase rz(φ₁) [°]", 0, 360, 0, step=15)
+    st.caption(f"{chsh_resolution ** 2:,} angle pairs bound to one parameterized circuit")
+    if st.button("📐 Run CHSH Scan", use_container_width=True):
+        st.session_state.run_chsh = True
+    
+    st.markdown("---")
+    st.markdown("#### 🕸️ Entanglement Clusters")
+    graph_topology = st.selectbox(
+        "Topology:",
+        TOPOLOGIES,
+        format_func=lambda x: {
+            "pairs": "K Bell pairs (0-1, 2-3, ...)",
+            "ghz": "One GHZ state on every qubit",
+            "custom": "Custom GHZ clusters (edge list)"
+        }[x],
+        help="Each connected group of qubits becomes one GHZ state, so only which qubits are "
+             "connected matters, not which edges join them"
+    )
+    # Noisy runs hold a density matrix, so they stay narrow
+    max_graph_qubits = NOISY_MAX_QUBITS if noise else MAX_GRAPH_QUBITS
+    if graph_topology == "pairs":
+        graph_qubits = 2 * st.slider("Bell pairs (K)", 1, max_graph_qubits // 2, min(8, max_graph_qubits // 2))
+    else:
+        graph_qubits = st.slider("Qubits", 2, max_graph_qubits, min(16, max_graph_qubits))
+    graph_edge_text = ""
+    if graph_topology == "custom":
+        graph_edge_text = st.text_input(
+            "Edges", "0-1 1-2 3-4",
+            help="Qubit pairs such as 0-1, separated by spaces; connected qubits form one cluster"
+        )
+    graph_rotation = st.selectbox(
+        "Rotation on every qubit:", ROTATIONS, format_func=ROTATION_LABELS.get, key="graph_rotation"
+    )
+    graph_shots = st.select_slider(
+        "Graph shots", options=[1_000, 10_000, 100_000], value=10_000,
+        help="Shots are sampled as packed integers, so 10⁵ stays fast at 64 qubits"
+    )
+    graph_edges = None
+    try:
+        graph_edges = topology_edges(graph_topology, graph_qubits, graph_edge_text)
+        num_clusters = len(set(cluster_labels(graph_qubits, graph_edges)) - {-1})
+        st.caption(f"{num_clusters} GHZ cluster(s) on {graph_qubits} qubits → {graph_qubits ** 2:,} correlators")
+    except ValueError as e:
+        st.warning(str(e))
+    if st.button("🕸️ Map Pairwise Correlations", use_container_width=True, disabled=graph_edges is None):
+        st.session_state.run_graph = True
 
 # Main content area
 col1, col2 = st.columns([1, 2])
@@ -207,79 +384,45 @@ with col1:
         st.info("Additional rotations can modify entanglement and measurement probabilities")
 
 with col2:
+    # A run started with other settings is cancelled rather than finished
+    config = (apply_h0, apply_cx, rotation_qubit0, rotation_qubit1)
+    correlation_params = (config, shots, execution_mode, backend_name, noise, seed)
+    track_job('correlation_job', correlation_params)
+
     if st.session_state.run_simulation:
-        with st.spinner("🔄 Exploring quantum correlations..."):
-            try:
-                # Create quantum circuit
-                qc3 = QuantumCircuit(2, 2)
-
-                # Create Bell state (core entanglement)
-                if apply_h0:
-                    qc3.h(0)
-                if apply_cx:
-                    qc3.cx(0, 1)
-
-                # Apply additional rotations to qubit 0
-                if rotation_qubit0 != "none":
-                    if rotation_qubit0 == "h":
-                        qc3.h(0)
-                    elif rotation_qubit0 == "s":
-                        qc3.s(0)
-                    elif rotation_qubit0 == "t":
-                        qc3.t(0)
-                    elif rotation_qubit0 == "x":
-                        qc3.x(0)
-                    elif rotation_qubit0 == "y":
-                        qc3.y(0)
-                    elif rotation_qubit0 == "z":
-                        qc3.z(0)
-
-                # Apply additional rotations to qubit 1
-                if rotation_qubit1 != "none":
-                    if rotation_qubit1 == "h":
-                        qc3.h(1)
-                    elif rotation_qubit1 == "s":
-                        qc3.s(1)
-                    elif rotation_qubit1 == "t":
-                        qc3.t(1)
-                    elif rotation_qubit1 == "x":
-                        qc3.x(1)
-                    elif rotation_qubit1 == "y":
-                        qc3.y(1)
-                    elif rotation_qubit1 == "z":
-                        qc3.z(1)
-
-                qc3.measure([0, 1], [0, 1])
-
-                # Run simulation
-                job3 = sim.run(qc3, shots=shots)
-                result3 = job3.result()
-                counts3 = result3.get_counts()
-                
-                # Calculate correlation metrics
-                total = sum(counts3.values())
-                same_state_prob = (counts3.get('00', 0) + counts3.get('11', 0)) / total
-                diff_state_prob = (counts3.get('01', 0) + counts3.get('10', 0)) / total
-                
-                # Store results
-                st.session_state.entanglement_results = {
-                    'counts': counts3,
-                    'circuit': qc3,
-                    'shots': shots,
-                    'same_state_prob': same_state_prob,
-                    'diff_state_prob': diff_state_prob,
-                    'correlation_strength': abs(same_state_prob - diff_state_prob)
-                }
-                
-                st.session_state.run_simulation = False
-                
-            except Exception as e:
-                st.error(f"Error running entanglement simulation: {e}")
+        # Simulate in the background so the page stays responsive
+        start_job(
+            'correlation_job', correlation_params, iter_correlation,
+            config, shots, execution_mode, backend, None if seed is None else np.random.default_rng(seed)
+        )
+        st.session_state.run_simulation = False
+
+    job = wait_for_job(
+        'correlation_job',
+        "🔄 Exploring quantum correlations...",
+        show_partial=lambda partial: st.caption(
+            f"{partial['record'].shots:,} shots so far · same-state probability "
+            f"{partial['same_state_prob']:.1%}"
+        )
+    )
+    if job is not None:
+        try:
+            results3 = job.result()
+            results3['shots'] = shots
+            results3['noise'] = noise
+            results3['config'] = config
+
+            # Store results
+            st.session_state.entanglement_results = results3
+            
+        except Exception as e:
+            st.error(f"Error running entanglement simulation: {e}")
 
     if st.session_state.entanglement_results is not None:
         results = st.session_state.entanglement_results
         
         st.markdown("### 📊 Entanglement Results")
+        st.caption(f"⚙️ Simulated with: {METHOD_LABELS[results['method']]}")
         
         # Display correlation metrics
         col_metrics1, col_metrics2, col_metrics3 = st.columns(3)
@@ -292,47 +435,52 @@ with col2:
         
         with col_metrics3:
             correlation_strength = results['correlation_strength']
+            strength_delta = None
+            if results.get('noise'):
+                # Compare against the same circuit without noise
+                ideal = get_exact_probabilities(('correlation',) + results['config'], results['circuit'])
+                ideal_strength = correlation_metrics([ideal])[2][0]
+                strength_delta = f"{correlation_strength - ideal_strength:+.1%} vs ideal"
             if correlation_strength > 0.8:
-                st.metric("Correlation Strength", "Strong 🔗")
+                st.metric("Correlation Strength", "Strong 🔗", delta=strength_delta)
             elif correlation_strength > 0.5:
-                st.metric("Correlation Strength", "Medium 🔄")
+                st.metric("Correlation Strength", "Medium 🔄", delta=strength_delta)
             else:
-                st.metric("Correlation Strength", "Weak 🔀")
+                st.metric("Correlation Strength", "Weak 🔀", delta=strength_delta)
+        if results.get('noise'):
+            depolarizing, amplitude_damping, readout = results['noise']
+            st.caption(
+                f"🌫️ Noisy density-matrix run: depolarizing {depolarizing:.1%}, "
+                f"damping {amplitude_damping:.1%}, readout {readout:.1%}"
+            )
         
         # Display circuit
         st.markdown("#### 🔧 Quantum Circuit")
-        fig_circuit, ax_circuit = plt.subplots(figsize=(10, 4))
-        results['circuit'].draw('mpl', ax=ax_circuit)
-        ax_circuit.set_title("Quantum Correlation Circuit", fontsize=14, fontweight='bold')
-        plt.tight_layout()
-        st.pyplot(fig_circuit)
+        st.image(render_circuit(results['circuit'], "Quantum Correlation Circuit"), use_column_width=True)
         
         # Display results in columns
         col_results1, col_results2 = st.columns(2)
         
         with col_results1:
             st.markdown("#### 📈 Measurement Correlations")
-            fig_hist, ax_hist = plt.subplots(figsize=(8, 5))
-            plot_histogram(results['counts'], ax=ax_hist, color=['#ff6b6b', '#4ecdc4', '#45b7d1', '#96ceb4'])
-            ax_hist.set_title("Bell State Measurement Correlations", fontweight='bold')
-            ax_hist.grid(True, alpha=0.3)
-            plt.tight_layout()
-            st.pyplot(fig_hist)
+            show_histogram(results['record'].counts(), "Bell State Measurement Correlations")
             
         with col_results2:
             st.markdown("#### 🔍 Correlation Analysis")
             
             # State probabilities
-            st.markdown("**State Probabilities:**")
-            for state, count in sorted(results['counts'].items()):
-                percentage = (count / results['shots']) * 100
-                col_prob1, col_prob2, col_prob3 = st.columns([1, 2, 1])
-                with col_prob1:
-                    st.markdown(f"**|{state}⟩**")
-                with col_prob2:
-                    st.progress(percentage/100)
-                with col_prob3:
-                    st.markdown(f"**{percentage:.1f}%**")
+            if results.get('probabilities'):
+                st.markdown("**State Probabilities (exact):**")
+                state_fractions = results['probabilities']
+            else:
+                st.markdown("**State Probabilities:**")
+                state_fractions = {
+                    state: count / results['shots'] for state, count in results['record'].counts().items()
+                }
+            for state, fraction in sorted(state_fractions.items()):
+                percentage = fraction * 100
+                # Already inside two levels of columns, so label the bar instead
+                st.progress(percentage/100, text=f"**|{state}⟩** — **{percentage:.1f}%**")
             
             # Entanglement analysis
             st.markdown("#### 🧪 Entanglement Verification")
@@ -363,6 +511,213 @@ with col2:
                 st.write("- Missing core entanglement gates")
                 st.write("- Reduced quantum correlations")
 
+    # Keep the selection order so results reshape onto a grid
+    rotations0 = [r for r in ROTATIONS if r in sweep_rotations0]
+    rotations1 = [r for r in ROTATIONS if r in sweep_rotations1]
+    core_settings = [c for c in CORE_SETTINGS if c in sweep_core]
+    configs = [
+        core + (rotation0, rotation1)
+        for core in core_settings
+        for rotation0 in rotations0
+        for rotation1 in rotations1
+    ]
+    sweep_params = (tuple(configs), shots, execution_mode, backend_name, noise, seed)
+    track_job('sweep_job', sweep_params)
+
+    if st.session_state.run_sweep:
+        start_job('sweep_job', sweep_params, iter_sweep, configs, shots, execution_mode, backend)
+        st.session_state.run_sweep = False
+
+    job = wait_for_job(
+        'sweep_job',
+        "🧭 Sweeping gate configurations...",
+        show_partial=lambda outcome_matrix: st.caption(
+            f"{len(outcome_matrix)} of {len(configs)} configurations evaluated" if len(outcome_matrix)
+            else f"Compiling {len(configs)} circuits for one batched job"
+        )
+    )
+    if job is not None:
+        try:
+            outcome_matrix = job.result()
+            same_state_prob, diff_state_prob, correlation_strength = correlation_metrics(outcome_matrix)
+
+            st.session_state.sweep_results = {
+                'configs': configs,
+                'core_settings': core_settings,
+                'rotations0': rotations0,
+                'rotations1': rotations1,
+                'execution_mode': execution_mode,
+                'shots': shots,
+                'same_state_prob': same_state_prob,
+                'diff_state_prob': diff_state_prob,
+                'correlation_strength': correlation_strength
+            }
+
+        except Exception as e:
+            st.error(f"Error running configuration sweep: {e}")
+
+    chsh_params = (
+        apply_h0, apply_cx, chsh_resolution, chsh_phi0, chsh_phi1, shots, execution_mode, backend_name, noise, seed
+    )
+    track_job('chsh_job', chsh_params)
+
+    if st.session_state.run_chsh:
+        # The whole grid is one bound job, so it runs as a single step
+        start_job(
+            'chsh_job', chsh_params, single_step, chsh_scan,
+            chsh_resolution, np.radians(chsh_phi0), np.radians(chsh_phi1), shots,
+            execution_mode, backend, apply_h0, apply_cx
+        )
+        st.session_state.run_chsh = False
+
+    job = wait_for_job('chsh_job', "📐 Scanning measurement angles...")
+    if job is not None:
+        try:
+            st.session_state.chsh_results = job.result()
+
+        except Exception as e:
+            st.error(f"Error running CHSH scan: {e}")
+
+    if st.session_state.chsh_results is not None:
+        chsh = st.session_state.chsh_results
+
+        st.markdown("### 📐 CHSH Bell Test")
+        mode_label = "exact" if chsh['execution_mode'] == "exact" else f"{chsh['shots']} shots per angle pair"
+        st.caption(f"{chsh['correlators'].size:,} angle pairs from one parameterized circuit ({mode_label})")
+
+        col_chsh1, col_chsh2, col_chsh3 = st.columns(3)
+        with col_chsh1:
+            if chsh['textbook_s'] is not None:
+                st.metric("S at 0°/90°/45°/135°", f"{chsh['textbook_s']:.3f}")
+        with col_chsh2:
+            st.metric("Max |S| on grid", f"{abs(chsh['best_s']):.3f}")
+        with col_chsh3:
+            st.metric("Bounds (classical / quantum)", f"{CLASSICAL_BOUND:.0f} / {TSIRELSON_BOUND:.3f}")
+        if chsh['execution_mode'] != "exact":
+            st.caption("Sampled correlators carry shot noise, so the grid maximum of |S| is biased upward")
+
+        a, a_prime, b, b_prime = chsh['best_angles']
+        if abs(chsh['best_s']) > CLASSICAL_BOUND:
+            st.success(
+                f"✅ **Bell inequality violated**: |S| = {abs(chsh['best_s']):.3f} > 2 "
+                f"with a = {a:.0f}°, a' = {a_prime:.0f}°, b = {b:.0f}°, b' = {b_prime:.0f}°"
+            )
+        else:
+            st.warning("🔀 **No violation**: these correlations admit a local hidden-variable explanation")
+
+        angle_labels = [f"{angle:.0f}°" for angle in np.degrees(chsh['thetas'])]
+        show_heatmap(
+            chsh['correlators'], angle_labels, angle_labels,
+            "Correlator E(a, b)",
+            figsize=(7, 6), vmin=-1.0, vmax=1.0, cmap='coolwarm',
+            xlabel="Qubit 1 angle b", ylabel="Qubit 0 angle a"
+        )
+
+    graph_params = (graph_qubits, graph_edges, graph_rotation, graph_shots, backend_name, noise, seed)
+    track_job('graph_job', graph_params)
+
+    if st.session_state.run_graph:
+        start_job(
+            'graph_job', graph_params, iter_graph_correlations,
+            graph_qubits, graph_edges, graph_shots, graph_rotation, backend
+        )
+        st.session_state.run_graph = False
+
+    job = wait_for_job(
+        'graph_job',
+        "🕸️ Sampling the entanglement clusters...",
+        show_partial=lambda partial: st.caption(f"{partial['shots']:,} of {graph_shots:,} shots so far")
+    )
+    if job is not None:
+        try:
+            st.session_state.graph_results = dict(job.result(), rotation=graph_rotation, noise=noise)
+
+        except Exception as e:
+            st.error(f"Error mapping the entanglement clusters: {e}")
+
+    if st.session_state.graph_results is not None:
+        graph = st.session_state.graph_results
+        num_graph_qubits = graph['num_qubits']
+
+        st.markdown("### 🕸️ Entanglement Cluster Correlations")
+        st.caption(
+            f"{num_graph_qubits} qubits, {len(set(cluster_labels(num_graph_qubits, graph['edges'])) - {-1})} "
+            f"GHZ cluster(s), {graph['shots']:,} shots · "
+            f"⚙️ {METHOD_LABELS[graph['method']]}"
+        )
+
+        # Mean |⟨ZZ⟩| within the GHZ clusters against every other qubit pair
+        mask = cluster_mask(num_graph_qubits, graph['edges'])
+        off_diagonal = ~np.eye(num_graph_qubits, dtype=bool)
+        col_graph1, col_graph2, col_graph3 = st.columns(3)
+        with col_graph1:
+            if mask.any():
+                st.metric("Mean |⟨ZZ⟩| within clusters", f"{np.abs(graph['correlation'][mask]).mean():.3f}")
+        with col_graph2:
+            others = off_diagonal & ~mask
+            if others.any():
+                st.metric("Mean |⟨ZZ⟩| across clusters", f"{np.abs(graph['correlation'][others]).mean():.3f}")
+        with col_graph3:
+            st.metric("Mean |⟨Z⟩|", f"{np.abs(graph['magnetization']).mean():.3f}")
+
+        connected = st.checkbox(
+            "Connected correlations ⟨ZᵢZⱼ⟩ − ⟨Zᵢ⟩⟨Zⱼ⟩",
+            help="Removes correlation explained by each qubit's own bias, e.g. qubits left in |0⟩"
+        )
+        matrix = graph['connected'] if connected else graph['correlation']
+        qubit_labels = [str(qubit) for qubit in range(num_graph_qubits)]
+        size = min(12, 4 + num_graph_qubits / 8)
+        show_heatmap(
+            matrix, qubit_labels, qubit_labels,
+            "Connected ⟨ZᵢZⱼ⟩" if connected else "Pairwise ⟨ZᵢZⱼ⟩",
+            figsize=(size, size * 0.85), vmin=-1.0, vmax=1.0, cmap='coolwarm',
+            xlabel="Qubit j", ylabel="Qubit i"
+        )
+
+    if st.session_state.sweep_results is not None:
+        sweep = st.session_state.sweep_results
+        grid_shape = (len(sweep['core_settings']), len(sweep['rotations0']), len(sweep['rotations1']))
+
+        st.markdown("### 🧭 Configuration Sweep")
+        if sweep['execution_mode'] == "exact":
+            mode_label = "exact probabilities, evolved one by one"
+        else:
+            mode_label = f"{sweep['shots']} shots each, sampled in one batched job"
+        st.caption(f"{len(sweep['configs'])} configurations, {mode_label}")
+
+        strongest = int(np.argmax(sweep['correlation_strength']))
+        h0, cx, rotation0, rotation1 = sweep['configs'][strongest]
+        st.success(
+            f"Strongest correlation ({sweep['correlation_strength'][strongest]:.1%}): "
+            f"{CORE_LABELS[(h0, cx)]}, qubit 0 {ROTATION_LABELS[rotation0]}, qubit 1 {ROTATION_LABELS[rotation1]}"
+        )
+
+        # One heatmap of correlation strength per core gate setting
+        strength_grid = sweep['correlation_strength'].reshape(grid_shape)
+        row_labels = [r.upper() if r != "none" else "—" for r in sweep['rotations0']]
+        col_labels = [r.upper() if r != "none" else "—" for r in sweep['rotations1']]
+        sweep_tabs = st.tabs([CORE_LABELS[core] for core in sweep['core_settings']])
+        for tab, core, grid in zip(sweep_tabs, sweep['core_settings'], strength_grid):
+            with tab:
+                show_heatmap(
+                    grid, row_labels, col_labels,
+                    f"Correlation Strength – {CORE_LABELS[core]}\n(rows: qubit 0, columns: qubit 1)"
+                )
+
+        with st.expander("📋 All configurations"):
+            st.dataframe(
+                pd.DataFrame({
+                    'Core gates': [CORE_LABELS[config[:2]] for config in sweep['configs']],
+                    'Qubit 0': [ROTATION_LABELS[config[2]] for config in sweep['configs']],
+                    'Qubit 1': [ROTATION_LABELS[config[3]] for config in sweep['configs']],
+                    'Same state': sweep['same_state_prob'],
+                    'Different state': sweep['diff_state_prob'],
+                    'Correlation strength': sweep['correlation_strength']
+                }).sort_values('Correlation strength', ascending=False),
+                use_container_width=True,
+                hide_index=True
+            )
+
 # Footer
 st.markdown("---")
 st.markdown(
@@ -370,4 +725,10 @@ st.markdown(
     "Built with Qiskit ⚛️ | Quantum Correlation Explorer"
     "</div>",
     unsafe_allow_html=True
-)
\ No newline at end of file
+)
+
+# Load the heavy stack in the background now that the page is on screen
+warm_imports()
+
+# Record this rerun's timings and draw the Performance panel
+finish_rerun(perf)
@@ -0,0 +1 @@
+"""Shared simulation helpers for the Quantum Hackathon Streamlit apps."""
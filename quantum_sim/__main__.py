@@ -0,0 +1,5 @@
+import sys
+
+from quantum_sim.cli import main
+
+sys.exit(main())
@@ -0,0 +1,378 @@
+# ==========================================
+# Pluggable Simulation Backends
+# ==========================================
+"""Backends the apps run their circuits on.
+
+Every backend exposes ``run(circuit, shots, memory=False)`` and returns an
+object with ``get_counts()`` and ``get_memory()``, so the existing
+histogram and metric code works unchanged whichever engine ran the job.
+``run_batch(circuits, shots)`` runs many circuits together and
+``run_bound(template, parameter_binds, shots)`` runs one parameterized
+circuit for every set of bound values; both return one counts dict per
+experiment. ``sample(circuit, shots)`` returns the per-shot outcomes as
+a packed :class:`~quantum_sim.shots.ShotRecord`, skipping bitstrings
+altogether. ``method_for(circuit)`` names the simulation method a run of
+``circuit`` would use, for display. Every run method takes an optional
+``seed``; a seeded call draws the same shots every time.
+"""
+
+import functools
+import threading
+
+from quantum_sim.exact import sample_counts
+from quantum_sim.lazy import lazy_import
+from quantum_sim.resources import get_simulator, select_method
+from quantum_sim.shots import ShotRecord
+
+np = lazy_import('numpy')
+qiskit = lazy_import('qiskit')
+
+# Registers up to this width run on the dense NumPy engine in "auto" mode
+NUMPY_MAX_QUBITS = 8
+
+
+@functools.lru_cache(maxsize=None)
+def gate_matrices():
+    """Precomputed matrices for the gates used across the suite."""
+    sqrt_half = 1 / np.sqrt(2)
+    return {
+        'id': np.eye(2, dtype=complex),
+        'h': np.array([[1, 1], [1, -1]], dtype=complex) * sqrt_half,
+        'x': np.array([[0, 1], [1, 0]], dtype=complex),
+        'y': np.array([[0, -1j], [1j, 0]], dtype=complex),
+        'z': np.array([[1, 0], [0, -1]], dtype=complex),
+        's': np.array([[1, 0], [0, 1j]], dtype=complex),
+        't': np.array([[1, 0], [0, np.exp(1j * np.pi / 4)]], dtype=complex),
+        # Indexed as (control_out, target_out, control_in, target_in)
+        'cx': np.array([
+            [1, 0, 0, 0],
+            [0, 1, 0, 0],
+            [0, 0, 0, 1],
+            [0, 0, 1, 0]
+        ], dtype=complex).reshape(2, 2, 2, 2)
+    }
+
+
+class CountsResult:
+    """Minimal stand-in for an Aer ``Result`` holding one experiment."""
+
+    def __init__(self, counts, memory=None):
+        self._counts = counts
+        self._memory = memory
+
+    def get_counts(self, experiment=None):
+        return self._counts
+
+    def get_memory(self, experiment=None):
+        if self._memory is None:
+            raise ValueError("Memory was not requested for this run (use memory=True)")
+        return self._memory
+
+
+class AerBackend:
+    """Runs circuits on the shared ``AerSimulator``.
+
+    Each job uses the method :func:`select_method` picks from its gate set
+    and width, so Clifford circuits run on the stabilizer method.
+    """
+
+    name = 'aer'
+
+    def supports(self, circuit, allow_parameters=False):
+        return True
+
+    def method_for(self, circuit):
+        return select_method(circuit)
+
+    def run(self, circuit, shots, memory=False, seed=None):
+        return get_simulator().run(
+            circuit, shots=shots, memory=memory, method=select_method(circuit), **seed_options(seed)
+        ).result()
+
+    def sample(self, circuit, shots, seed=None):
+        result = get_simulator().run(
+            circuit, shots=shots, memory=True, method=select_method(circuit), **seed_options(seed)
+        ).result()
+        return ShotRecord.from_memory(result.data(0)['memory'], max(1, circuit.num_clbits))
+
+    def run_batch(self, circuits, shots, seed=None):
+        # One multi-experiment Aer job for the whole batch
+        circuits = list(circuits)
+        result = get_simulator().run(
+            circuits, shots=shots, method=select_method(circuits), **seed_options(seed)
+        ).result()
+        return [result.get_counts(index) for index in range(len(circuits))]
+
+    def run_bound(self, template, parameter_binds, shots, seed=None):
+        # Aer binds every value set itself, all inside one job
+        num_experiments = len(next(iter(parameter_binds.values())))
+        result = get_simulator().run(
+            template, shots=shots, parameter_binds=[parameter_binds], method=select_method(template),
+            **seed_options(seed)
+        ).result()
+        return [result.get_counts(index) for index in range(num_experiments)]
+
+
+class NumpyBackend:
+    """Dense state-vector engine for small registers.
+
+    Applies precomputed gate matrices (plus any bound single-qubit gate via
+    its ``to_matrix()``) and samples all shots with one vectorized draw.
+    Parameterized ``rx``/``ry``/``rz``/``p`` templates are evolved for every
+    bound value set at once, as a leading batch axis on the state.
+    Measurements must come after every gate on the measured qubit.
+    """
+
+    name = 'numpy'
+
+    def __init__(self, max_qubits=NUMPY_MAX_QUBITS, rng=None):
+        self.max_qubits = max_qubits
+        self.rng = np.random.default_rng() if rng is None else rng
+
+    def supports(self, circuit, allow_parameters=False):
+        if circuit.num_qubits > self.max_qubits:
+            return False
+        measured = set()
+        for instruction in circuit.data:
+            operation = instruction.operation
+            qubits = [circuit.find_bit(q).index for q in instruction.qubits]
+            if operation.name == 'measure':
+                measured.update(qubits)
+            elif operation.name == 'barrier':
+                continue
+            elif measured.intersection(qubits):
+                return False  # gate after a measurement on the same qubit
+            elif operation.name in gate_matrices() or _is_bound_single_qubit_gate(operation):
+                continue
+            elif not (allow_parameters and operation.name in PARAMETRIC_GATES):
+                return False
+        return True
+
+    def method_for(self, circuit):
+        return 'numpy_statevector'
+
+    def probabilities(self, circuit, parameter_binds=None):
+        """Return the outcome probabilities over the classical register.
+
+        With ``parameter_binds`` (``{parameter: values}``) the result has one
+        row per bound value set.
+        """
+        num_qubits = circuit.num_qubits
+        num_experiments = 1 if not parameter_binds else len(next(iter(parameter_binds.values())))
+
+        # Batch axis first, then qubit k on axis k + 1
+        state = np.zeros((num_experiments,) + (2,) * num_qubits, dtype=complex)
+        state[(slice(None),) + (0,) * num_qubits] = 1
+        measurements = []
+
+        for instruction in circuit.data:
+            operation = instruction.operation
+            qubits = [circuit.find_bit(q).index for q in instruction.qubits]
+            if operation.name == 'measure':
+                measurements.append((qubits[0], circuit.find_bit(instruction.clbits[0]).index))
+            elif operation.name == 'barrier':
+                continue
+            elif operation.is_parameterized():
+                angles = _bound_angles(operation.params[0], parameter_binds, num_experiments)
+                state = _apply_batched_gate(state, _parametric_matrices(operation.name, angles), qubits[0])
+            else:
+                state = _apply_gate(state, _gate_matrix(operation), [q + 1 for q in qubits])
+
+        # Little-endian basis index: reverse the qubit axes before flattening
+        basis_probabilities = np.abs(state.transpose([0] + list(range(num_qubits, 0, -1)))) ** 2
+        basis_probabilities = basis_probabilities.reshape(num_experiments, -1)
+
+        # Fold basis-state probabilities onto classical-register outcomes
+        basis = np.arange(2 ** num_qubits)
+        outcome = np.zeros_like(basis)
+        for qubit, clbit in measurements:
+            outcome |= ((basis >> qubit) & 1) << clbit
+        folded = np.zeros((num_experiments, 2 ** max(1, circuit.num_clbits)))
+        np.add.at(folded, (slice(None), outcome), basis_probabilities)
+        return folded if parameter_binds else folded[0]
+
+    def run(self, circuit, shots, memory=False, seed=None):
+        if not self.supports(circuit):
+            raise ValueError(
+                f"The NumPy backend supports up to {self.max_qubits} qubits, bound "
+                "single-qubit gates and cx, with measurements at the end"
+            )
+        if not memory:
+            return CountsResult(sample_counts(self.probabilities(circuit), shots, rng=self._rng(seed)))
+
+        num_bits = max(1, circuit.num_clbits)
+        outcomes = self._draw(circuit, shots, seed)
+        counts = {
+            format(index, f'0{num_bits}b'): int(count)
+            for index, count in enumerate(np.bincount(outcomes, minlength=2 ** num_bits))
+            if count
+        }
+        return CountsResult(counts, [format(index, f'0{num_bits}b') for index in outcomes])
+
+    def sample(self, circuit, shots, seed=None):
+        if not self.supports(circuit):
+            raise ValueError(f"The NumPy backend cannot run this circuit ({circuit.num_qubits} qubits)")
+        return ShotRecord.from_integers(self._draw(circuit, shots, seed), max(1, circuit.num_clbits))
+
+    def _draw(self, circuit, shots, seed=None):
+        # Shot-ordered outcome indices of the classical register
+        probabilities = self.probabilities(circuit)
+        return self._rng(seed).choice(probabilities.size, size=shots, p=probabilities / probabilities.sum())
+
+    def _rng(self, seed):
+        # A seeded call gets its own generator, so earlier calls cannot shift it
+        return self.rng if seed is None else np.random.default_rng(seed)
+
+    def run_batch(self, circuits, shots, seed=None):
+        rng = self._rng(seed)
+        circuits = list(circuits)
+        if not all(self.supports(circuit) for circuit in circuits):
+            raise ValueError(
+                f"The NumPy backend supports up to {self.max_qubits} qubits, bound "
+                "single-qubit gates and cx, with measurements at the end"
+            )
+        return [sample_counts(self.probabilities(circuit), shots, rng=rng) for circuit in circuits]
+
+    def run_bound(self, template, parameter_binds, shots, seed=None):
+        if not self.supports(template, allow_parameters=True):
+            raise ValueError("The NumPy backend cannot bind this template")
+        probabilities = self.probabilities(template, parameter_binds)
+
+        # One multinomial draw per bound value set, all in a single call
+        draws = self._rng(seed).multinomial(shots, probabilities / probabilities.sum(axis=1, keepdims=True))
+        num_bits = max(1, template.num_clbits)
+        labels = [format(index, f'0{num_bits}b') for index in range(draws.shape[1])]
+        return [
+            {label: int(count) for label, count in zip(labels, row) if count}
+            for row in draws
+        ]
+
+
+class DispatchingBackend:
+    """Uses the NumPy engine when it can, and Aer for everything else."""
+
+    name = 'auto'
+
+    def __init__(self, small=None, fallback=None):
+        self.small = NumpyBackend() if small is None else small
+        self.fallback = AerBackend() if fallback is None else fallback
+
+    def select(self, circuit):
+        return self.small if self.small.supports(circuit) else self.fallback
+
+    def supports(self, circuit, allow_parameters=False):
+        return True
+
+    def method_for(self, circuit):
+        return self.select(circuit).method_for(circuit)
+
+    def run(self, circuit, shots, memory=False, seed=None):
+        return self.select(circuit).run(circuit, shots, memory=memory, seed=seed)
+
+    def sample(self, circuit, shots, seed=None):
+        return self.select(circuit).sample(circuit, shots, seed=seed)
+
+    def run_batch(self, circuits, shots, seed=None):
+        # Keep the batch on one engine so Aer still gets a single job
+        circuits = list(circuits)
+        if all(self.small.supports(circuit) for circuit in circuits):
+            return self.small.run_batch(circuits, shots, seed=seed)
+        return self.fallback.run_batch(circuits, shots, seed=seed)
+
+    def run_bound(self, template, parameter_binds, shots, seed=None):
+        if self.small.supports(template, allow_parameters=True):
+            return self.small.run_bound(template, parameter_binds, shots, seed=seed)
+        return self.fallback.run_bound(template, parameter_binds, shots, seed=seed)
+
+
+BACKEND_NAMES = ['auto', 'numpy', 'aer']
+
+# Display names for the values of ``method_for``
+METHOD_LABELS = {
+    'stabilizer': 'Aer stabilizer (Clifford circuit)',
+    'statevector': 'Aer state vector',
+    'matrix_product_state': 'Aer matrix-product state',
+    'numpy_statevector': 'NumPy state vector',
+    'density_matrix': 'Aer density matrix (noisy)',
+    'exact': 'Exact Statevector'
+}
+
+# Rotation gates the NumPy engine can evaluate for a whole batch of angles
+PARAMETRIC_GATES = ('rx', 'ry', 'rz', 'p')
+
+_backends = {}
+_backends_lock = threading.Lock()
+
+
+def get_backend(name='auto'):
+    """Return the process-wide backend called ``name``."""
+    with _backends_lock:
+        if name not in _backends:
+            if name == 'auto':
+                _backends[name] = DispatchingBackend()
+            elif name == 'numpy':
+                _backends[name] = NumpyBackend()
+            elif name == 'aer':
+                _backends[name] = AerBackend()
+            else:
+                raise ValueError(f"Unknown backend: {name!r}")
+        return _backends[name]
+
+
+def seed_options(seed):
+    """Aer run options for ``seed`` (none when unseeded)."""
+    return {} if seed is None else {'seed_simulator': seed}
+
+
+def _is_bound_single_qubit_gate(operation):
+    return isinstance(operation, qiskit.circuit.Gate) and operation.num_qubits == 1 and not operation.is_parameterized()
+
+
+def _gate_matrix(operation):
+    matrix = gate_matrices().get(operation.name)
+    if matrix is None:
+        matrix = operation.to_matrix()
+    return matrix
+
+
+def _bound_angles(angle, parameter_binds, num_experiments):
+    """Values of one gate angle for every bound value set."""
+    if angle in parameter_binds:
+        return np.asarray(parameter_binds[angle], dtype=float)
+    # Expression of one or more parameters: evaluate it per value set
+    return np.array([
+        float(angle.bind({parameter: parameter_binds[parameter][index] for parameter in angle.parameters}))
+        for index in range(num_experiments)
+    ])
+
+
+def _parametric_matrices(name, angles):
+    """Stack of ``(len(angles), 2, 2)`` rotation matrices."""
+    cos, sin = np.cos(angles / 2), np.sin(angles / 2)
+    zero, one = np.zeros_like(angles), np.ones_like(angles)
+    if name == 'rx':
+        rows = [[cos, -1j * sin], [-1j * sin, cos]]
+    elif name == 'ry':
+        rows = [[cos, -sin], [sin, cos]]
+    elif name == 'rz':
+        rows = [[np.exp(-0.5j * angles), zero], [zero, np.exp(0.5j * angles)]]
+    else:  # 'p'
+        rows = [[one, zero], [zero, np.exp(1j * angles)]]
+    return np.stack([np.stack(row, -1) for row in rows], -2).astype(complex)
+
+
+def _apply_batched_gate(state, matrices, qubit):
+    """Apply one single-qubit matrix per batch entry to ``qubit``."""
+    state = np.moveaxis(state, qubit + 1, -1)
+    state = np.einsum('bij,b...j->b...i', matrices, state)
+    return np.moveaxis(state, -1, qubit + 1)
+
+
+def _apply_gate(state, matrix, axes):
+    """Apply a one- or two-qubit gate to the given axes of the state tensor."""
+    if len(axes) == 1:
+        state = np.tensordot(matrix, state, axes=([1], axes))
+        return np.moveaxis(state, 0, axes[0])
+
+    state = np.tensordot(matrix, state, axes=([2, 3], axes))
+    return np.moveaxis(state, [0, 1], axes)
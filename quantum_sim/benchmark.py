@@ -0,0 +1,320 @@
+# ==========================================
+# Benchmark Suite
+# ==========================================
+"""Timing benchmarks for each app's simulation pipeline.
+
+Run ``python -m quantum_sim.benchmark`` to time every stage of the three
+apps: circuit build, transpile, simulator run, counts post-processing and
+figure rendering. Run stages sweep shots from 100 to 10^6 and coin games
+from 1 to 10^6 (``--quick`` stops at 10^4).
+
+Each case is warmed up once, then timed ``--repeat`` times. Fast stages
+run in loops of at least ``--min-time`` seconds so timer resolution does
+not dominate. The median and interquartile range are reported.
+``--save-baseline`` writes the results as JSON. ``--compare`` checks a
+run against a saved baseline and exits non-zero when any case's median is
+more than ``--threshold`` slower.
+"""
+
+import argparse
+import json
+import platform
+import statistics
+import sys
+import time
+
+from quantum_sim.backends import BACKEND_NAMES, get_backend
+from quantum_sim.charts import chart_cache, histogram_figure
+from quantum_sim.coin_game import build_coin_circuit, play_coin_games, wins_by_referee_move
+from quantum_sim.communication import build_communication_circuit
+from quantum_sim.correlations import (
+    CORE_SETTINGS,
+    OUTCOMES,
+    ROTATIONS,
+    build_correlation_circuit,
+    correlation_metrics,
+    sweep_correlations
+)
+from quantum_sim.exact import exact_probabilities, sample_counts
+from quantum_sim.lazy import lazy_import, package_version
+from quantum_sim.render import render_cache, render_circuit, render_histogram
+from quantum_sim.qkd import run_bb84
+from quantum_sim.resources import get_target
+from quantum_sim.superdense import run_superdense
+
+np = lazy_import('numpy')
+qiskit = lazy_import('qiskit')
+
+SHOTS = (100, 1_000, 10_000, 100_000, 1_000_000)
+GAMES = (1, 10, 100, 1_000, 10_000, 100_000, 1_000_000)
+QUICK_LIMIT = 10_000
+
+# A 196-configuration sweep at 10^6 shots each takes minutes, so stop here
+MAX_SWEEP_SHOTS = 10_000
+
+# Distributions recorded with every run, so baselines show what changed
+VERSIONED_PACKAGES = ('qiskit', 'qiskit-aer', 'numpy', 'matplotlib', 'plotly')
+
+
+def communication_cases(backend, shots_sweep):
+    """Problem 1: Bell-pair circuit with Alice's Hadamard."""
+    qc = build_communication_circuit('h')
+    compiled = qiskit.transpile(qc, target=get_target())
+    probabilities = exact_probabilities(qc)
+
+    yield 'communication/build', lambda: build_communication_circuit('h')
+    yield 'communication/transpile', lambda: qiskit.transpile(qc, target=get_target())
+    for shots in shots_sweep:
+        result = backend.run(compiled, shots)
+        yield f'communication/run[shots={shots}]', lambda shots=shots: backend.run(compiled, shots)
+        yield f'communication/counts[shots={shots}]', lambda result=result: _count_percentages(result)
+        yield f'communication/sample_exact[shots={shots}]', lambda shots=shots: sample_counts(probabilities, shots)
+        record = backend.sample(compiled, shots)
+        yield f'communication/sample[shots={shots}]', lambda shots=shots: backend.sample(compiled, shots)
+        yield f'communication/record_counts[shots={shots}]', lambda record=record: record.counts()
+        # One Bell pair per shot: shots / 4 bytes of random payload
+        message = np.random.default_rng(0).bytes(max(1, shots // 4))
+        yield f'communication/superdense[pairs={shots}]', lambda message=message: run_superdense(message, backend)
+        yield f'communication/bb84[qubits={shots}]', lambda shots=shots: run_bb84(shots, 0.5, backend)
+
+    counts = backend.run(compiled, 1_000).get_counts()
+    yield 'communication/render_circuit', lambda: _uncached(render_circuit, qc, 'Quantum Communication Circuit')
+    yield 'communication/render_histogram', lambda: _uncached(render_histogram, counts, 'Measurement Outcomes')
+    yield 'communication/histogram_chart', (
+        lambda: _uncached(histogram_figure, counts, 'Measurement Outcomes').to_json()
+    )
+
+
+def coin_cases(backend, games_sweep):
+    """Problem 2: quantum strategy against random referee moves."""
+    rng = np.random.default_rng(0)
+    qc = build_coin_circuit('quantum', 'h')
+
+    yield 'coin/build', lambda: build_coin_circuit('quantum', 'h')
+    yield 'coin/transpile', lambda: qiskit.transpile(qc, target=get_target())
+    for num_games in games_sweep:
+        referee_codes, outcomes, _ = play_coin_games('quantum', num_games, backend, rng)
+        yield f'coin/play[games={num_games}]', (
+            lambda num_games=num_games: play_coin_games('quantum', num_games, backend, rng)
+        )
+        yield f'coin/tally[games={num_games}]', (
+            lambda referee_codes=referee_codes, outcomes=outcomes: (
+                np.count_nonzero(outcomes), wins_by_referee_move(referee_codes, outcomes)
+            )
+        )
+
+    yield 'coin/render_circuit', lambda: _uncached(render_circuit, qc, 'Game Circuit', figsize=(8, 3))
+
+
+def correlation_cases(backend, shots_sweep):
+    """Problem 3: Bell state with a Hadamard on qubit 0, plus full sweeps."""
+    config = (True, True, 'h', 'none')
+    qc = build_correlation_circuit(*config)
+    compiled = qiskit.transpile(qc, target=get_target())
+    configs = [core + (r0, r1) for core in CORE_SETTINGS for r0 in ROTATIONS for r1 in ROTATIONS]
+
+    yield 'correlations/build', lambda: build_correlation_circuit(*config)
+    yield 'correlations/transpile', lambda: qiskit.transpile(qc, target=get_target())
+    for shots in shots_sweep:
+        counts = backend.run(compiled, shots).get_counts()
+        yield f'correlations/run[shots={shots}]', lambda shots=shots: backend.run(compiled, shots)
+        yield f'correlations/metrics[shots={shots}]', (
+            lambda counts=counts: correlation_metrics([[counts.get(outcome, 0) for outcome in OUTCOMES]])
+        )
+        if shots <= MAX_SWEEP_SHOTS:
+            yield f'correlations/sweep[shots={shots}]', (
+                lambda shots=shots: sweep_correlations(configs, shots, 'sampled', backend)
+            )
+
+    counts = backend.run(compiled, 1_000).get_counts()
+    yield 'correlations/render_circuit', lambda: _uncached(render_circuit, qc, 'Quantum Correlation Circuit')
+    yield 'correlations/render_histogram', lambda: _uncached(render_histogram, counts, 'Correlation Results')
+
+
+SUITES = {
+    'communication': communication_cases,
+    'coin': coin_cases,
+    'correlations': correlation_cases
+}
+
+
+def time_case(func, repeat=5, min_time=0.05):
+    """Time ``func`` and return summary statistics in seconds per call.
+
+    After one warm-up call, the loop count is doubled until a loop takes at
+    least ``min_time``. Then ``repeat`` loops are timed.
+    """
+    func()
+    loops = 1
+    while True:
+        elapsed = _time_loop(func, loops)
+        if elapsed >= min_time or loops >= 1 << 20:
+            break
+        loops *= 2
+
+    samples = [_time_loop(func, loops) / loops for _ in range(repeat)]
+    quartiles = statistics.quantiles(samples, n=4) if len(samples) > 1 else [samples[0]] * 3
+    return {
+        'median': statistics.median(samples),
+        'min': min(samples),
+        'mean': statistics.fmean(samples),
+        'stdev': statistics.stdev(samples) if len(samples) > 1 else 0.0,
+        'iqr': quartiles[2] - quartiles[0],
+        'repeat': repeat,
+        'loops': loops
+    }
+
+
+def run_suite(apps, backend_name='aer', quick=False, repeat=5, min_time=0.05, name_filter=None, progress=None):
+    """Run the benchmark cases of ``apps`` and return ``{case: stats}``."""
+    backend = get_backend(backend_name)
+    limit = QUICK_LIMIT if quick else None
+    shots_sweep = [shots for shots in SHOTS if limit is None or shots <= limit]
+    games_sweep = [games for games in GAMES if limit is None or games <= limit]
+
+    results = {}
+    for app in apps:
+        sweep = games_sweep if app == 'coin' else shots_sweep
+        for name, func in SUITES[app](backend, sweep):
+            if name_filter and name_filter not in name:
+                continue
+            results[name] = time_case(func, repeat, min_time)
+            if progress is not None:
+                progress(name, results[name])
+    return results
+
+
+def environment(backend_name):
+    """Interpreter, platform and package versions recorded with a run."""
+    return {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'backend': backend_name,
+        'packages': {name: package_version(name) for name in VERSIONED_PACKAGES}
+    }
+
+
+def compare(results, baseline, threshold=0.25):
+    """Compare medians against a baseline.
+
+    Returns ``(name, baseline_median, median, ratio, status)`` rows, where
+    status is ``'slower'``, ``'faster'``, ``'ok'`` or ``'new'``.
+    """
+    rows = []
+    for name, stats in results.items():
+        reference = baseline['results'].get(name)
+        if reference is None:
+            rows.append((name, None, stats['median'], None, 'new'))
+            continue
+        ratio = stats['median'] / reference['median']
+        if ratio > 1 + threshold:
+            status = 'slower'
+        elif ratio < 1 / (1 + threshold):
+            status = 'faster'
+        else:
+            status = 'ok'
+        rows.append((name, reference['median'], stats['median'], ratio, status))
+    return rows
+
+
+def format_time(seconds):
+    """Seconds as a short human-readable duration."""
+    for unit, scale in (('s', 1), ('ms', 1e-3), ('us', 1e-6)):
+        if seconds >= scale:
+            return f'{seconds / scale:.3g} {unit}'
+    return f'{seconds / 1e-9:.3g} ns'
+
+
+def format_results(results):
+    lines = [f'{"case":<44} {"median":>10} {"iqr":>10} {"min":>10} {"loops":>7}']
+    for name, stats in results.items():
+        lines.append(
+            f'{name:<44} {format_time(stats["median"]):>10} {format_time(stats["iqr"]):>10} '
+            f'{format_time(stats["min"]):>10} {stats["loops"]:>7}'
+        )
+    return '\n'.join(lines)
+
+
+def format_comparison(rows, baseline, current):
+    lines = []
+    for package, version in current['packages'].items():
+        old_version = baseline['environment']['packages'].get(package)
+        if old_version != version:
+            lines.append(f'note: {package} {old_version} -> {version}')
+
+    lines.append(f'{"case":<44} {"baseline":>10} {"current":>10} {"ratio":>7}  status')
+    for name, reference, median, ratio, status in rows:
+        reference_text = format_time(reference) if reference is not None else '-'
+        ratio_text = f'{ratio:.2f}x' if ratio is not None else '-'
+        flag = '  <-- REGRESSION' if status == 'slower' else ''
+        lines.append(f'{name:<44} {reference_text:>10} {format_time(median):>10} {ratio_text:>7}  {status}{flag}')
+    return '\n'.join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('apps', nargs='*', help=f'apps to benchmark: {", ".join(SUITES)} (default: all)')
+    parser.add_argument('--backend', choices=BACKEND_NAMES, default='aer', help='backend used by run stages')
+    parser.add_argument('--quick', action='store_true', help=f'limit shots and games to {QUICK_LIMIT:,}')
+    parser.add_argument('--filter', help='only run cases whose name contains this text')
+    parser.add_argument('--repeat', type=int, default=5, help='timed repetitions per case')
+    parser.add_argument('--min-time', type=float, default=0.05, help='minimum seconds per timed loop')
+    parser.add_argument('--save-baseline', metavar='PATH', help='write results to this JSON file')
+    parser.add_argument('--compare', metavar='PATH', help='compare against this baseline JSON file')
+    parser.add_argument('--threshold', type=float, default=0.25,
+                        help='relative slowdown of the median flagged as a regression')
+    args = parser.parse_args(argv)
+    unknown = sorted(set(args.apps) - set(SUITES))
+    if unknown:
+        parser.error(f'unknown app(s): {", ".join(unknown)}')
+
+    apps = args.apps or list(SUITES)
+    results = run_suite(
+        apps, args.backend, args.quick, args.repeat, args.min_time, args.filter,
+        progress=lambda name, stats: print(f'{name}: {format_time(stats["median"])}', file=sys.stderr)
+    )
+    current = environment(args.backend)
+    print(format_results(results))
+
+    if args.save_baseline:
+        with open(args.save_baseline, 'w') as stream:
+            json.dump({'environment': current, 'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+                       'results': results}, stream, indent=2)
+        print(f'\nBaseline written to {args.save_baseline}')
+
+    if args.compare:
+        with open(args.compare) as stream:
+            baseline = json.load(stream)
+        rows = compare(results, baseline, args.threshold)
+        print()
+        print(format_comparison(rows, baseline, current))
+        regressions = [row for row in rows if row[4] == 'slower']
+        if regressions:
+            print(f'{len(regressions)} case(s) regressed by more than {args.threshold:.0%}', file=sys.stderr)
+            return 1
+    return 0
+
+
+def _time_loop(func, loops):
+    start = time.perf_counter()
+    for _ in range(loops):
+        func()
+    return time.perf_counter() - start
+
+
+def _count_percentages(result):
+    """The Problem 1 post-processing: counts and the share of each state."""
+    counts = result.get_counts()
+    total = sum(counts.values())
+    return {state: count / total for state, count in sorted(counts.items())}
+
+
+def _uncached(render, *args, **kwargs):
+    """Render with empty caches so the figure is actually drawn."""
+    render_cache.clear()
+    chart_cache.clear()
+    return render(*args, **kwargs)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
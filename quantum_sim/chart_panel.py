@@ -0,0 +1,69 @@
+# ==========================================
+# Chart Display in the Streamlit Apps
+# ==========================================
+"""Draw histograms, trend lines and heatmaps as interactive charts.
+
+Charts are Plotly figures from :mod:`quantum_sim.charts`, drawn in the
+browser. The sidebar toggle from :func:`chart_style_toggle` switches a
+session to the static Matplotlib images of :mod:`quantum_sim.render`
+instead. Either way the data is downsampled first, so the payload stays
+bounded for large outcome sets and long trends.
+"""
+
+import streamlit as st
+
+from quantum_sim.charts import (
+    block_average,
+    downsample_counts,
+    downsample_series,
+    heatmap_figure,
+    histogram_figure,
+    line_figure
+)
+from quantum_sim.render import render_heatmap, render_histogram, render_lines
+
+# Session-state key of the static-chart toggle
+STATIC_CHARTS_KEY = 'static_charts'
+
+
+def chart_style_toggle():
+    """Sidebar checkbox that switches this session to static Matplotlib charts."""
+    return st.checkbox(
+        "🖼️ Static Matplotlib charts",
+        key=STATIC_CHARTS_KEY,
+        help="Draws charts as server-rendered images instead of interactive Plotly charts"
+    )
+
+
+def static_charts():
+    return st.session_state.get(STATIC_CHARTS_KEY, False)
+
+
+def show_histogram(counts, title, figsize=(8, 5)):
+    """Histogram of ``counts``, showing at most :data:`~quantum_sim.charts.MAX_HISTOGRAM_BARS` bars."""
+    if static_charts():
+        st.image(render_histogram(downsample_counts(counts), title, figsize=figsize), use_column_width=True)
+    else:
+        st.plotly_chart(histogram_figure(counts, title), use_container_width=True)
+
+
+def show_lines(x, columns, title, xlabel=None, ylabel=None, figsize=(8, 4)):
+    """Trend lines of ``columns`` against ``x``, at most :data:`~quantum_sim.charts.MAX_LINE_POINTS` points each."""
+    if static_charts():
+        shown_x, shown = downsample_series(x, columns)
+        st.image(render_lines(shown_x, shown, title, figsize=figsize, xlabel=xlabel, ylabel=ylabel),
+                 use_column_width=True)
+    else:
+        st.plotly_chart(line_figure(x, columns, title, xlabel=xlabel, ylabel=ylabel), use_container_width=True)
+
+
+def show_heatmap(values, row_labels, col_labels, title, figsize=(6, 5), **options):
+    """Heatmap of a 2-D array, at most :data:`~quantum_sim.charts.MAX_HEATMAP_SIDE` cells a side.
+
+    ``options`` are ``vmin``, ``vmax``, ``cmap``, ``xlabel`` and ``ylabel``.
+    """
+    if static_charts():
+        shown, rows, cols = block_average(values, row_labels, col_labels)
+        st.image(render_heatmap(shown, rows, cols, title, figsize=figsize, **options), use_column_width=True)
+    else:
+        st.plotly_chart(heatmap_figure(values, row_labels, col_labels, title, **options), use_container_width=True)
@@ -0,0 +1,153 @@
+# ==========================================
+# Interactive Plotly Charts
+# ==========================================
+"""Histograms, trend lines and heatmaps as Plotly figures.
+
+The apps draw these client-side with ``st.plotly_chart`` instead of
+shipping a rasterized Matplotlib image on every rerun. What is sent to
+the browser is bounded however large the result: histograms keep their
+most frequent outcomes and fold the rest into one bar, trend lines are
+strided down to a fixed number of points and large heatmaps are averaged
+over blocks of cells. Figures are cached in a bounded LRU keyed on their
+data, as in :mod:`quantum_sim.render`. Nothing here imports Streamlit.
+"""
+
+from quantum_sim.lazy import lazy_import
+from quantum_sim.profiling import span
+from quantum_sim.render import HISTOGRAM_COLORS, MAX_ANNOTATED_CELLS
+from quantum_sim.resources import LRUCache
+
+go = lazy_import('plotly.graph_objects')
+np = lazy_import('numpy')
+
+# Built figures keyed on what was drawn
+chart_cache = LRUCache(maxsize=64)
+
+# Payload bounds: bars per histogram, points per line, cells per heatmap side
+MAX_HISTOGRAM_BARS = 64
+MAX_LINE_POINTS = 1_000
+MAX_HEATMAP_SIDE = 128
+
+# Matplotlib colormap names used by the apps, as Plotly colorscales
+COLORSCALES = {'viridis': 'Viridis', 'coolwarm': 'RdBu_r'}
+
+
+def downsample_counts(counts, max_bars=MAX_HISTOGRAM_BARS):
+    """Return ``counts`` with at most ``max_bars`` entries, in key order.
+
+    The ``max_bars - 1`` most frequent outcomes are kept and the others are
+    summed into a single ``'other (n)'`` entry placed last.
+    """
+    if len(counts) <= max_bars:
+        return dict(sorted(counts.items()))
+    ranked = sorted(counts.items(), key=lambda item: item[1], reverse=True)
+    kept, rest = ranked[:max_bars - 1], ranked[max_bars - 1:]
+    folded = dict(sorted(kept))
+    folded[f"other ({len(rest):,})"] = sum(count for _, count in rest)
+    return folded
+
+
+def downsample_series(x, columns, max_points=MAX_LINE_POINTS):
+    """Stride ``x`` and each array in ``columns`` to at most ``max_points``.
+
+    The last point is always kept so a trend ends on its latest value.
+    """
+    x = np.asarray(x)
+    if x.size <= max_points:
+        return x, {name: np.asarray(values) for name, values in columns.items()}
+    rows = np.unique(np.append(np.arange(0, x.size, -(-x.size // (max_points - 1))), x.size - 1))
+    return x[rows], {name: np.asarray(values)[rows] for name, values in columns.items()}
+
+
+def block_average(values, row_labels, col_labels, max_side=MAX_HEATMAP_SIDE):
+    """Average ``values`` over blocks until neither side exceeds ``max_side``.
+
+    Rows and columns get their own block sizes, so a side already within
+    ``max_side`` is left as it is. Each block is labelled with its first
+    and last row or column label.
+    """
+    values = np.asarray(values, dtype=float)
+    row_block, col_block = (max(1, -(-side // max_side)) for side in values.shape)
+    if row_block == col_block == 1:
+        return values, list(row_labels), list(col_labels)
+    rows, cols = -(-values.shape[0] // row_block) * row_block, -(-values.shape[1] // col_block) * col_block
+    padded = np.full((rows, cols), np.nan)
+    padded[:values.shape[0], :values.shape[1]] = values
+    averaged = np.nanmean(padded.reshape(rows // row_block, row_block, cols // col_block, col_block), axis=(1, 3))
+    return averaged, _block_labels(row_labels, row_block), _block_labels(col_labels, col_block)
+
+
+def histogram_figure(counts, title, color=HISTOGRAM_COLORS[0], max_bars=MAX_HISTOGRAM_BARS):
+    """Bar chart of ``counts`` labelled with probabilities, like ``plot_histogram``."""
+    def build():
+        shown = downsample_counts(counts, max_bars)
+        total = sum(counts.values()) or 1
+        probabilities = [count / total for count in shown.values()]
+        figure = go.Figure(go.Bar(
+            x=list(shown), y=list(shown.values()), marker_color=color,
+            text=[f"{probability:.3f}" for probability in probabilities], textposition='outside',
+            customdata=probabilities, hovertemplate="%{x}<br>%{y:,} shots (%{customdata:.2%})<extra></extra>"
+        ))
+        figure.update_layout(title=title.replace('\n', '<br>'), xaxis_title="Outcome", yaxis_title="Count",
+                             xaxis_type='category', margin=dict(t=60, b=40))
+        return figure
+
+    key = ('histogram', tuple(sorted(counts.items())), title, color, max_bars)
+    with span('render'):
+        return chart_cache.get(key, build)
+
+
+def line_figure(x, columns, title, xlabel=None, ylabel=None, max_points=MAX_LINE_POINTS):
+    """One line per entry of ``columns`` against ``x``, downsampled."""
+    def build():
+        shown_x, shown = downsample_series(x, columns, max_points)
+        figure = go.Figure([
+            go.Scatter(x=shown_x, y=values, mode='lines', name=name)
+            for name, values in shown.items()
+        ])
+        figure.update_layout(title=title.replace('\n', '<br>'), xaxis_title=xlabel, yaxis_title=ylabel,
+                             hovermode='x unified', margin=dict(t=60, b=40))
+        return figure
+
+    x_array = np.asarray(x)
+    key = ('line', x_array.tobytes(), tuple((name, np.asarray(values, dtype=float).tobytes())
+                                             for name, values in columns.items()),
+           title, xlabel, ylabel, max_points)
+    with span('render'):
+        return chart_cache.get(key, build)
+
+
+def heatmap_figure(values, row_labels, col_labels, title, vmin=0.0, vmax=1.0, cmap='viridis',
+                   xlabel=None, ylabel=None, max_side=MAX_HEATMAP_SIDE):
+    """Heatmap of a 2-D array, block-averaged past ``max_side`` cells a side.
+
+    Rows run top to bottom as in :func:`~quantum_sim.render.render_heatmap`.
+    Values are printed in the cells when the grid is small.
+    """
+    def build():
+        shown, rows, cols = block_average(values, row_labels, col_labels, max_side)
+        annotate = shown.size <= MAX_ANNOTATED_CELLS
+        figure = go.Figure(go.Heatmap(
+            z=shown, x=cols, y=rows, zmin=vmin, zmax=vmax, colorscale=COLORSCALES.get(cmap, cmap),
+            text=np.round(shown, 2) if annotate else None, texttemplate="%{text}" if annotate else None,
+            hovertemplate="%{y}, %{x}: %{z:.3f}<extra></extra>"
+        ))
+        figure.update_layout(title=title.replace('\n', '<br>'), xaxis_title=xlabel, yaxis_title=ylabel,
+                             xaxis_type='category', yaxis_type='category', margin=dict(t=80, b=40))
+        figure.update_yaxes(autorange='reversed')
+        return figure
+
+    values = np.asarray(values, dtype=float)
+    key = ('heatmap', values.shape, values.tobytes(), tuple(row_labels), tuple(col_labels),
+           title, vmin, vmax, cmap, xlabel, ylabel, max_side)
+    with span('render'):
+        return chart_cache.get(key, build)
+
+
+def _block_labels(labels, block):
+    labels = list(labels)
+    return [
+        labels[start] if start + 1 >= min(start + block, len(labels))
+        else f"{labels[start]}–{labels[min(start + block, len(labels)) - 1]}"
+        for start in range(0, len(labels), block)
+    ]
@@ -0,0 +1,388 @@
+# ==========================================
+# Headless Command-Line Runner
+# ==========================================
+"""Run the simulation core without Streamlit and emit JSON or CSV.
+
+Examples::
+
+    python -m quantum_sim communication --alice-op i x z h --shots 10000
+    python -m quantum_sim coin --strategy quantum classical --games 1000000 --seed 7
+    python -m quantum_sim correlations --sweep --mode exact --format csv -o sweep.csv
+    python -m quantum_sim correlations --depolarizing 0.02 --readout-error 0.01 --shots 10000
+    python -m quantum_sim correlations --sweep --shots 10000 --seed 7
+    python -m quantum_sim graph --topology pairs --qubits 64 --shots 100000 --format csv
+    python -m quantum_sim tournament --strategy quantum meyer "u(1.2,0,0) R h" --policy uniform 1:3:1
+    python -m quantum_sim search --policy uniform flip-heavy --second-move --games 100000
+    python -m quantum_sim superdense --random-bytes 1000000 --depolarizing 0.01
+    python -m quantum_sim bb84 --qubits 1000000 --eve 0 0.1 0.2 0.5 --format csv
+
+Every subcommand produces a list of flat rows, so JSON output is an array
+of objects and CSV output has one header line followed by one line per row.
+"""
+
+import argparse
+import csv
+import itertools
+import json
+import sys
+
+from quantum_sim.backends import BACKEND_NAMES, get_backend
+from quantum_sim.coin_game import (
+    PLAYER_STRATEGIES,
+    expected_win_rate,
+    play_coin_games,
+    wins_by_referee_move
+)
+from quantum_sim.communication import ALICE_OPS, EXECUTION_MODES, MAX_QUBITS, run_communication
+from quantum_sim.correlations import (
+    CORE_SETTINGS,
+    OUTCOMES,
+    ROTATIONS,
+    correlation_metrics,
+    sweep_correlations
+)
+from quantum_sim.lazy import lazy_import
+from quantum_sim.multipair import (
+    MAX_GRAPH_QUBITS,
+    TOPOLOGIES,
+    cluster_mask,
+    run_graph_correlations,
+    topology_edges
+)
+from quantum_sim.noise import NoisyBackend
+from quantum_sim.qkd import DEFAULT_QKD_QUBITS, DEFAULT_SAMPLE_FRACTION, EVE_PROBABILITIES, iter_key_rate_sweep
+from quantum_sim.result_store import SeededBackend, get_result_store
+from quantum_sim.strategy_search import DEFAULT_CONFIRM_GAMES, DEFAULT_SEARCH_RESOLUTION, iter_strategy_search
+from quantum_sim.superdense import MAX_MESSAGE_BYTES, run_superdense
+from quantum_sim.tournament import (
+    PLAYER_STRATEGY_PRESETS,
+    REFEREE_POLICIES,
+    format_strategy,
+    parse_policy,
+    parse_strategy,
+    run_tournament
+)
+
+np = lazy_import('numpy')
+
+# Command-line names for the (apply_h0, apply_cx) core settings
+CORE_NAMES = {'h-cx': (True, True), 'h': (True, False), 'cx': (False, True), 'none': (False, False)}
+
+# Backend used when --backend is not given, by subcommand
+DEFAULT_BACKENDS = {'search': 'aer'}
+
+
+def communication_rows(alice_ops, shots, execution_mode, backend, rng=None, num_qubits=2):
+    """One row per (Alice operation, outcome) with counts and frequencies.
+
+    Two-qubit runs list every outcome; wider GHZ runs list the observed ones.
+    """
+    rows = []
+    for alice_op in alice_ops:
+        results = run_communication(alice_op, shots, execution_mode, backend, rng, num_qubits)
+        counts = results['record'].counts()
+        probabilities = results['probabilities'] or {}
+        outcomes = OUTCOMES if num_qubits == 2 else sorted(set(counts) | set(probabilities))
+        for outcome in outcomes:
+            count = counts.get(outcome, 0)
+            rows.append({
+                'alice_op': alice_op,
+                'outcome': outcome,
+                'count': count,
+                'frequency': count / shots,
+                'probability': probabilities.get(outcome),
+                'method': results['method']
+            })
+    return rows
+
+
+def coin_rows(strategies, num_games, backend, rng=None):
+    """One row per strategy with overall and per-referee-move win rates."""
+    rows = []
+    for player_strategy in strategies:
+        referee_codes, outcomes, _ = play_coin_games(player_strategy, num_games, backend, rng)
+        wins = int(num_games - np.count_nonzero(outcomes))
+        row = {
+            'strategy': player_strategy,
+            'games': num_games,
+            'wins': wins,
+            'win_rate': wins / num_games,
+            'expected_win_rate': expected_win_rate(player_strategy)
+        }
+        for referee_move, (move_games, move_wins) in wins_by_referee_move(referee_codes, outcomes).items():
+            row[f'win_rate_vs_{referee_move}'] = move_wins / move_games if move_games else None
+        rows.append(row)
+    return rows
+
+
+def correlation_rows(configs, shots, execution_mode, backend):
+    """One row per gate configuration, evaluated as a single batch."""
+    outcome_matrix = sweep_correlations(configs, shots, execution_mode, backend)
+    same_state_prob, diff_state_prob, correlation_strength = correlation_metrics(outcome_matrix)
+
+    rows = []
+    for index, (apply_h0, apply_cx, rotation_qubit0, rotation_qubit1) in enumerate(configs):
+        row = {
+            'apply_h0': apply_h0,
+            'apply_cx': apply_cx,
+            'rotation_qubit0': rotation_qubit0,
+            'rotation_qubit1': rotation_qubit1
+        }
+        for outcome, value in zip(OUTCOMES, outcome_matrix[index]):
+            row[f'p{outcome}' if execution_mode == 'exact' else f'count{outcome}'] = value.item()
+        row.update({
+            'same_state_prob': float(same_state_prob[index]),
+            'diff_state_prob': float(diff_state_prob[index]),
+            'correlation_strength': float(correlation_strength[index])
+        })
+        rows.append(row)
+    return rows
+
+
+def graph_rows(num_qubits, edges, shots, rotation, backend):
+    """One row per qubit pair ``i < j`` of the cluster correlation matrix."""
+    results = run_graph_correlations(num_qubits, edges, shots, rotation, backend)
+    same_cluster = cluster_mask(num_qubits, edges)
+
+    rows = []
+    for i, j in itertools.combinations(range(num_qubits), 2):
+        rows.append({
+            'qubit_i': i,
+            'qubit_j': j,
+            'same_cluster': bool(same_cluster[i, j]),
+            'correlation': float(results['correlation'][i, j]),
+            'connected': float(results['connected'][i, j]),
+            'method': results['method']
+        })
+    return rows
+
+
+def tournament_rows(strategy_specs, policy_specs, num_games, workers=None, seed=None):
+    """One row per (strategy, policy) matchup of the payoff matrix."""
+    strategies = {spec: parse_strategy(spec) for spec in strategy_specs}
+    policies = {spec: parse_policy(spec) for spec in policy_specs}
+    results = run_tournament(strategies, policies, num_games, workers, seed)
+
+    rows = []
+    for row, strategy in enumerate(results['strategies']):
+        for col, policy in enumerate(results['policies']):
+            rows.append({
+                'strategy': strategy,
+                'policy': policy,
+                'games': num_games,
+                'wins': int(results['wins'][row, col]),
+                'win_rate': float(results['win_rate'][row, col]),
+                'expected_win_rate': float(results['expected'][row, col]),
+                'seed': results['seed']
+            })
+    return rows
+
+
+def search_rows(policy_specs, second_move, resolution, num_games, backend, rng=None):
+    """One row per referee policy: the best strategy found and its confirmation."""
+    rows = []
+    for spec in policy_specs:
+        results = None
+        for _, results in iter_strategy_search(parse_policy(spec), second_move, resolution, num_games, backend, rng):
+            pass
+        rows.append({
+            'policy': spec,
+            'strategy': format_strategy(results['steps']),
+            'candidates': results['candidates'],
+            'expected_win_rate': results['win_probability'],
+            'games': results['games'],
+            'wins': results['wins'],
+            'win_rate': results['win_rate'],
+            'ci_low': results['ci_low'],
+            'ci_high': results['ci_high'],
+            'methods': ' '.join(results['methods'])
+        })
+    return rows
+
+
+def superdense_rows(message, backend):
+    """One row summarizing a superdense-coding transfer of ``message``."""
+    results = run_superdense(message, backend)
+    return [{
+        'bytes': len(message),
+        'bell_pairs': results['bits'] // 2,
+        'bits': results['bits'],
+        'bit_errors': results['bit_errors'],
+        'bit_error_rate': results['bit_error_rate'],
+        'seconds': results['elapsed'],
+        'bits_per_second': results['throughput'],
+        'methods': ' '.join(results['methods'])
+    }]
+
+
+def bb84_rows(num_qubits, eve_probabilities, backend, rng=None, sample_fraction=DEFAULT_SAMPLE_FRACTION):
+    """One row per eavesdropping probability of a BB84 key-rate sweep."""
+    sweep = None
+    for _, sweep in iter_key_rate_sweep(num_qubits, eve_probabilities, backend, rng, sample_fraction):
+        pass
+    columns = ('qber', 'qber_estimate', 'key_rate', 'expected_qber', 'expected_key_rate')
+    return [
+        {
+            'qubits': num_qubits,
+            'eve_probability': eve_probability,
+            **{name: sweep[name][point] for name in columns},
+            'methods': ' '.join(sweep['methods'])
+        }
+        for point, eve_probability in enumerate(sweep['eve_probabilities'])
+    ]
+
+
+def write_rows(rows, output_format, stream):
+    """Write rows to ``stream`` as a JSON array or as CSV with a header."""
+    if output_format == 'json':
+        json.dump(rows, stream, indent=2)
+        stream.write('\n')
+        return
+
+    writer = csv.DictWriter(stream, fieldnames=list(rows[0]) if rows else [], lineterminator='\n')
+    writer.writeheader()
+    writer.writerows(rows)
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='python -m quantum_sim', description=__doc__.splitlines()[0])
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument('--seed', type=int,
+                        help='seed for the simulator, referee moves and exact-mode sampling (makes runs reproducible)')
+    common.add_argument('--format', choices=['json', 'csv'], default='json', help='output format')
+    common.add_argument('-o', '--output', help='write to this file instead of stdout')
+
+    simulated = argparse.ArgumentParser(add_help=False, parents=[common])
+    simulated.add_argument('--backend', choices=BACKEND_NAMES,
+                           help='simulator backend (default: aer for search, auto otherwise)')
+    simulated.add_argument('--depolarizing', type=float, default=0.0,
+                           help='depolarizing error per gate (any noise option runs on the noisy simulator)')
+    simulated.add_argument('--amplitude-damping', type=float, default=0.0, help='amplitude damping per gate')
+    simulated.add_argument('--readout-error', type=float, default=0.0, help='readout error per qubit')
+    simulated.add_argument('--no-store', action='store_true',
+                           help='with --seed, do not read or write the on-disk result store')
+
+    communication = subparsers.add_parser('communication', parents=[simulated],
+                                          help="Bell-pair measurements for Alice's operations")
+    communication.add_argument('--alice-op', nargs='+', choices=ALICE_OPS, default=ALICE_OPS)
+    communication.add_argument('--shots', type=int, default=1000)
+    communication.add_argument('--mode', choices=EXECUTION_MODES, default='sampled')
+    communication.add_argument('--qubits', type=int, default=2,
+                               help=f'GHZ width, up to {MAX_QUBITS} (Clifford, so simulated with stabilizers)')
+
+    coin = subparsers.add_parser('coin', parents=[simulated], help='play coin games for each strategy')
+    coin.add_argument('--strategy', nargs='+', choices=PLAYER_STRATEGIES, default=PLAYER_STRATEGIES)
+    coin.add_argument('--games', type=int, default=1000)
+
+    correlations = subparsers.add_parser('correlations', parents=[simulated],
+                                         help='correlation metrics for gate configurations')
+    correlations.add_argument('--core', nargs='+', choices=list(CORE_NAMES), default=['h-cx'])
+    correlations.add_argument('--rotation0', nargs='+', choices=ROTATIONS, default=['none'])
+    correlations.add_argument('--rotation1', nargs='+', choices=ROTATIONS, default=['none'])
+    correlations.add_argument('--sweep', action='store_true', help='every core setting and rotation pair')
+    correlations.add_argument('--shots', type=int, default=1000)
+    correlations.add_argument('--mode', choices=EXECUTION_MODES, default='sampled')
+
+    graph = subparsers.add_parser('graph', parents=[simulated],
+                                  help='pairwise <ZZ> matrix of Bell pairs or GHZ clusters')
+    graph.add_argument('--topology', choices=TOPOLOGIES, default='pairs')
+    graph.add_argument('--qubits', type=int, default=8, help=f'register width, up to {MAX_GRAPH_QUBITS}')
+    graph.add_argument('--edges', default='',
+                       help='custom edges such as "0-1 1-2 4-5"; each connected component is one GHZ cluster')
+    graph.add_argument('--rotation', choices=ROTATIONS, default='none', help='rotation on every qubit')
+    graph.add_argument('--shots', type=int, default=10_000)
+
+    tournament = subparsers.add_parser('tournament', parents=[common],
+                                       help='payoff matrix of player strategies against referee policies')
+    tournament.add_argument('--strategy', nargs='+', default=list(PLAYER_STRATEGY_PRESETS),
+                            help='preset name or steps such as "h R h" (R is the referee\'s turn)')
+    tournament.add_argument('--policy', nargs='+', default=list(REFEREE_POLICIES),
+                            help='preset name or I:X:H weights such as 1:2:1')
+    tournament.add_argument('--games', type=int, default=100_000, help='games per matchup')
+    tournament.add_argument('--workers', type=int, help='worker processes (default: in-process unless the tournament is large)')
+
+    search = subparsers.add_parser('search', parents=[simulated],
+                                   help='best u(θ, φ, λ) strategy against referee policies, confirmed by sampling')
+    search.add_argument('--policy', nargs='+', default=['uniform'],
+                        help='preset name or I:X:H weights such as 1:2:1')
+    search.add_argument('--second-move', action='store_true', help='also play a gate after the referee\'s move')
+    search.add_argument('--resolution', type=int, default=DEFAULT_SEARCH_RESOLUTION,
+                        help='first-pass grid points per angle')
+    search.add_argument('--games', type=int, default=DEFAULT_CONFIRM_GAMES, help='sampled confirmation games')
+
+    superdense = subparsers.add_parser('superdense', parents=[simulated],
+                                       help='send a message two bits per Bell pair; report bit errors and throughput')
+    payload = superdense.add_mutually_exclusive_group(required=True)
+    payload.add_argument('--message', help='text to send (UTF-8)')
+    payload.add_argument('--random-bytes', type=int, help=f'send this many random bytes, up to {MAX_MESSAGE_BYTES:,}')
+
+    bb84 = subparsers.add_parser('bb84', parents=[simulated],
+                                 help='BB84 secure key rate against an intercept-resend eavesdropper')
+    bb84.add_argument('--qubits', type=int, default=DEFAULT_QKD_QUBITS, help='qubits sent per run')
+    bb84.add_argument('--eve', type=float, nargs='+', default=EVE_PROBABILITIES,
+                      help='probabilities that Eve intercepts a qubit, one run each')
+    bb84.add_argument('--sample-fraction', type=float, default=DEFAULT_SAMPLE_FRACTION,
+                      help='share of the sifted key disclosed to estimate the QBER')
+    return parser
+
+
+def simulation_rows(args):
+    """Rows for the subcommands that run circuits on a backend."""
+    noise = (args.depolarizing, args.amplitude_damping, args.readout_error)
+    backend_name = args.backend or DEFAULT_BACKENDS.get(args.command, 'auto')
+    backend = NoisyBackend(*noise) if any(noise) else get_backend(backend_name)
+    if args.seed is not None:
+        backend = SeededBackend(backend, args.seed, None if args.no_store else get_result_store())
+    rng = np.random.default_rng(args.seed)
+
+    if args.command == 'communication':
+        return communication_rows(args.alice_op, args.shots, args.mode, backend, rng, args.qubits)
+    if args.command == 'coin':
+        return coin_rows(args.strategy, args.games, backend, rng)
+    if args.command == 'graph':
+        edges = topology_edges(args.topology, args.qubits, args.edges)
+        return graph_rows(args.qubits, edges, args.shots, args.rotation, backend)
+    if args.command == 'search':
+        return search_rows(args.policy, args.second_move, args.resolution, args.games, backend, rng)
+    if args.command == 'bb84':
+        return bb84_rows(args.qubits, args.eve, backend, rng, args.sample_fraction)
+    if args.command == 'superdense':
+        message = args.message.encode('utf-8') if args.message is not None else rng.bytes(args.random_bytes)
+        return superdense_rows(message, backend)
+
+    if args.sweep:
+        core_settings, rotations0, rotations1 = CORE_SETTINGS, ROTATIONS, ROTATIONS
+    else:
+        core_settings = [CORE_NAMES[name] for name in args.core]
+        rotations0, rotations1 = args.rotation0, args.rotation1
+    configs = [
+        core + (rotation_qubit0, rotation_qubit1)
+        for core, rotation_qubit0, rotation_qubit1 in itertools.product(core_settings, rotations0, rotations1)
+    ]
+    return correlation_rows(configs, args.shots, args.mode, backend)
+
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+
+    try:
+        if args.command == 'tournament':
+            rows = tournament_rows(args.strategy, args.policy, args.games, args.workers, args.seed)
+        else:
+            rows = simulation_rows(args)
+    except ValueError as error:
+        parser.error(str(error))
+
+    if args.output:
+        with open(args.output, 'w', newline='') as stream:
+            write_rows(rows, args.format, stream)
+    else:
+        write_rows(rows, args.format, sys.stdout)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,225 @@
+# ==========================================
+# Quantum Coin Game Core
+# ==========================================
+"""Coin-game circuits, batched play and win-rate estimation for Problem 2.
+
+Games are played in bulk: referee moves are drawn as small-int codes and
+each distinct circuit runs once with one shot per game. Nothing here
+imports Streamlit.
+"""
+
+from quantum_sim.exact import get_exact_probabilities
+from quantum_sim.jobs import MIN_CHUNK_GAMES, split_work
+from quantum_sim.lazy import lazy_import
+from quantum_sim.profiling import span
+from quantum_sim.resources import get_compiled_circuit
+from quantum_sim.stats import wilson_interval
+
+np = lazy_import('numpy')
+qiskit = lazy_import('qiskit')
+
+# Referee moves, indexed by the small-int codes used for batched games
+REFEREE_MOVES = ['i', 'x', 'h']
+
+# Player strategies: Hadamard before the referee's move, or nothing
+PLAYER_STRATEGIES = ['quantum', 'classical']
+
+# Streaming estimator: first chunk size, game budget, and the number of
+# games before the interval may be tested against the theoretical value
+STREAM_FIRST_CHUNK = 100
+STREAM_MAX_GAMES = 10_000_000
+STREAM_MIN_SEPARATION_GAMES = 1_000
+
+
+def build_coin_circuit(player_strategy, referee_move):
+    """Build the one-qubit coin circuit for a strategy and referee move."""
+    qc = qiskit.QuantumCircuit(1, 1)
+
+    # Player's move
+    if player_strategy == "quantum":
+        qc.h(0)  # Apply Hadamard for quantum strategy
+
+    # Referee's move
+    if referee_move == 'x':
+        qc.x(0)
+    elif referee_move == 'h':
+        qc.h(0)
+    # 'i' does nothing (identity)
+
+    # Measure the coin
+    qc.measure(0, 0)
+    return qc
+
+
+def coin_circuit(player_strategy, referee_move):
+    """The logical coin circuit, built once and then served from the cache."""
+    qc, _ = get_compiled_circuit(
+        ('coin', player_strategy, referee_move),
+        lambda: build_coin_circuit(player_strategy, referee_move)
+    )
+    return qc
+
+
+def play_coin_games(player_strategy, num_games, backend, rng=None):
+    """Play ``num_games`` coin games in at most one backend run per referee move.
+
+    All referee moves are drawn up front, games are grouped by the circuit
+    they need and every distinct circuit runs once with one shot per game.
+    Returns the referee move codes, the per-game outcomes (1 = Tails) and
+    the circuit used for each referee move.
+    """
+    rng = np.random.default_rng() if rng is None else rng
+    referee_codes = rng.integers(len(REFEREE_MOVES), size=num_games, dtype=np.uint8)
+    outcomes = np.zeros(num_games, dtype=np.uint8)
+    circuits = {}
+
+    for code, referee_move in enumerate(REFEREE_MOVES):
+        game_index = np.flatnonzero(referee_codes == code)
+        if game_index.size == 0:
+            continue
+
+        qc, compiled = get_compiled_circuit(
+            ('coin', player_strategy, referee_move),
+            lambda: build_coin_circuit(player_strategy, referee_move)
+        )
+        with span('simulate'):
+            record = backend.sample(compiled, int(game_index.size))
+
+        # Shot k of this circuit is the outcome of the k-th game in the group
+        with span('counts'):
+            outcomes[game_index] = record.bits()[:, 0]
+        circuits[referee_move] = qc
+
+    return referee_codes, outcomes, circuits
+
+
+def iter_coin_games(player_strategy, num_games, backend, rng=None):
+    """:func:`play_coin_games` in chunks, yielding ``(fraction, games)``.
+
+    ``games`` is ``(referee_codes, outcomes, circuits)`` for the games
+    played so far, as views into arrays sized for the whole run.
+    """
+    rng = np.random.default_rng() if rng is None else rng
+    referee_codes = np.zeros(num_games, dtype=np.uint8)
+    outcomes = np.zeros(num_games, dtype=np.uint8)
+    circuits = {}
+    done = 0
+
+    for chunk in split_work(num_games, minimum=MIN_CHUNK_GAMES):
+        chunk_codes, chunk_outcomes, chunk_circuits = play_coin_games(player_strategy, chunk, backend, rng)
+        referee_codes[done:done + chunk] = chunk_codes
+        outcomes[done:done + chunk] = chunk_outcomes
+        circuits.update(chunk_circuits)
+        done += chunk
+        yield done / num_games, (referee_codes[:done], outcomes[:done], dict(circuits))
+
+
+def wins_by_referee_move(referee_codes, outcomes):
+    """Games and wins against each referee move as ``{move: (games, wins)}``."""
+    games = np.bincount(referee_codes, minlength=len(REFEREE_MOVES))
+    losses = np.bincount(referee_codes, weights=outcomes, minlength=len(REFEREE_MOVES))
+    return {
+        referee_move: (int(games[code]), int(games[code] - losses[code]))
+        for code, referee_move in enumerate(REFEREE_MOVES)
+    }
+
+
+def win_probabilities(player_strategy):
+    """Exact probability of Heads (a win) against each referee move."""
+    probabilities = {}
+    for referee_move in REFEREE_MOVES:
+        probabilities[referee_move] = float(get_exact_probabilities(
+            ('coin', player_strategy, referee_move), coin_circuit(player_strategy, referee_move)
+        )[0])
+    return probabilities
+
+
+def expected_win_rate(player_strategy):
+    """Exact win probability against a uniformly random referee move."""
+    probabilities = win_probabilities(player_strategy)
+    return sum(probabilities.values()) / len(probabilities)
+
+
+def separation_looks(first_chunk=STREAM_FIRST_CHUNK, max_games=STREAM_MAX_GAMES):
+    """Separation tests :func:`stream_win_rate` makes at most before ``max_games``.
+
+    One per doubling chunk that ends at or past ``STREAM_MIN_SEPARATION_GAMES``.
+    """
+    games, chunk, looks = 0, first_chunk, 0
+    while games < max_games:
+        games += min(chunk, max_games - games)
+        looks += games >= STREAM_MIN_SEPARATION_GAMES
+        chunk *= 2
+    return max(1, looks)
+
+
+def stream_win_rate(player_strategy, backend, tolerance, confidence=0.95, expected=None,
+                    first_chunk=STREAM_FIRST_CHUNK, max_games=STREAM_MAX_GAMES, rng=None):
+    """Play games in doubling chunks and yield a running win-rate estimate.
+
+    Each yielded dict holds the games and wins so far, the win rate and its
+    Wilson interval, and a ``stop_reason`` that is ``None`` until the last
+    estimate: ``'precision'`` once the interval half-width is within
+    ``tolerance``, ``'separated'`` once the interval excludes ``expected``
+    (checked only after ``STREAM_MIN_SEPARATION_GAMES`` so a lucky first
+    chunk cannot end the run), or ``'budget'`` when ``max_games`` is spent.
+
+    Separation is tested after every chunk, so each test uses a wider
+    interval whose level splits ``1 - confidence`` evenly over the tests
+    the run could make (Bonferroni). A strategy that matches ``expected``
+    is then reported as separated with probability at most
+    ``1 - confidence`` over the whole run, not at every look.
+    """
+    rng = np.random.default_rng() if rng is None else rng
+    games = wins = 0
+    chunk = first_chunk
+    looks = separation_looks(first_chunk, max_games)
+    separation_confidence = 1 - (1 - confidence) / looks
+
+    while True:
+        chunk = min(chunk, max_games - games)
+        _, outcomes, _ = play_coin_games(player_strategy, chunk, backend, rng)
+        games += chunk
+        wins += int(chunk - np.count_nonzero(outcomes))
+
+        ci_low, ci_high = wilson_interval(wins, games, confidence)
+        half_width = (ci_high - ci_low) / 2
+
+        stop_reason = None
+        if half_width <= tolerance:
+            stop_reason = 'precision'
+        elif expected is not None and games >= STREAM_MIN_SEPARATION_GAMES:
+            sep_low, sep_high = wilson_interval(wins, games, separation_confidence)
+            if not sep_low <= expected <= sep_high:
+                stop_reason = 'separated'
+        if stop_reason is None and games >= max_games:
+            stop_reason = 'budget'
+
+        yield {
+            'games': games,
+            'wins': wins,
+            'win_rate': wins / games,
+            'ci_low': ci_low,
+            'ci_high': ci_high,
+            'half_width': half_width,
+            'stop_reason': stop_reason
+        }
+        if stop_reason is not None:
+            return
+        chunk *= 2
+
+
+def iter_stream_history(player_strategy, backend, tolerance, confidence=0.95, expected=None, rng=None):
+    """:func:`stream_win_rate` as ``(fraction, history)`` steps for a background job.
+
+    The interval narrows roughly as ``1/sqrt(games)``, so the progress is
+    the squared ratio of the target to the current half-width.
+    """
+    history = []
+    for estimate in stream_win_rate(player_strategy, backend, tolerance, confidence, expected, rng=rng):
+        history.append(estimate)
+        if estimate['stop_reason'] is not None or estimate['half_width'] == 0:
+            fraction = 1.0
+        else:
+            fraction = min(1.0, (tolerance / estimate['half_width']) ** 2)
+        yield fraction, list(history)
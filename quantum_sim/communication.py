@@ -0,0 +1,110 @@
+# ==========================================
+# Quantum Communication Core
+# ==========================================
+"""Bell-pair communication circuit used by Problem 1.
+
+Alice applies one of :data:`ALICE_OPS` to her half of a ``|Φ⁺⟩`` pair and
+both qubits are measured. With more than two qubits the pair becomes a
+GHZ state, which stays Clifford and so runs on the stabilizer method at
+widths far beyond state-vector memory. Nothing here imports Streamlit, so the same
+functions back the app, the CLI and offline batch runs.
+"""
+
+from quantum_sim.backends import get_backend
+from quantum_sim.exact import get_exact_probabilities, probabilities_to_dict, sample_shots
+from quantum_sim.jobs import MIN_CHUNK_SHOTS, split_work
+from quantum_sim.lazy import lazy_import
+from quantum_sim.profiling import span
+from quantum_sim.resources import get_compiled_circuit
+from quantum_sim.shots import ShotRecord
+
+qiskit = lazy_import('qiskit')
+
+# Operations Alice may apply to qubit 0
+ALICE_OPS = ['i', 'x', 'z', 'h']
+
+# How a run is executed: simulator sampling or exact probabilities
+EXECUTION_MODES = ['sampled', 'exact']
+
+# Widest GHZ state offered, and the widest evolved exactly
+MAX_QUBITS = 500
+EXACT_MAX_QUBITS = 12
+
+
+def build_communication_circuit(alice_op, num_qubits=2):
+    """Build the Bell-pair (or GHZ) circuit with Alice's operation on qubit 0."""
+    qc1 = qiskit.QuantumCircuit(num_qubits, num_qubits)
+
+    # Create Bell state, extended to GHZ along a CX chain
+    qc1.h(0)
+    for qubit in range(num_qubits - 1):
+        qc1.cx(qubit, qubit + 1)
+
+    # Alice applies an operation
+    if alice_op == 'x':
+        qc1.x(0)
+    elif alice_op == 'z':
+        qc1.z(0)
+    elif alice_op == 'h':
+        qc1.h(0)
+    # 'i' does nothing (identity)
+
+    qc1.measure(range(num_qubits), range(num_qubits))
+    return qc1
+
+
+def run_communication(alice_op, shots, execution_mode='sampled', backend='auto', rng=None, num_qubits=2):
+    """Run the communication circuit for ``alice_op``.
+
+    ``backend`` is a backend object or a name for :func:`get_backend`.
+    Returns a dict with the shot ``record`` (a packed
+    :class:`~quantum_sim.shots.ShotRecord`), the logical ``circuit``, the simulation
+    ``method`` and, in exact mode, the exact ``probabilities`` (``None``
+    when sampled). Raises ``ValueError`` for a width outside ``2`` to
+    :data:`MAX_QUBITS` or beyond what the mode or backend can simulate.
+    """
+    if not 2 <= num_qubits <= MAX_QUBITS:
+        raise ValueError(f"The communication circuit takes 2 to {MAX_QUBITS} qubits")
+    if execution_mode == 'exact' and num_qubits > EXACT_MAX_QUBITS:
+        raise ValueError(f"Exact mode supports up to {EXACT_MAX_QUBITS} qubits")
+    if execution_mode != 'exact' and isinstance(backend, str):
+        backend = get_backend(backend)
+    key = ('communication', alice_op, num_qubits)
+    qc1, compiled1 = get_compiled_circuit(key, lambda: build_communication_circuit(alice_op, num_qubits))
+    if execution_mode != 'exact' and not backend.supports(compiled1):
+        raise ValueError(f"The {backend.name} backend cannot simulate {num_qubits} qubits")
+
+    probabilities1 = None
+    if execution_mode == 'exact':
+        # Evolve once, then draw all shots from the exact distribution
+        method1 = 'exact'
+        with span('simulate'):
+            exact1 = get_exact_probabilities(key, qc1)
+        with span('counts'):
+            record1 = sample_shots(exact1, shots, rng)
+            probabilities1 = probabilities_to_dict(exact1, num_qubits)
+    else:
+        method1 = backend.method_for(compiled1)
+        with span('simulate'):
+            record1 = backend.sample(compiled1, shots)
+
+    return {'record': record1, 'probabilities': probabilities1, 'circuit': qc1, 'method': method1}
+
+
+def iter_communication(alice_op, shots, execution_mode='sampled', backend='auto', rng=None, num_qubits=2):
+    """:func:`run_communication` in shot chunks, yielding ``(fraction, results)``.
+
+    Shot records are joined across chunks. Exact mode evolves the state once,
+    so it is a single step.
+    """
+    if execution_mode == 'exact':
+        yield 1.0, run_communication(alice_op, shots, execution_mode, backend, rng, num_qubits)
+        return
+
+    records = []
+    done = 0
+    for chunk in split_work(shots, minimum=MIN_CHUNK_SHOTS):
+        results = run_communication(alice_op, chunk, execution_mode, backend, rng, num_qubits)
+        records.append(results['record'])
+        done += chunk
+        yield done / shots, dict(results, record=ShotRecord.concatenate(records))
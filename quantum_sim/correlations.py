@@ -0,0 +1,205 @@
+# ==========================================
+# Quantum Correlation Core
+# ==========================================
+"""Two-qubit correlation circuits and metrics for Problem 3.
+
+A gate configuration is ``(apply_h0, apply_cx, rotation_qubit0,
+rotation_qubit1)``. Single runs and whole sweeps share the compiled
+circuit cache. Nothing here imports Streamlit.
+"""
+
+from quantum_sim.backends import get_backend
+from quantum_sim.exact import get_exact_probabilities, probabilities_to_dict, sample_shots
+from quantum_sim.jobs import MIN_CHUNK_SHOTS, split_work
+from quantum_sim.lazy import lazy_import
+from quantum_sim.profiling import span
+from quantum_sim.resources import get_compiled_circuit, get_compiled_circuits
+from quantum_sim.shots import ShotRecord
+
+np = lazy_import('numpy')
+qiskit = lazy_import('qiskit')
+
+# Rotation choices offered for each qubit
+ROTATIONS = ["none", "h", "s", "t", "x", "y", "z"]
+
+# (apply_h0, apply_cx) settings covered by a sweep
+CORE_SETTINGS = [(True, True), (True, False), (False, True), (False, False)]
+
+# Column order of a sweep's outcome matrix (index i is format(i, '02b'))
+OUTCOMES = ['00', '01', '10', '11']
+
+
+def build_correlation_circuit(apply_h0, apply_cx, rotation_qubit0, rotation_qubit1):
+    """Build the two-qubit correlation circuit for one gate configuration."""
+    qc3 = qiskit.QuantumCircuit(2, 2)
+
+    # Create Bell state (core entanglement)
+    if apply_h0:
+        qc3.h(0)
+    if apply_cx:
+        qc3.cx(0, 1)
+
+    # Apply additional rotations to qubit 0
+    if rotation_qubit0 != "none":
+        if rotation_qubit0 == "h":
+            qc3.h(0)
+        elif rotation_qubit0 == "s":
+            qc3.s(0)
+        elif rotation_qubit0 == "t":
+            qc3.t(0)
+        elif rotation_qubit0 == "x":
+            qc3.x(0)
+        elif rotation_qubit0 == "y":
+            qc3.y(0)
+        elif rotation_qubit0 == "z":
+            qc3.z(0)
+
+    # Apply additional rotations to qubit 1
+    if rotation_qubit1 != "none":
+        if rotation_qubit1 == "h":
+            qc3.h(1)
+        elif rotation_qubit1 == "s":
+            qc3.s(1)
+        elif rotation_qubit1 == "t":
+            qc3.t(1)
+        elif rotation_qubit1 == "x":
+            qc3.x(1)
+        elif rotation_qubit1 == "y":
+            qc3.y(1)
+        elif rotation_qubit1 == "z":
+            qc3.z(1)
+
+    qc3.measure([0, 1], [0, 1])
+    return qc3
+
+
+def correlation_metrics(outcome_matrix):
+    """Vectorized same/different-state probabilities and correlation strength.
+
+    ``outcome_matrix`` has one row per configuration holding counts or
+    probabilities in ``OUTCOMES`` order.
+    """
+    outcome_matrix = np.asarray(outcome_matrix, dtype=float)
+    totals = outcome_matrix.sum(axis=1)
+    same_state_prob = (outcome_matrix[:, 0] + outcome_matrix[:, 3]) / totals
+    diff_state_prob = (outcome_matrix[:, 1] + outcome_matrix[:, 2]) / totals
+    return same_state_prob, diff_state_prob, np.abs(same_state_prob - diff_state_prob)
+
+
+def sweep_correlations(configs, shots, execution_mode, backend):
+    """Evaluate every configuration in one batch and return its outcome matrix."""
+    circuits = get_compiled_circuits(
+        [('correlation',) + config for config in configs],
+        lambda key: build_correlation_circuit(*key[1:])
+    )
+
+    if execution_mode == "exact":
+        with span('simulate'):
+            return np.stack([
+                get_exact_probabilities(('correlation',) + config, qc)
+                for config, (qc, _) in zip(configs, circuits)
+            ])
+
+    with span('simulate'):
+        counts_list = backend.run_batch([compiled for _, compiled in circuits], shots)
+    with span('counts'):
+        return np.array([[counts.get(outcome, 0) for outcome in OUTCOMES] for counts in counts_list])
+
+
+def run_correlation(config, shots, execution_mode='sampled', backend='auto', rng=None):
+    """Run one gate configuration and compute its correlation metrics.
+
+    ``backend`` is a backend object or a name for :func:`get_backend`.
+    The shots come back as a packed ``record``. In exact mode the metrics
+    come straight from the exact distribution rather than from the shots.
+    """
+    qc3, compiled3 = get_compiled_circuit(
+        ('correlation',) + config,
+        lambda: build_correlation_circuit(*config)
+    )
+
+    probabilities3 = None
+    if execution_mode == "exact":
+        # Evolve once, then draw all shots from the exact distribution
+        method3 = 'exact'
+        with span('simulate'):
+            exact3 = get_exact_probabilities(('correlation',) + config, qc3)
+        with span('counts'):
+            record3 = sample_shots(exact3, shots, rng)
+            probabilities3 = probabilities_to_dict(exact3, 2)
+        outcome_row = exact3
+    else:
+        if isinstance(backend, str):
+            backend = get_backend(backend)
+        method3 = backend.method_for(compiled3)
+        with span('simulate'):
+            record3 = backend.sample(compiled3, shots)
+        with span('counts'):
+            # Outcome index i is OUTCOMES[i]
+            outcome_row = record3.count_array()
+
+    with span('metrics'):
+        same_state_prob, diff_state_prob, correlation_strength = correlation_metrics([outcome_row])
+    return {
+        'record': record3,
+        'probabilities': probabilities3,
+        'circuit': qc3,
+        'method': method3,
+        'same_state_prob': float(same_state_prob[0]),
+        'diff_state_prob': float(diff_state_prob[0]),
+        'correlation_strength': float(correlation_strength[0])
+    }
+
+
+def iter_correlation(config, shots, execution_mode='sampled', backend='auto', rng=None):
+    """:func:`run_correlation` in shot chunks, yielding ``(fraction, results)``.
+
+    Shot records are joined across chunks and the metrics are recomputed
+    from the running totals. Exact mode is a single step.
+    """
+    if execution_mode == "exact":
+        yield 1.0, run_correlation(config, shots, execution_mode, backend, rng)
+        return
+
+    records = []
+    done = 0
+    for chunk in split_work(shots, minimum=MIN_CHUNK_SHOTS):
+        results = run_correlation(config, chunk, execution_mode, backend, rng)
+        records.append(results['record'])
+        done += chunk
+
+        record = ShotRecord.concatenate(records)
+        same_state_prob, diff_state_prob, correlation_strength = correlation_metrics([record.count_array()])
+        yield done / shots, dict(
+            results,
+            record=record,
+            same_state_prob=float(same_state_prob[0]),
+            diff_state_prob=float(diff_state_prob[0]),
+            correlation_strength=float(correlation_strength[0])
+        )
+
+
+def iter_sweep(configs, shots, execution_mode, backend):
+    """:func:`sweep_correlations` with progress, yielding ``(fraction, outcome_matrix)``.
+
+    Sampled sweeps build and transpile their circuits in chunks, which is
+    where the time goes, then run every configuration as a single batched
+    backend job; the matrix stays empty until that job returns. Exact
+    sweeps have no backend job and are evolved chunk by chunk, each yield
+    holding the rows finished so far.
+    """
+    keys = [('correlation',) + config for config in configs]
+    start = 0
+    if execution_mode == "exact":
+        rows = []
+        for size in split_work(len(configs)):
+            rows.append(sweep_correlations(configs[start:start + size], shots, execution_mode, backend))
+            start += size
+            yield start / len(configs), np.concatenate(rows)
+        return
+
+    for size in split_work(len(configs)):
+        get_compiled_circuits(keys[start:start + size], lambda key: build_correlation_circuit(*key[1:]))
+        start += size
+        yield 0.9 * start / len(configs), np.zeros((0, len(OUTCOMES)), dtype=np.int64)
+    yield 1.0, sweep_correlations(configs, shots, execution_mode, backend)
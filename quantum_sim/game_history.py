@@ -0,0 +1,134 @@
+# ==========================================
+# Bounded Coin-Game History
+# ==========================================
+"""Columnar, size-capped history of the coin games played in a session.
+
+Each game is three small-int codes (player strategy, referee move and
+outcome) in parallel ``uint8`` arrays, so 100,000 games take 300 kB.
+Only the most recent ``retention`` games are kept. The totals and the
+per-strategy, per-referee-move tallies cover every game ever played and
+are updated in place, so they stay exact after old games are dropped.
+Circuits are not stored; :func:`~quantum_sim.coin_game.coin_circuit`
+rebuilds one from the cache when it is drawn. Nothing here imports
+Streamlit.
+"""
+
+from quantum_sim.coin_game import PLAYER_STRATEGIES, REFEREE_MOVES
+from quantum_sim.lazy import lazy_import
+
+np = lazy_import('numpy')
+
+# Games kept per session by default, and the choices offered
+DEFAULT_RETENTION = 100_000
+RETENTION_OPTIONS = [1_000, 10_000, 100_000, 1_000_000]
+
+
+class GameHistory:
+    """The last ``retention`` games as code arrays, plus all-time tallies."""
+
+    def __init__(self, retention=DEFAULT_RETENTION):
+        self.retention = retention
+        self.strategy_codes = np.zeros(0, dtype=np.uint8)
+        self.referee_codes = np.zeros(0, dtype=np.uint8)
+        self.outcomes = np.zeros(0, dtype=np.uint8)
+        # Games ever appended; game k (0-based) is retained once k >= recorded - retained
+        self.recorded = 0
+        # All-time totals, including streamed games that have no per-game record
+        self.games_played = 0
+        self.wins = 0
+        self.move_games = np.zeros((len(PLAYER_STRATEGIES), len(REFEREE_MOVES)), dtype=np.int64)
+        self.move_wins = np.zeros_like(self.move_games)
+
+    def __len__(self):
+        return len(self.outcomes)
+
+    @property
+    def first_retained(self):
+        """0-based number of the oldest game still held."""
+        return self.recorded - len(self)
+
+    def append(self, player_strategy, referee_codes, outcomes):
+        """Record a run of games (outcome 1 = Tails = a loss).
+
+        Returns the run's ``(games, wins)`` per referee move, in
+        :data:`REFEREE_MOVES` order.
+        """
+        strategy_code = PLAYER_STRATEGIES.index(player_strategy)
+        referee_codes = np.asarray(referee_codes, dtype=np.uint8)
+        outcomes = np.asarray(outcomes, dtype=np.uint8)
+
+        games = np.bincount(referee_codes, minlength=len(REFEREE_MOVES))
+        losses = np.bincount(referee_codes, weights=outcomes, minlength=len(REFEREE_MOVES)).astype(np.int64)
+        self.move_games[strategy_code] += games
+        self.move_wins[strategy_code] += games - losses
+        self.add_totals(outcomes.size, int(outcomes.size - losses.sum()))
+        self.recorded += outcomes.size
+
+        keep = min(outcomes.size, self.retention)
+        self.strategy_codes = self._capped(self.strategy_codes, np.full(keep, strategy_code, dtype=np.uint8))
+        self.referee_codes = self._capped(self.referee_codes, referee_codes[outcomes.size - keep:])
+        self.outcomes = self._capped(self.outcomes, outcomes[outcomes.size - keep:])
+        return games, games - losses
+
+    def add_totals(self, games, wins):
+        """Count games played without a per-game record (the streaming estimate)."""
+        self.games_played += games
+        self.wins += wins
+
+    def set_retention(self, retention):
+        """Change the cap, dropping the oldest games if it shrinks."""
+        self.retention = retention
+        if len(self) > retention:
+            self.strategy_codes = self.strategy_codes[-retention:].copy()
+            self.referee_codes = self.referee_codes[-retention:].copy()
+            self.outcomes = self.outcomes[-retention:].copy()
+
+    def _capped(self, old, new):
+        # Only the tail that survives the cap is copied
+        room = self.retention - len(new)
+        return np.concatenate([old[max(0, len(old) - room):] if room > 0 else old[:0], new])
+
+    def games(self, start, stop):
+        """Code columns of the retained games numbered ``start`` to ``stop - 1``.
+
+        Returns ``(numbers, strategy_codes, referee_codes, outcomes)``;
+        games no longer retained are left out.
+        """
+        start = max(start, self.first_retained)
+        stop = max(min(stop, self.recorded), start)
+        rows = slice(start - self.first_retained, stop - self.first_retained)
+        return np.arange(start, stop), self.strategy_codes[rows], self.referee_codes[rows], self.outcomes[rows]
+
+    def last_game(self):
+        """``(player_strategy, referee_move, won)`` of the newest game, or ``None``."""
+        if not len(self):
+            return None
+        return (
+            PLAYER_STRATEGIES[self.strategy_codes[-1]],
+            REFEREE_MOVES[self.referee_codes[-1]],
+            bool(self.outcomes[-1] == 0)
+        )
+
+    def win_rates_by_move(self):
+        """All-time ``{strategy: {move: (games, wins)}}`` for strategies played."""
+        return {
+            strategy: {
+                move: (int(self.move_games[row, col]), int(self.move_wins[row, col]))
+                for col, move in enumerate(REFEREE_MOVES)
+            }
+            for row, strategy in enumerate(PLAYER_STRATEGIES)
+            if self.move_games[row].any()
+        }
+
+    def rolling_win_rate(self, window, start=0):
+        """Win rate over the previous ``window`` retained games, for games from ``start``.
+
+        ``start`` is a game number as in :attr:`first_retained`. Windows do
+        not reach back before it, so the first ``window - 1`` values
+        average over fewer games.
+        """
+        first = max(start - self.first_retained, 0)
+        wins = np.concatenate([[0], np.cumsum(self.outcomes == 0, dtype=np.int64)])
+        positions = np.arange(first, len(self)) + 1
+        lower = np.maximum(positions - window, first)
+        return (wins[positions] - wins[lower]) / (positions - lower)
@@ -0,0 +1,111 @@
+# ==========================================
+# Import-Time Report
+# ==========================================
+"""Cold-start import report in the style of ``python -X importtime``.
+
+Run ``python -m quantum_sim.importtime`` to time what the apps import
+before their first paint (``--startup``, the default) or the heavy stack
+loaded on first use (``--heavy``). ``--budget-ms`` exits non-zero when the
+total exceeds the budget, so cold-start regressions fail loudly.
+"""
+
+import argparse
+import re
+import subprocess
+import sys
+
+from quantum_sim.lazy import HEAVY_MODULES
+
+# Imported by every app before the first paint
+STARTUP_MODULES = (
+    'streamlit',
+    'quantum_sim.lazy',
+    'quantum_sim.resources',
+    'quantum_sim.exact',
+    'quantum_sim.backends',
+    'quantum_sim.communication',
+    'quantum_sim.coin_game',
+    'quantum_sim.correlations',
+    'quantum_sim.perf_panel',
+    'quantum_sim.job_panel'
+)
+
+_LINE = re.compile(r'^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)\s*$')
+
+
+def measure_import_times(modules, python=sys.executable):
+    """Import ``modules`` in a fresh interpreter and return the timing rows.
+
+    Each row is ``(self_us, cumulative_us, depth, module)`` in the order
+    ``-X importtime`` reports them.
+    """
+    statement = 'import ' + ', '.join(modules)
+    process = subprocess.run(
+        [python, '-X', 'importtime', '-c', statement],
+        capture_output=True, text=True, check=True
+    )
+    return parse_importtime(process.stderr)
+
+
+def parse_importtime(text):
+    rows = []
+    for line in text.splitlines():
+        match = _LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, module = match.groups()
+            rows.append((int(self_us), int(cumulative_us), (len(indent) - 1) // 2, module))
+    return rows
+
+
+def format_report(rows, requested, top=20):
+    """Format a report: requested modules by cumulative time, then the top self times."""
+    by_name = {row[3]: row for row in rows}
+    lines = ['import time:       self [us] |  cumulative | module']
+
+    # Top-level rows already include everything they pulled in
+    total_us = sum(cumulative_us for _, cumulative_us, depth, _ in rows if depth == 0)
+    for module in requested:
+        if module in by_name:
+            self_us, cumulative_us, _, _ = by_name[module]
+            lines.append(f'import time: {self_us:>15} | {cumulative_us:>11} | {module}')
+        else:
+            lines.append(f'import time: {"-":>15} | {"-":>11} | {module} (already loaded)')
+
+    lines.append('')
+    lines.append(f'Slowest {top} modules by self time:')
+    for self_us, cumulative_us, depth, module in sorted(rows, reverse=True)[:top]:
+        lines.append(f'import time: {self_us:>15} | {cumulative_us:>11} | {"  " * depth}{module}')
+
+    lines.append('')
+    lines.append(f'Total: {total_us / 1000:.1f} ms')
+    return '\n'.join(lines), total_us
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    group = parser.add_mutually_exclusive_group()
+    group.add_argument('--startup', action='store_true', help='time the pre-paint imports (default)')
+    group.add_argument('--heavy', action='store_true', help='time the modules loaded on first use')
+    parser.add_argument('modules', nargs='*', help='explicit modules to time instead')
+    parser.add_argument('--top', type=int, default=20, help='number of slowest modules to list')
+    parser.add_argument('--budget-ms', type=float, help='fail if the total exceeds this many ms')
+    args = parser.parse_args(argv)
+
+    if args.modules:
+        modules = tuple(args.modules)
+    elif args.heavy:
+        modules = HEAVY_MODULES
+    else:
+        modules = STARTUP_MODULES
+
+    report, total_us = format_report(measure_import_times(modules), modules, top=args.top)
+    print(report)
+
+    if args.budget_ms is not None and total_us / 1000 > args.budget_ms:
+        print(f'Import budget exceeded: {total_us / 1000:.1f} ms > {args.budget_ms:.1f} ms', file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
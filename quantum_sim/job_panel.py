@@ -0,0 +1,86 @@
+# ==========================================
+# Background Jobs in the Streamlit Apps
+# ==========================================
+"""Keep a session's background simulation in ``st.session_state``.
+
+The script never blocks on a simulator call. :func:`start_job` submits
+the work, and :func:`wait_for_job` polls it while drawing progress and
+partial results. Touching any widget interrupts the poll with a rerun.
+On that rerun :func:`track_job` cancels the job if the settings it was
+started with no longer match, so a superseded run stops at its next chunk
+instead of finishing in the background.
+"""
+
+import time
+
+import streamlit as st
+
+from quantum_sim.jobs import submit_job
+
+# Seconds between progress refreshes while a job runs
+POLL_INTERVAL = 0.2
+
+
+def track_job(key, params):
+    """Return the job at ``st.session_state[key]``, dropping it if superseded.
+
+    A job started with settings other than ``params`` is cancelled and
+    removed, whether it is still running or finished but not yet collected.
+    """
+    job = st.session_state.get(key)
+    if job is not None and job.params != params:
+        job.cancel()
+        st.session_state[key] = None
+        if not job.done():
+            st.toast("⏹️ Settings changed: cancelled the running simulation")
+        return None
+    return job
+
+
+def start_job(key, params, steps, *args, **kwargs):
+    """Cancel any job at ``key`` and start ``steps(*args, **kwargs)`` in its place."""
+    previous = st.session_state.get(key)
+    if previous is not None:
+        previous.cancel()
+    st.session_state[key] = submit_job(params, steps, *args, **kwargs)
+    return st.session_state[key]
+
+
+def wait_for_job(key, label, show_partial=None):
+    """Poll the job at ``key`` until it finishes and return the finished job.
+
+    While it runs, a progress bar and a Cancel button are shown, and
+    ``show_partial(partial)`` redraws the partial result whenever it
+    changes. The key is cleared once the job is collected. Returns ``None``
+    if there is no job or it was cancelled. Call ``job.result()`` on the
+    returned job, which re-raises anything the job raised.
+    """
+    job = st.session_state.get(key)
+    if job is None:
+        return None
+
+    if not job.done():
+        cancel_area = st.empty()
+        if cancel_area.button("⏹️ Cancel", key=f"{key}_cancel"):
+            job.cancel()
+        progress = st.progress(job.progress, text=label)
+        partial_view = st.empty()
+
+        shown = None
+        while not job.done():
+            progress.progress(job.progress, text=f"{label} {job.progress:.0%} · {job.elapsed:.1f} s")
+            if show_partial is not None and job.partial is not None and job.partial is not shown:
+                shown = job.partial
+                with partial_view.container():
+                    show_partial(shown)
+            time.sleep(POLL_INTERVAL)
+
+        cancel_area.empty()
+        progress.empty()
+        partial_view.empty()
+
+    st.session_state[key] = None
+    if job.cancelled:
+        st.info("⏹️ Simulation cancelled")
+        return None
+    return job
@@ -0,0 +1,121 @@
+# ==========================================
+# Background Simulation Jobs
+# ==========================================
+"""Simulations run on a background thread pool, with progress and cancellation.
+
+A job runs a *steps* generator that yields ``(fraction, partial)`` pairs.
+``fraction`` is the share of the work done, in ``[0, 1]``. ``partial`` is
+the result so far, and the last one yielded is the job's result. Work is
+split into chunks between yields, so a cancelled job stops at the next
+chunk boundary instead of running to completion. Nothing here imports
+Streamlit.
+"""
+
+import contextlib
+import contextvars
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# Concurrent background simulations across all sessions
+JOB_WORKERS = 2
+
+# Pieces a chunked job is split into, for progress and cancellation
+JOB_CHUNKS = 20
+
+# Smallest chunks worth a separate simulator call
+MIN_CHUNK_SHOTS = 1_000
+MIN_CHUNK_GAMES = 10_000
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor():
+    """Return the process-wide executor, creating it on first use."""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=JOB_WORKERS, thread_name_prefix='quantum-sim-job')
+        return _executor
+
+
+class SimulationJob:
+    """Handle on a background simulation: progress, partial result, cancel.
+
+    ``params`` records the settings the job was started with, so callers
+    can tell when it has been superseded.
+    """
+
+    def __init__(self, params):
+        self.params = params
+        self.progress = 0.0
+        self.partial = None
+        self.future = None
+        self.started = time.perf_counter()
+        self.finished = None
+        self._cancel_requested = threading.Event()
+
+    @property
+    def cancelled(self):
+        return self._cancel_requested.is_set()
+
+    def cancel(self):
+        """Ask the job to stop at its next chunk boundary."""
+        self._cancel_requested.set()
+        if self.future is not None:
+            self.future.cancel()
+
+    def done(self):
+        return self.future is not None and self.future.done()
+
+    def result(self, timeout=None):
+        """The final result, or ``None`` if the job was cancelled.
+
+        Re-raises any exception raised by the job.
+        """
+        if self.future.cancelled():
+            return None
+        return self.future.result(timeout)
+
+    @property
+    def elapsed(self):
+        end = self.finished if self.finished is not None else time.perf_counter()
+        return end - self.started
+
+
+def submit_job(params, steps, *args, **kwargs):
+    """Start ``steps(*args, **kwargs)`` in the background and return its job.
+
+    The job runs in a copy of the caller's context, so timing spans still
+    reach the recorder that was active when it was submitted.
+    """
+    job = SimulationJob(params)
+
+    def run():
+        result = None
+        try:
+            with contextlib.closing(steps(*args, **kwargs)) as step_iter:
+                for fraction, result in step_iter:
+                    job.progress, job.partial = fraction, result
+                    if job.cancelled:
+                        return None
+            job.progress = 1.0
+            return result
+        finally:
+            job.finished = time.perf_counter()
+
+    job.future = get_executor().submit(contextvars.copy_context().run, run)
+    return job
+
+
+def single_step(func, *args, **kwargs):
+    """Steps generator for work that cannot be chunked: one final yield."""
+    yield 1.0, func(*args, **kwargs)
+
+
+def split_work(total, chunks=JOB_CHUNKS, minimum=1):
+    """Split ``total`` into at most ``chunks`` near-equal sizes of at least ``minimum``."""
+    count = max(1, min(chunks, total // minimum))
+    base, extra = divmod(total, count)
+    return [base + (index < extra) for index in range(count)]
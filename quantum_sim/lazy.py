@@ -0,0 +1,84 @@
+# ==========================================
+# Lazy Imports and Background Warm-up
+# ==========================================
+"""Deferred loading of the heavy scientific stack.
+
+The apps only need Qiskit, Aer, NumPy and Matplotlib once something is
+simulated or plotted, so they bind those modules through
+:func:`lazy_import` and the first page paints without waiting for them.
+:func:`warm_imports` then loads them in a background thread so the first
+button press does not pay the import cost either.
+
+Every import made here holds one process-wide lock. Importing two modules
+of the same package from two threads at once (``qiskit_aer`` for the
+warm-up, ``qiskit_aer.noise`` for a job) can otherwise expose a partially
+initialized module to one of them.
+"""
+
+import importlib
+import importlib.metadata
+import threading
+import types
+
+# Modules the apps load on first use, in dependency order
+HEAVY_MODULES = (
+    'numpy',
+    'qiskit',
+    'qiskit.quantum_info',
+    'qiskit_aer',
+    'matplotlib.pyplot',
+    'plotly.graph_objects',
+    'qiskit.visualization'
+)
+
+_warm_thread = None
+_warm_lock = threading.Lock()
+
+# Serializes every import made through this module
+_import_lock = threading.RLock()
+
+
+class LazyModule(types.ModuleType):
+    """Module proxy that imports the real module on first attribute access."""
+
+    def __getattr__(self, attribute):
+        # Only reached for attributes not yet copied from the real module
+        with _import_lock:
+            module = importlib.import_module(self.__name__)
+            self.__dict__.update(module.__dict__)
+        return getattr(module, attribute)
+
+
+def lazy_import(name):
+    """Return ``name`` as a module that is imported on first use."""
+    return LazyModule(name)
+
+
+def warm_imports(modules=HEAVY_MODULES):
+    """Import ``modules`` in a daemon thread, once per process."""
+    global _warm_thread
+    with _warm_lock:
+        if _warm_thread is None:
+            _warm_thread = threading.Thread(
+                target=_import_all, args=(modules,), name='quantum-sim-warm-imports', daemon=True
+            )
+            _warm_thread.start()
+        return _warm_thread
+
+
+def package_version(name):
+    """Installed version of a distribution, read without importing it."""
+    try:
+        return importlib.metadata.version(name)
+    except importlib.metadata.PackageNotFoundError:
+        return 'not installed'
+
+
+def _import_all(modules):
+    for name in modules:
+        try:
+            with _import_lock:
+                importlib.import_module(name)
+        except Exception:
+            # The foreground import will surface the error when it is needed
+            pass
@@ -0,0 +1,216 @@
+# ==========================================
+# Multi-Pair Entanglement Correlations
+# ==========================================
+"""Pairwise correlation matrices for many Bell pairs or GHZ clusters.
+
+A register of ``n`` qubits is split into clusters given as edges: each
+connected component of the edges becomes one GHZ state, with ``h`` on
+its lowest qubit and ``cx`` along a breadth-first spanning tree. Only
+connectivity matters: every pair in a cluster is perfectly correlated in
+``Z``, whether or not an edge joins it, so a chain and a star on the
+same qubits prepare the same state. ``K`` Bell pairs are the edges
+``(0, 1), (2, 3), ...`` on ``2K`` qubits.
+
+Shots come back from ``sample()`` as a packed
+:class:`~quantum_sim.shots.ShotRecord`, so the ``n × n`` matrix of
+``⟨Z_i Z_j⟩`` is one bit unpack and one matrix product per chunk rather
+than a parse of ``2^n`` bitstring keys. Nothing
+here imports Streamlit.
+"""
+
+import re
+from collections import deque
+
+from quantum_sim.backends import get_backend
+from quantum_sim.jobs import MIN_CHUNK_SHOTS, split_work
+from quantum_sim.lazy import lazy_import
+from quantum_sim.profiling import span
+from quantum_sim.resources import get_compiled_circuit
+
+np = lazy_import('numpy')
+qiskit = lazy_import('qiskit')
+
+# Built-in clusterings; 'custom' reads an edge list whose connected
+# components are the clusters
+TOPOLOGIES = ['pairs', 'ghz', 'custom']
+
+# Widest register offered; the matrix has MAX_GRAPH_QUBITS² entries
+MAX_GRAPH_QUBITS = 64
+
+_EDGE_PATTERN = re.compile(r'^(\d+)-(\d+)$')
+
+
+def parse_edges(text, num_qubits):
+    """Parse ``'0-1 1-2'`` (space or comma separated) into sorted edges."""
+    edges = set()
+    for token in text.replace(',', ' ').split():
+        match = _EDGE_PATTERN.match(token)
+        if match is None:
+            raise ValueError(f"Cannot parse edge {token!r}; expected a-b")
+        a, b = sorted(int(qubit) for qubit in match.groups())
+        if a == b:
+            raise ValueError(f"Edge {token!r} joins a qubit to itself")
+        if b >= num_qubits:
+            raise ValueError(f"Edge {token!r} uses a qubit beyond {num_qubits - 1}")
+        edges.add((a, b))
+    return tuple(sorted(edges))
+
+
+def topology_edges(topology, num_qubits, text=''):
+    """Edges of a :data:`TOPOLOGIES` graph on ``num_qubits`` qubits."""
+    if not 2 <= num_qubits <= MAX_GRAPH_QUBITS:
+        raise ValueError(f"Entanglement graphs use 2 to {MAX_GRAPH_QUBITS} qubits")
+    if topology == 'pairs':
+        if num_qubits % 2:
+            raise ValueError("Bell pairs need an even number of qubits")
+        return tuple((qubit, qubit + 1) for qubit in range(0, num_qubits, 2))
+    if topology == 'ghz':
+        return tuple((qubit, qubit + 1) for qubit in range(num_qubits - 1))
+    if topology == 'custom':
+        return parse_edges(text, num_qubits)
+    raise ValueError(f"Unknown topology {topology!r}")
+
+
+def spanning_forest(num_qubits, edges):
+    """Roots and ``(parent, child)`` tree edges of each connected component.
+
+    Tree edges come in breadth-first order, so every parent is entangled
+    before its children. Isolated qubits are neither roots nor children.
+    """
+    neighbours = [[] for _ in range(num_qubits)]
+    for a, b in edges:
+        neighbours[a].append(b)
+        neighbours[b].append(a)
+
+    seen = [False] * num_qubits
+    roots, tree_edges = [], []
+    for root in range(num_qubits):
+        if seen[root] or not neighbours[root]:
+            continue
+        seen[root] = True
+        roots.append(root)
+        queue = deque([root])
+        while queue:
+            parent = queue.popleft()
+            for child in sorted(neighbours[parent]):
+                if not seen[child]:
+                    seen[child] = True
+                    tree_edges.append((parent, child))
+                    queue.append(child)
+    return roots, tree_edges
+
+
+def build_graph_circuit(num_qubits, edges, rotation='none'):
+    """Entangle each connected component of ``edges`` as a GHZ state and measure all.
+
+    ``rotation`` (one of the Problem 3 ``ROTATIONS``) is applied to every
+    qubit before measurement.
+    """
+    qc = qiskit.QuantumCircuit(num_qubits, num_qubits)
+
+    roots, tree_edges = spanning_forest(num_qubits, edges)
+    for root in roots:
+        qc.h(root)
+    for parent, child in tree_edges:
+        qc.cx(parent, child)
+
+    if rotation != 'none':
+        for qubit in range(num_qubits):
+            getattr(qc, rotation)(qubit)
+
+    qc.measure(range(num_qubits), range(num_qubits))
+    return qc
+
+
+def spin_sums(record):
+    """``(Σ s_i, Σ s_i s_j)`` over a record's shots, with ``s = +1`` for 0 and ``-1`` for 1."""
+    spins = 1.0 - 2.0 * record.bits()
+    return spins.sum(axis=0), spins.T @ spins
+
+
+def correlation_matrices(spin_sum, product_sum, shots):
+    """``⟨Z_i⟩``, ``⟨Z_i Z_j⟩`` and the connected ``⟨Z_i Z_j⟩ - ⟨Z_i⟩⟨Z_j⟩``."""
+    magnetization = spin_sum / shots
+    correlation = product_sum / shots
+    return magnetization, correlation, correlation - np.outer(magnetization, magnetization)
+
+
+def run_graph_correlations(num_qubits, edges, shots, rotation='none', backend='auto'):
+    """Sample the graph circuit and return its correlation matrices.
+
+    ``backend`` is a backend object or a name for :func:`get_backend`.
+    Returns the logical ``circuit``, the simulation ``method``, the raw
+    ``spin_sum`` and ``product_sum`` (for accumulating chunks) and the
+    ``magnetization``, ``correlation`` and ``connected`` matrices.
+    """
+    edges = tuple(edges)
+    key = ('graph', num_qubits, edges, rotation)
+    qc, compiled = get_compiled_circuit(key, lambda: build_graph_circuit(num_qubits, edges, rotation))
+
+    if isinstance(backend, str):
+        backend = get_backend(backend)
+    with span('simulate'):
+        record = backend.sample(compiled, shots)
+    with span('metrics'):
+        spin_sum, product_sum = spin_sums(record)
+        magnetization, correlation, connected = correlation_matrices(spin_sum, product_sum, shots)
+
+    return {
+        'num_qubits': num_qubits,
+        'edges': edges,
+        'shots': shots,
+        'circuit': qc,
+        'method': backend.method_for(compiled),
+        'spin_sum': spin_sum,
+        'product_sum': product_sum,
+        'magnetization': magnetization,
+        'correlation': correlation,
+        'connected': connected
+    }
+
+
+def iter_graph_correlations(num_qubits, edges, shots, rotation='none', backend='auto'):
+    """:func:`run_graph_correlations` in shot chunks, yielding ``(fraction, results)``.
+
+    The spin sums accumulate across chunks and the matrices are
+    recomputed from the running totals.
+    """
+    spin_sum = product_sum = None
+    done = 0
+    for chunk in split_work(shots, minimum=MIN_CHUNK_SHOTS):
+        results = run_graph_correlations(num_qubits, edges, chunk, rotation, backend)
+        if spin_sum is None:
+            spin_sum, product_sum = results['spin_sum'], results['product_sum']
+        else:
+            spin_sum = spin_sum + results['spin_sum']
+            product_sum = product_sum + results['product_sum']
+        done += chunk
+
+        magnetization, correlation, connected = correlation_matrices(spin_sum, product_sum, done)
+        yield done / shots, dict(
+            results,
+            shots=done,
+            spin_sum=spin_sum,
+            product_sum=product_sum,
+            magnetization=magnetization,
+            correlation=correlation,
+            connected=connected
+        )
+
+
+def cluster_labels(num_qubits, edges):
+    """Root qubit of each qubit's cluster, or ``-1`` for an isolated qubit."""
+    labels = np.full(num_qubits, -1)
+    roots, tree_edges = spanning_forest(num_qubits, edges)
+    labels[roots] = roots
+    for parent, child in tree_edges:
+        labels[child] = labels[parent]
+    return labels
+
+
+def cluster_mask(num_qubits, edges):
+    """Boolean ``n × n`` matrix marking distinct qubits in the same cluster."""
+    labels = cluster_labels(num_qubits, edges)
+    mask = (labels[:, None] == labels[None, :]) & (labels[:, None] >= 0)
+    np.fill_diagonal(mask, False)
+    return mask
@@ -0,0 +1,146 @@
+# ==========================================
+# Noise-Model Simulation
+# ==========================================
+"""Depolarizing, amplitude-damping and readout noise for the apps.
+
+A noise setting is ``(depolarizing, amplitude_damping, readout)``. Its
+noise model and density-matrix ``AerSimulator`` are built once and kept
+in a small LRU, since only a handful of settings are in use at a time.
+Errors attach to gate names, so the circuits already transpiled for the
+ideal simulator run unchanged on every noisy one and nothing is
+re-transpiled when the noise changes.
+"""
+
+from quantum_sim.backends import CountsResult, seed_options
+from quantum_sim.lazy import lazy_import
+from quantum_sim.resources import LRUCache
+from quantum_sim.shots import ShotRecord
+
+qiskit_aer = lazy_import('qiskit_aer')
+qiskit_aer_noise = lazy_import('qiskit_aer.noise')
+
+# Gates the noise model attaches errors to
+ONE_QUBIT_GATES = [
+    'id', 'x', 'y', 'z', 'h', 's', 'sdg', 't', 'tdg', 'sx', 'rx', 'ry', 'rz', 'p', 'u', 'u1', 'u2', 'u3'
+]
+TWO_QUBIT_GATES = ['cx']
+
+# Largest error rate offered for each channel
+MAX_ERROR_RATE = 0.3
+
+# A density matrix holds 4^n entries, so noisy runs stay narrow
+NOISY_MAX_QUBITS = 10
+
+# Noise models and their simulators keyed on the rounded noise setting
+noise_cache = LRUCache(maxsize=8)
+
+
+def noise_key(depolarizing, amplitude_damping, readout):
+    """Hashable key for a noise setting, rounded so slider floats match."""
+    return tuple(round(float(rate), 6) for rate in (depolarizing, amplitude_damping, readout))
+
+
+def build_noise_model(depolarizing, amplitude_damping, readout):
+    """Aer ``NoiseModel`` with the given per-gate and readout error rates.
+
+    Single-qubit gates get depolarizing then amplitude-damping error;
+    ``cx`` gets two-qubit depolarizing error then damping on both qubits.
+    """
+    noise_model = qiskit_aer_noise.NoiseModel()
+
+    one_qubit = two_qubit = None
+    if depolarizing:
+        one_qubit = qiskit_aer_noise.depolarizing_error(depolarizing, 1)
+        two_qubit = qiskit_aer_noise.depolarizing_error(depolarizing, 2)
+    if amplitude_damping:
+        damping = qiskit_aer_noise.amplitude_damping_error(amplitude_damping)
+        one_qubit = damping if one_qubit is None else one_qubit.compose(damping)
+        damping_pair = damping.tensor(damping)
+        two_qubit = damping_pair if two_qubit is None else two_qubit.compose(damping_pair)
+    if one_qubit is not None:
+        noise_model.add_all_qubit_quantum_error(one_qubit, ONE_QUBIT_GATES)
+        noise_model.add_all_qubit_quantum_error(two_qubit, TWO_QUBIT_GATES)
+
+    if readout:
+        noise_model.add_all_qubit_readout_error(
+            qiskit_aer_noise.ReadoutError([[1 - readout, readout], [readout, 1 - readout]])
+        )
+    return noise_model
+
+
+def get_noisy_simulator(depolarizing, amplitude_damping, readout):
+    """Return the cached density-matrix ``AerSimulator`` for a noise setting."""
+    key = noise_key(depolarizing, amplitude_damping, readout)
+
+    def build():
+        noise_model = build_noise_model(*key)
+        return qiskit_aer.AerSimulator(method='density_matrix', noise_model=noise_model)
+
+    return noise_cache.get(key, build)
+
+
+class NoisyBackend:
+    """Runs circuits on the density-matrix simulator for one noise setting.
+
+    The simulator is looked up in :data:`noise_cache` on every run, so
+    backends are cheap to create and equal settings share one model.
+    """
+
+    name = 'noisy'
+
+    def __init__(self, depolarizing=0.0, amplitude_damping=0.0, readout=0.0):
+        self.noise = noise_key(depolarizing, amplitude_damping, readout)
+
+    @property
+    def simulator(self):
+        return get_noisy_simulator(*self.noise)
+
+    def supports(self, circuit, allow_parameters=False):
+        return circuit.num_qubits <= NOISY_MAX_QUBITS
+
+    def method_for(self, circuit):
+        return 'density_matrix'
+
+    def run(self, circuit, shots, memory=False, seed=None):
+        self._check_width([circuit])
+        result = self.simulator.run(circuit, shots=shots, memory=memory, **seed_options(seed)).result()
+        return CountsResult(result.get_counts(), result.get_memory() if memory else None)
+
+    def sample(self, circuit, shots, seed=None):
+        self._check_width([circuit])
+        result = self.simulator.run(circuit, shots=shots, memory=True, **seed_options(seed)).result()
+        return ShotRecord.from_memory(result.data(0)['memory'], max(1, circuit.num_clbits))
+
+    def run_batch(self, circuits, shots, seed=None):
+        circuits = list(circuits)
+        self._check_width(circuits)
+        result = self.simulator.run(circuits, shots=shots, **seed_options(seed)).result()
+        return [result.get_counts(index) for index in range(len(circuits))]
+
+    def run_bound(self, template, parameter_binds, shots, seed=None):
+        self._check_width([template])
+        num_experiments = len(next(iter(parameter_binds.values())))
+        result = self.simulator.run(
+            template, shots=shots, parameter_binds=[parameter_binds], **seed_options(seed)
+        ).result()
+        return [result.get_counts(index) for index in range(num_experiments)]
+
+    def _check_width(self, circuits):
+        # Fail before Aer tries to allocate a 4^n density matrix
+        widest = max(circuit.num_qubits for circuit in circuits)
+        if widest > NOISY_MAX_QUBITS:
+            raise ValueError(
+                f"Noisy runs support up to {NOISY_MAX_QUBITS} qubits ({widest} requested); "
+                "turn the noise off for wider circuits"
+            )
+
+
+def total_variation_distance(counts, probabilities):
+    """Distance between sampled ``counts`` and an ideal ``{outcome: probability}``.
+
+    ``0`` means the samples match the ideal distribution exactly and ``1``
+    that they never land on an outcome the ideal circuit produces.
+    """
+    shots = sum(counts.values())
+    outcomes = set(counts) | set(probabilities)
+    return 0.5 * sum(abs(counts.get(outcome, 0) / shots - probabilities.get(outcome, 0.0)) for outcome in outcomes)
@@ -0,0 +1,106 @@
+# ==========================================
+# Streamlit Performance Panel
+# ==========================================
+"""Per-rerun stage timings and cProfile capture for the apps.
+
+Each app calls :func:`begin_rerun` right after ``st.set_page_config`` and
+:func:`finish_rerun` as its last statement. The stage spans recorded in
+between are kept in ``st.session_state.perf_history``, one entry per
+rerun, so trends across reruns stay visible. The optional sidebar panel
+shows the latest breakdown and that history. It can also profile reruns
+and keep the profile of the slowest one.
+"""
+
+import streamlit as st
+
+from quantum_sim.lazy import lazy_import
+from quantum_sim.profiling import SpanRecorder
+
+pd = lazy_import('pandas')
+
+# Reruns kept in the timing history
+PERF_HISTORY_LENGTH = 50
+
+# Functions listed in the captured profile
+PROFILE_LINES = 30
+
+
+def begin_rerun():
+    """Start timing this rerun; profile it too when capture is switched on."""
+    # A rerun interrupted by a widget change never reached finish_rerun
+    stale = st.session_state.get('perf_recorder')
+    if stale is not None:
+        stale.stop()
+
+    recorder = SpanRecorder().start(profile=st.session_state.get('perf_capture', False))
+    st.session_state.perf_recorder = recorder
+    return recorder
+
+
+def finish_rerun(recorder):
+    """Record this rerun's timings, keep the slowest profile and draw the panel."""
+    recorder.stop()
+    st.session_state.perf_recorder = None
+
+    rerun = st.session_state.get('perf_reruns', 0) + 1
+    st.session_state.perf_reruns = rerun
+    history = st.session_state.setdefault('perf_history', [])
+    history.append({'rerun': rerun, 'total': recorder.total, **recorder.breakdown()})
+    del history[:-PERF_HISTORY_LENGTH]
+
+    slowest = st.session_state.get('perf_profile')
+    if recorder.profiler is not None and (slowest is None or recorder.total > slowest['total']):
+        st.session_state.perf_profile = {
+            'rerun': rerun,
+            'total': recorder.total,
+            'text': recorder.profile_text(PROFILE_LINES),
+            'data': recorder.profile_bytes()
+        }
+
+    with st.sidebar:
+        show_performance_panel()
+
+
+def show_performance_panel():
+    """Sidebar panel: latest stage breakdown, rerun trend and slowest profile."""
+    st.markdown("---")
+    st.markdown("#### ⏱️ Performance")
+    if not st.checkbox("Show per-rerun timings", key='perf_show'):
+        return
+
+    history = st.session_state.get('perf_history', [])
+    if history:
+        latest = history[-1]
+        stages = {name: seconds for name, seconds in latest.items() if name not in ('rerun', 'total')}
+        st.write(f"Last rerun: **{latest['total'] * 1000:.1f} ms**")
+        st.dataframe(
+            pd.DataFrame({
+                'Stage': list(stages),
+                'ms': [round(seconds * 1000, 2) for seconds in stages.values()],
+                'Share': [f"{seconds / latest['total']:.0%}" for seconds in stages.values()]
+            }),
+            hide_index=True,
+            use_container_width=True
+        )
+
+        # Stacked milliseconds per stage for every recorded rerun
+        trend = pd.DataFrame(history).set_index('rerun').drop(columns='total').fillna(0.0) * 1000
+        st.bar_chart(trend, height=200)
+
+    st.checkbox(
+        "Profile reruns (keeps the slowest)",
+        key='perf_capture',
+        help="Runs cProfile on each rerun from now on and keeps the slowest one"
+    )
+    profile = st.session_state.get('perf_profile')
+    if profile is not None:
+        with st.expander(f"🐢 Slowest profiled rerun: #{profile['rerun']} ({profile['total'] * 1000:.0f} ms)"):
+            st.code(profile['text'], language=None)
+            st.download_button(
+                "Download .prof",
+                profile['data'],
+                file_name=f"rerun_{profile['rerun']}.prof",
+                help="Open with snakeviz or python -m pstats"
+            )
+            if st.button("Clear profile"):
+                st.session_state.perf_profile = None
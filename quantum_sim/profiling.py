@@ -0,0 +1,95 @@
+# ==========================================
+# Stage Timing Spans
+# ==========================================
+"""Wall-clock spans for the stages of a simulation run.
+
+Library code wraps its stages in ``with span('simulate'):``. The spans
+cost nothing unless a :class:`SpanRecorder` is active in the current
+context, so the CLI and benchmarks run uninstrumented. The apps activate
+one recorder per rerun. Spans with the same name add up, and spans are
+meant to be flat: a span opened inside another span is counted twice.
+"""
+
+import contextlib
+import contextvars
+import cProfile
+import io
+import marshal
+import pstats
+import time
+
+_active_recorder = contextvars.ContextVar('quantum_sim_span_recorder', default=None)
+
+
+class SpanRecorder:
+    """Per-stage timings, and optionally a cProfile, for one unit of work."""
+
+    def __init__(self):
+        self.spans = {}
+        self.total = None
+        self.profiler = None
+        self._started = None
+        self._token = None
+
+    def start(self, profile=False):
+        self._started = time.perf_counter()
+        self._token = _active_recorder.set(self)
+        if profile:
+            self.profiler = cProfile.Profile()
+            self.profiler.enable()
+        return self
+
+    def stop(self):
+        """Stop timing; safe to call more than once."""
+        if self._token is None:
+            return self
+        if self.profiler is not None:
+            self.profiler.disable()
+        try:
+            _active_recorder.reset(self._token)
+        except ValueError:
+            # Stopped from another context (e.g. a rerun that died mid-way)
+            pass
+        self._token = None
+        self.total = time.perf_counter() - self._started
+        return self
+
+    def add(self, name, seconds):
+        self.spans[name] = self.spans.get(name, 0.0) + seconds
+
+    def breakdown(self):
+        """Span timings plus ``'other'`` for time outside any span, in seconds."""
+        total = self.total if self.total is not None else time.perf_counter() - self._started
+        rows = dict(self.spans)
+        rows['other'] = max(0.0, total - sum(self.spans.values()))
+        return rows
+
+    def profile_text(self, limit=25, sort='cumulative'):
+        """The ``limit`` heaviest functions of the captured profile as text."""
+        if self.profiler is None:
+            return ''
+        stream = io.StringIO()
+        pstats.Stats(self.profiler, stream=stream).strip_dirs().sort_stats(sort).print_stats(limit)
+        return stream.getvalue()
+
+    def profile_bytes(self):
+        """The captured profile in ``.prof`` format for snakeviz or pstats."""
+        if self.profiler is None:
+            return b''
+        # Same payload pstats.Stats.dump_stats writes to disk
+        return marshal.dumps(pstats.Stats(self.profiler).stats)
+
+
+@contextlib.contextmanager
+def span(name):
+    """Time the enclosed block under ``name`` on the active recorder, if any."""
+    recorder = _active_recorder.get()
+    if recorder is None:
+        yield
+        return
+
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        recorder.add(name, time.perf_counter() - started)
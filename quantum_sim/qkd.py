@@ -0,0 +1,263 @@
+# ==========================================
+# BB84 Quantum Key Distribution
+# ==========================================
+"""BB84 key distribution with an optional intercept-resend eavesdropper.
+
+Alice sends random bits in random Z or X bases and Bob measures each
+qubit in a random basis of his own. With probability ``eve_probability``
+Eve intercepts a qubit, measures it in a random basis and resends the
+state she saw. Every transmission, Alice's to Bob, Alice's to Eve or
+Eve's to Bob, is one of the eight prepare-and-measure circuits of
+:func:`build_bb84_circuit`, so a whole batch of qubits needs at most
+eight backend calls per stage: qubits are grouped by circuit and each
+circuit is sampled once with one shot per qubit.
+
+The classical post-processing runs on whole arrays. Sifting keeps the
+positions where the bases match. A random ``sample_fraction`` of the
+sifted key is disclosed to estimate the QBER. The rest is shortened to
+its secure length by privacy amplification: random GF(2) hashing applied
+block by block as one matrix product. Error correction is not simulated;
+the bits it would disclose are charged to the key as
+``ec_efficiency · h(QBER)``, as in the asymptotic Shor–Preskill rate
+``1 - h(Q) - f·h(Q)``. Nothing here imports Streamlit.
+"""
+
+import math
+import time
+
+from quantum_sim.backends import get_backend
+from quantum_sim.jobs import MIN_CHUNK_SHOTS, split_work
+from quantum_sim.lazy import lazy_import
+from quantum_sim.profiling import span
+from quantum_sim.resources import get_compiled_circuit
+
+np = lazy_import('numpy')
+qiskit = lazy_import('qiskit')
+
+# Qubits sent per run: default and the choices offered
+DEFAULT_QKD_QUBITS = 100_000
+QKD_QUBIT_OPTIONS = [10_000, 100_000, 1_000_000]
+
+# Eavesdropping probabilities of the key-rate sweep
+EVE_PROBABILITIES = [step / 10 for step in range(11)]
+
+# Share of the sifted key disclosed to estimate the QBER
+DEFAULT_SAMPLE_FRACTION = 0.1
+
+# Error-correction leakage relative to the Shannon limit h(QBER)
+EC_EFFICIENCY = 1.16
+
+# Sifted bits hashed together by one privacy-amplification matrix
+PA_BLOCK_BITS = 256
+
+
+def build_bb84_circuit(bit, prepare_basis, measure_basis):
+    """Prepare ``bit`` in a basis (0 = Z, 1 = X), then measure in another."""
+    qc = qiskit.QuantumCircuit(1, 1)
+    if bit:
+        qc.x(0)
+    if prepare_basis:
+        qc.h(0)
+    if measure_basis:
+        qc.h(0)
+    qc.measure(0, 0)
+    return qc
+
+
+def binary_entropy(probability):
+    """Shannon entropy ``h(p)`` in bits, with ``h(0) = h(1) = 0``."""
+    if probability <= 0 or probability >= 1:
+        return 0.0
+    return -probability * math.log2(probability) - (1 - probability) * math.log2(1 - probability)
+
+
+def secure_fraction(qber, ec_efficiency=EC_EFFICIENCY):
+    """Share of the sifted key left after error correction and privacy amplification."""
+    return max(0.0, 1 - (1 + ec_efficiency) * binary_entropy(qber))
+
+
+def expected_qber(eve_probability):
+    """Intercept-resend QBER: Eve guesses the wrong basis half the time, then Bob errs half the time."""
+    return eve_probability / 4
+
+
+def expected_key_rate(eve_probability, sample_fraction=DEFAULT_SAMPLE_FRACTION, ec_efficiency=EC_EFFICIENCY):
+    """Asymptotic secure key bits per sent qubit against intercept-resend."""
+    return 0.5 * (1 - sample_fraction) * secure_fraction(expected_qber(eve_probability), ec_efficiency)
+
+
+def measure_qubits(bits, prepare_bases, measure_bases, backend):
+    """Measure one prepared qubit per entry; return the outcomes and methods used.
+
+    Qubits are grouped by their (bit, preparation basis, measurement
+    basis) circuit and each of the (at most eight) circuits is sampled once.
+    """
+    codes = bits | prepare_bases << 1 | measure_bases << 2
+    outcomes = np.zeros(codes.size, dtype=np.uint8)
+    methods = set()
+
+    for code in range(8):
+        index = np.flatnonzero(codes == code)
+        if index.size == 0:
+            continue
+        bit, prepare_basis, measure_basis = code & 1, code >> 1 & 1, code >> 2
+        _, compiled = get_compiled_circuit(
+            ('bb84', bit, prepare_basis, measure_basis),
+            lambda: build_bb84_circuit(bit, prepare_basis, measure_basis)
+        )
+        with span('simulate'):
+            record = backend.sample(compiled, int(index.size))
+
+        # Shot k of this circuit is the outcome of the k-th qubit in the group
+        with span('counts'):
+            outcomes[index] = record.bits()[:, 0]
+        methods.add(backend.method_for(compiled))
+
+    return outcomes, methods
+
+
+def transmit(alice_bits, alice_bases, bob_bases, eve_mask, eve_bases, backend):
+    """Send Alice's qubits to Bob, through Eve where ``eve_mask`` is set.
+
+    Returns Bob's outcomes and the methods used. Eve measures each
+    intercepted qubit in her basis and resends her outcome in that basis.
+    """
+    sent_bits, sent_bases = alice_bits.copy(), alice_bases.copy()
+    methods = set()
+    intercepted = np.flatnonzero(eve_mask)
+    if intercepted.size:
+        eve_bits, eve_methods = measure_qubits(
+            alice_bits[intercepted], alice_bases[intercepted], eve_bases[intercepted], backend
+        )
+        sent_bits[intercepted], sent_bases[intercepted] = eve_bits, eve_bases[intercepted]
+        methods.update(eve_methods)
+
+    bob_bits, bob_methods = measure_qubits(sent_bits, sent_bases, bob_bases, backend)
+    return bob_bits, methods | bob_methods
+
+
+def privacy_amplification(key_bits, fraction, rng, block_bits=PA_BLOCK_BITS):
+    """Compress ``key_bits`` to ``fraction`` of their length with random GF(2) hashing.
+
+    Each block of ``block_bits`` is multiplied by one shared random binary
+    matrix. All blocks go through a single float matrix product, which is
+    exact for these sizes, reduced mod 2. A trailing partial block is dropped.
+    """
+    output_bits = int(block_bits * fraction)
+    blocks = key_bits.size // block_bits
+    if output_bits == 0 or blocks == 0:
+        return np.zeros(0, dtype=np.uint8)
+    matrix = rng.integers(0, 2, size=(block_bits, output_bits)).astype(np.float32)
+    hashed = key_bits[:blocks * block_bits].reshape(blocks, block_bits).astype(np.float32) @ matrix
+    return (hashed.astype(np.int64) & 1).astype(np.uint8).ravel()
+
+
+def distill_key(alice_bits, alice_bases, bob_bits, bob_bases, rng,
+                sample_fraction=DEFAULT_SAMPLE_FRACTION, ec_efficiency=EC_EFFICIENCY):
+    """Sift, estimate the QBER on a disclosed sample and amplify the rest.
+
+    Returns a dict of the key lengths at each stage, the estimated and the
+    actual QBER, and the final ``key`` as a bit array. Bob's key is taken
+    to equal Alice's after error correction, whose leakage is charged to
+    the secure fraction.
+    """
+    sifted = np.flatnonzero(alice_bases == bob_bases)
+    disclosed = rng.random(sifted.size) < sample_fraction
+    errors = alice_bits[sifted] != bob_bits[sifted]
+
+    qber_estimate = float(errors[disclosed].mean()) if disclosed.any() else 0.0
+    fraction = secure_fraction(qber_estimate, ec_efficiency)
+    key = privacy_amplification(alice_bits[sifted[~disclosed]], fraction, rng)
+    return {
+        'sifted_bits': int(sifted.size),
+        'disclosed_bits': int(np.count_nonzero(disclosed)),
+        'qber_estimate': qber_estimate,
+        'qber': float(errors.mean()) if sifted.size else 0.0,
+        'secure_fraction': fraction,
+        'key_bits': int(key.size),
+        'key': key
+    }
+
+
+def iter_bb84(num_qubits, eve_probability=0.0, backend='auto', rng=None,
+              sample_fraction=DEFAULT_SAMPLE_FRACTION):
+    """One BB84 run in chunks of qubits, yielding ``(fraction, results)``.
+
+    Partial results carry ``qubits`` sent so far. The last also holds
+    the :func:`distill_key` output, the ``key_rate`` in secure bits per
+    sent qubit, the wall-clock ``elapsed`` seconds and the ``methods``.
+    """
+    rng = np.random.default_rng() if rng is None else rng
+    if isinstance(backend, str):
+        backend = get_backend(backend)
+
+    start = time.perf_counter()
+    with span('build'):
+        alice_bits, alice_bases, bob_bases, eve_bases = (
+            rng.integers(0, 2, size=num_qubits, dtype=np.uint8) for _ in range(4)
+        )
+        eve_mask = rng.random(num_qubits) < eve_probability
+    bob_bits = np.zeros(num_qubits, dtype=np.uint8)
+    methods = set()
+    done = 0
+
+    for chunk in split_work(num_qubits, minimum=MIN_CHUNK_SHOTS):
+        rows = slice(done, done + chunk)
+        bob_bits[rows], chunk_methods = transmit(
+            alice_bits[rows], alice_bases[rows], bob_bases[rows], eve_mask[rows], eve_bases[rows], backend
+        )
+        methods.update(chunk_methods)
+        done += chunk
+        if done < num_qubits:
+            yield done / num_qubits, {'qubits': done, 'eve_probability': eve_probability}
+
+    with span('counts'):
+        key = distill_key(alice_bits, alice_bases, bob_bits, bob_bases, rng, sample_fraction)
+    yield 1.0, {
+        'qubits': num_qubits,
+        'eve_probability': eve_probability,
+        'intercepted': int(np.count_nonzero(eve_mask)),
+        'sample_fraction': sample_fraction,
+        **key,
+        'key_rate': key['key_bits'] / num_qubits,
+        'expected_qber': expected_qber(eve_probability),
+        'expected_key_rate': expected_key_rate(eve_probability, sample_fraction),
+        'elapsed': time.perf_counter() - start,
+        'methods': sorted(methods)
+    }
+
+
+def run_bb84(num_qubits, eve_probability=0.0, backend='auto', rng=None, sample_fraction=DEFAULT_SAMPLE_FRACTION):
+    """:func:`iter_bb84` run to completion."""
+    results = None
+    for _, results in iter_bb84(num_qubits, eve_probability, backend, rng, sample_fraction):
+        pass
+    return results
+
+
+def iter_key_rate_sweep(num_qubits, eve_probabilities=EVE_PROBABILITIES, backend='auto', rng=None,
+                        sample_fraction=DEFAULT_SAMPLE_FRACTION):
+    """Secure key rate against eavesdropping probability, one BB84 run per point.
+
+    Yields ``(fraction, sweep)`` after each point. ``sweep`` has the
+    ``eve_probabilities`` so far with the measured ``qber``,
+    ``qber_estimate`` and ``key_rate`` and their ``expected_`` values.
+    The final keys are not kept.
+    """
+    rng = np.random.default_rng() if rng is None else rng
+    if isinstance(backend, str):
+        backend = get_backend(backend)
+
+    columns = ('eve_probability', 'qber', 'qber_estimate', 'key_rate', 'expected_qber', 'expected_key_rate')
+    points = []
+    methods = set()
+    for eve_probability in eve_probabilities:
+        results = run_bb84(num_qubits, eve_probability, backend, rng, sample_fraction)
+        points.append(tuple(results[name] for name in columns))
+        methods.update(results['methods'])
+        yield len(points) / len(eve_probabilities), {
+            'qubits': num_qubits,
+            'eve_probabilities': [point[0] for point in points],
+            **{name: [point[index] for point in points] for index, name in enumerate(columns) if index},
+            'methods': sorted(methods)
+        }
@@ -0,0 +1,142 @@
+# ==========================================
+# Cached Figure Rendering
+# ==========================================
+"""Circuit diagrams and histograms rendered once and served as image bytes.
+
+Every widget interaction reruns the app and used to redraw the same
+figures through ``pyplot``, leaving each one open in pyplot's global
+registry. Here figures are built as standalone ``Figure`` objects, encoded
+to PNG/SVG, released straight away and the bytes are kept in a bounded
+LRU keyed on circuit structure or counts, so reruns reuse them and memory
+stays flat.
+"""
+
+import io
+
+from quantum_sim.lazy import lazy_import
+from quantum_sim.profiling import span
+from quantum_sim.resources import LRUCache, circuit_fingerprint
+
+matplotlib_figure = lazy_import('matplotlib.figure')
+np = lazy_import('numpy')
+plt = lazy_import('matplotlib.pyplot')
+qiskit_visualization = lazy_import('qiskit.visualization')
+
+# Rendered image bytes keyed on what was drawn
+render_cache = LRUCache(maxsize=64)
+
+# Same resolution st.pyplot uses
+RENDER_DPI = 200
+
+HISTOGRAM_COLORS = ('#ff6b6b', '#4ecdc4', '#45b7d1', '#96ceb4')
+
+# Heatmaps with more cells than this are drawn without value labels
+MAX_ANNOTATED_CELLS = 196
+
+
+def render_circuit(circuit, title, figsize=(10, 4), title_fontsize=14, fmt='png'):
+    """Return the circuit diagram of ``circuit`` as PNG or SVG bytes."""
+    def draw():
+        figure, ax = _new_figure(figsize)
+        circuit.draw('mpl', ax=ax)
+        ax.set_title(title, fontsize=title_fontsize, fontweight='bold')
+        return _encode(figure, fmt)
+
+    key = ('circuit', circuit_fingerprint(circuit), title, figsize, title_fontsize, fmt)
+    with span('render'):
+        return render_cache.get(key, draw)
+
+
+def render_histogram(counts, title, figsize=(8, 5), color=HISTOGRAM_COLORS, fmt='png'):
+    """Return a ``plot_histogram`` chart of ``counts`` as PNG or SVG bytes."""
+    def draw():
+        figure, ax = _new_figure(figsize)
+        open_figures = set(plt.get_fignums())
+        qiskit_visualization.plot_histogram(counts, ax=ax, color=list(color))
+        # plot_histogram calls plt.grid(), which opens a stray pyplot figure
+        for number in set(plt.get_fignums()) - open_figures:
+            plt.close(number)
+        ax.set_title(title, fontweight='bold')
+        ax.grid(True, alpha=0.3)
+        return _encode(figure, fmt)
+
+    key = ('histogram', tuple(sorted(counts.items())), title, figsize, tuple(color), fmt)
+    with span('render'):
+        return render_cache.get(key, draw)
+
+
+def render_heatmap(values, row_labels, col_labels, title, figsize=(6, 5), vmin=0.0, vmax=1.0,
+                   cmap='viridis', xlabel=None, ylabel=None, fmt='png'):
+    """Return a heatmap of a 2-D array as PNG or SVG bytes.
+
+    Small grids are annotated with their values; large ones only show a
+    thinned set of tick labels.
+    """
+    def draw():
+        figure, ax = _new_figure(figsize)
+        image = ax.imshow(values, cmap=cmap, vmin=vmin, vmax=vmax)
+        _set_ticks(ax.set_xticks, col_labels)
+        _set_ticks(ax.set_yticks, row_labels)
+        if values.size <= MAX_ANNOTATED_CELLS:
+            for (row, col), value in np.ndenumerate(values):
+                ax.text(col, row, f"{value:.2f}", ha='center', va='center', fontsize=8,
+                        color='white' if value < (vmin + vmax) / 2 else 'black')
+        figure.colorbar(image, ax=ax)
+        if xlabel:
+            ax.set_xlabel(xlabel)
+        if ylabel:
+            ax.set_ylabel(ylabel)
+        ax.set_title(title, fontweight='bold')
+        return _encode(figure, fmt)
+
+    values = np.asarray(values, dtype=float)
+    key = ('heatmap', values.shape, values.tobytes(), tuple(row_labels), tuple(col_labels),
+           title, figsize, vmin, vmax, cmap, xlabel, ylabel, fmt)
+    with span('render'):
+        return render_cache.get(key, draw)
+
+
+def render_lines(x, columns, title, figsize=(8, 4), xlabel=None, ylabel=None, fmt='png'):
+    """Return one line per entry of ``columns`` against ``x`` as PNG or SVG bytes."""
+    def draw():
+        figure, ax = _new_figure(figsize)
+        for name, values in columns.items():
+            ax.plot(x, values, label=name)
+        if len(columns) > 1:
+            ax.legend()
+        if xlabel:
+            ax.set_xlabel(xlabel)
+        if ylabel:
+            ax.set_ylabel(ylabel)
+        ax.set_title(title, fontweight='bold')
+        ax.grid(True, alpha=0.3)
+        return _encode(figure, fmt)
+
+    key = ('lines', np.asarray(x).tobytes(),
+           tuple((name, np.asarray(values, dtype=float).tobytes()) for name, values in columns.items()),
+           title, figsize, xlabel, ylabel, fmt)
+    with span('render'):
+        return render_cache.get(key, draw)
+
+
+def _set_ticks(set_ticks, labels, max_ticks=12):
+    step = max(1, -(-len(labels) // max_ticks))
+    positions = range(0, len(labels), step)
+    set_ticks(list(positions), labels=[labels[position] for position in positions])
+
+
+def _new_figure(figsize):
+    # A bare Figure is never registered with pyplot, so nothing keeps it alive
+    figure = matplotlib_figure.Figure(figsize=figsize)
+    return figure, figure.subplots()
+
+
+def _encode(figure, fmt):
+    buffer = io.BytesIO()
+    try:
+        figure.tight_layout()
+        figure.savefig(buffer, format=fmt, dpi=RENDER_DPI, bbox_inches='tight')
+    finally:
+        figure.clear()
+    data = buffer.getvalue()
+    return data.decode('utf-8') if fmt == 'svg' else data
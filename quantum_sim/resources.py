@@ -0,0 +1,224 @@
+# ==========================================
+# Shared Simulator and Compiled-Circuit Cache
+# ==========================================
+"""Process-wide simulator resources shared by the Streamlit apps.
+
+Streamlit re-executes the page script on every widget change but keeps
+imported modules alive, so the simulator and the circuit cache held here
+survive reruns and are shared by every session in the server process.
+"""
+
+import threading
+from collections import OrderedDict
+
+from quantum_sim.lazy import lazy_import
+from quantum_sim.profiling import span
+
+qiskit = lazy_import('qiskit')
+qiskit_aer = lazy_import('qiskit_aer')
+
+# Gates the stabilizer method simulates; circuits using only these are Clifford
+CLIFFORD_GATES = frozenset({
+    'id', 'x', 'y', 'z', 'h', 's', 'sdg', 'sx', 'sxdg',
+    'cx', 'cy', 'cz', 'swap', 'measure', 'barrier', 'reset'
+})
+
+# Widest non-Clifford circuit run as a dense state vector (2^24 amplitudes)
+STATEVECTOR_MAX_QUBITS = 24
+
+_simulator = None
+_target = None
+_simulator_lock = threading.Lock()
+
+
+def get_simulator():
+    """Return the process-wide ``AerSimulator``, building it on first use."""
+    global _simulator
+    with _simulator_lock:
+        if _simulator is None:
+            _simulator = qiskit_aer.AerSimulator()
+        return _simulator
+
+
+def get_target():
+    """Return the shared simulator's transpiler ``Target``.
+
+    ``AerSimulator.target`` builds a fresh ``Target`` on every access and
+    ``transpile(circuit, backend)`` reads it many times per call, so the
+    target is resolved once and passed to ``transpile`` directly.
+    """
+    global _target
+    simulator = get_simulator()
+    with _simulator_lock:
+        if _target is None:
+            _target = simulator.target
+        return _target
+
+
+def is_clifford(circuit):
+    """Whether every operation in ``circuit`` is in :data:`CLIFFORD_GATES`."""
+    return all(instruction.operation.name in CLIFFORD_GATES for instruction in circuit.data)
+
+
+def select_method(circuits):
+    """Aer simulation method for a circuit or a batch run as one job.
+
+    Clifford circuits use the stabilizer method, whose cost grows
+    polynomially with width. Anything else is a dense state vector up to
+    :data:`STATEVECTOR_MAX_QUBITS` and a matrix-product state beyond it.
+    """
+    if isinstance(circuits, qiskit.QuantumCircuit):
+        circuits = [circuits]
+    if all(is_clifford(circuit) for circuit in circuits):
+        return 'stabilizer'
+    if max(circuit.num_qubits for circuit in circuits) <= STATEVECTOR_MAX_QUBITS:
+        return 'statevector'
+    return 'matrix_product_state'
+
+
+def compile_circuits(circuits):
+    """Transpile ``circuits`` for the shared simulator, keeping Cliffords as built.
+
+    Aer runs Clifford gates natively, and the transpiler would fuse runs of
+    them into ``u`` gates that the stabilizer method cannot simulate, so
+    Clifford circuits are used as they are. The simulator's ``Target`` is
+    only as wide as a state vector fits in memory, so circuits wider than
+    it are transpiled to its gate names alone, with no qubit layout, and
+    left to the matrix-product-state method.
+    """
+    target = get_target()
+    compiled = list(circuits)
+    transpile_index = [index for index, circuit in enumerate(circuits) if not is_clifford(circuit)]
+    narrow = [index for index in transpile_index if circuits[index].num_qubits <= target.num_qubits]
+    wide = [index for index in transpile_index if circuits[index].num_qubits > target.num_qubits]
+
+    for indices, options in ((narrow, {'target': target}), (wide, {'basis_gates': list(target.operation_names)})):
+        if indices:
+            transpiled = qiskit.transpile([circuits[index] for index in indices], **options)
+            for index, circuit in zip(indices, transpiled):
+                compiled[index] = circuit
+    return compiled
+
+
+class LRUCache:
+    """Bounded LRU cache with hit/miss counters.
+
+    Values are built by a caller-supplied function on a miss; the least
+    recently used entry is evicted once ``maxsize`` is exceeded.
+    """
+
+    def __init__(self, maxsize=128):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, build):
+        """Return the cached value for ``key``, calling ``build()`` on a miss."""
+        found, value = self.lookup(key)
+        if found:
+            return value
+
+        # Build outside the lock so a slow transpile does not block readers
+        value = build()
+        self.put(key, value)
+        return value
+
+    def lookup(self, key):
+        """Return ``(found, value)`` for ``key``, counting a hit or a miss."""
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return True, self._entries[key]
+            self.misses += 1
+            return False, None
+
+    def put(self, key, value):
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def stats(self):
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'size': len(self._entries),
+                'maxsize': self.maxsize
+            }
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+
+# Large enough to hold a full Problem 3 configuration sweep
+circuit_cache = LRUCache(maxsize=512)
+
+
+def circuit_fingerprint(circuit):
+    """Hashable description of a circuit's structure.
+
+    Two circuits with the same register sizes, operations, parameters and
+    wiring produce the same fingerprint, so it can key caches of anything
+    derived from the circuit.
+    """
+    instructions = tuple(
+        (
+            instruction.operation.name,
+            tuple(str(param) for param in instruction.operation.params),
+            tuple(circuit.find_bit(qubit).index for qubit in instruction.qubits),
+            tuple(circuit.find_bit(clbit).index for clbit in instruction.clbits)
+        )
+        for instruction in circuit.data
+    )
+    return (circuit.num_qubits, circuit.num_clbits, instructions)
+
+
+def get_compiled_circuit(key, build):
+    """Return ``(circuit, compiled)`` for a circuit structure ``key``.
+
+    ``build()`` creates the logical circuit on a cache miss; it is then
+    compiled once by :func:`compile_circuits`. The logical circuit is kept
+    alongside so the apps can still draw exactly what the user configured.
+    """
+    def build_and_transpile():
+        with span('build'):
+            circuit = build()
+        with span('transpile'):
+            return circuit, compile_circuits([circuit])[0]
+
+    return circuit_cache.get(key, build_and_transpile)
+
+
+def get_compiled_circuits(keys, build):
+    """Batch :func:`get_compiled_circuit` for many circuit structures.
+
+    ``build(key)`` creates the logical circuit for a missing ``key``; all
+    misses are compiled together in a single ``transpile`` call.
+    """
+    entries = {}
+    missing = []
+    for key in keys:
+        found, entry = circuit_cache.lookup(key)
+        if found:
+            entries[key] = entry
+        elif key not in missing:
+            missing.append(key)
+
+    if missing:
+        with span('build'):
+            circuits = [build(key) for key in missing]
+        with span('transpile'):
+            compiled = compile_circuits(circuits)
+        for key, circuit, compiled_circuit in zip(missing, circuits, compiled):
+            entries[key] = (circuit, compiled_circuit)
+            circuit_cache.put(key, entries[key])
+
+    return [entries[key] for key in keys]
@@ -0,0 +1,273 @@
+# ==========================================
+# Persistent Result Store for Seeded Runs
+# ==========================================
+"""Seeded simulation and an on-disk cache of its results.
+
+A :class:`SeededBackend` wraps any backend and passes a seed to every
+run, so the same sequence of calls always draws the same shots. Call
+``k`` is seeded from ``SeedSequence([seed, k])``: the chunks of a job
+differ from one another, but a job replayed from a fresh wrapper
+repeats exactly.
+
+Because those results are reproducible, they are also cached in a
+:class:`ResultStore`, a SQLite file shared by every process and replica
+that points at it and kept across restarts. Entries are keyed on the
+circuit fingerprint, shots, seed, simulation method, noise setting and
+Aer version. Once the store grows past ``max_bytes`` the least recently
+used entries are evicted. Nothing here imports Streamlit.
+"""
+
+import contextlib
+import hashlib
+import itertools
+import json
+import os
+import sqlite3
+import threading
+import time
+
+from quantum_sim.lazy import lazy_import, package_version
+from quantum_sim.resources import circuit_fingerprint
+from quantum_sim.shots import ShotRecord
+
+np = lazy_import('numpy')
+
+# Bump to invalidate stored results when their encoding or meaning changes
+STORE_FORMAT = 1
+
+# Default location and size cap of the process-wide store
+DEFAULT_STORE_PATH = os.path.join(os.path.expanduser('~'), '.cache', 'quantum_sim', 'results.sqlite3')
+DEFAULT_STORE_MAX_BYTES = 256 * 2 ** 20
+
+# Environment variables overriding the defaults
+STORE_PATH_ENV = 'QUANTUM_SIM_RESULT_STORE'
+STORE_MAX_BYTES_ENV = 'QUANTUM_SIM_RESULT_STORE_MAX_BYTES'
+
+_store = None
+_store_lock = threading.Lock()
+
+
+class ResultStore:
+    """SQLite-backed LRU of shot records and counts, with hit/miss counters.
+
+    Values are built by a caller-supplied function on a miss, as in
+    :class:`~quantum_sim.resources.LRUCache`. A store that cannot be opened
+    or written (read-only disk, locked file) degrades to recomputing.
+    """
+
+    def __init__(self, path=DEFAULT_STORE_PATH, max_bytes=DEFAULT_STORE_MAX_BYTES):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+        self.available = True
+        self._lock = threading.Lock()
+        try:
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with self._connect() as connection:
+                connection.execute(
+                    'CREATE TABLE IF NOT EXISTS results ('
+                    'key TEXT PRIMARY KEY, kind TEXT, num_bits INTEGER, data BLOB, '
+                    'size INTEGER, used REAL)'
+                )
+                connection.execute('CREATE INDEX IF NOT EXISTS results_used ON results (used)')
+        except (OSError, sqlite3.Error):
+            self.available = False
+
+    def get(self, key, kind, build):
+        """Return the stored value for ``key``, calling ``build()`` on a miss.
+
+        ``kind`` is ``'record'`` for a :class:`ShotRecord` or ``'counts'``
+        for a list of counts dicts.
+        """
+        if not self.available:
+            return build()
+        digest = _digest(key)
+        try:
+            value = self._load(digest)
+        except sqlite3.Error:
+            value = None
+            self._count('errors')
+        if value is not None:
+            self._count('hits')
+            return value
+
+        self._count('misses')
+        value = build()
+        try:
+            self._save(digest, kind, value)
+        except sqlite3.Error:
+            self._count('errors')
+        return value
+
+    def stats(self):
+        entries = size = 0
+        if self.available:
+            try:
+                with self._connect() as connection:
+                    entries, size = connection.execute(
+                        'SELECT COUNT(*), COALESCE(SUM(size), 0) FROM results'
+                    ).fetchone()
+            except sqlite3.Error:
+                pass
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'errors': self.errors,
+                'entries': entries,
+                'bytes': size,
+                'max_bytes': self.max_bytes,
+                'available': self.available
+            }
+
+    def clear(self):
+        with self._lock:
+            self.hits = self.misses = self.errors = 0
+        if self.available:
+            try:
+                with self._connect() as connection:
+                    connection.execute('DELETE FROM results')
+            except sqlite3.Error:
+                self._count('errors')
+
+    @contextlib.contextmanager
+    def _connect(self):
+        # One short-lived connection per call keeps the store thread-safe
+        connection = sqlite3.connect(self.path, timeout=10)
+        try:
+            with connection:
+                yield connection
+        finally:
+            connection.close()
+
+    def _count(self, counter):
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def _load(self, digest):
+        with self._connect() as connection:
+            row = connection.execute('SELECT kind, num_bits, data FROM results WHERE key = ?', (digest,)).fetchone()
+            if row is None:
+                return None
+            connection.execute('UPDATE results SET used = ? WHERE key = ?', (time.time(), digest))
+        kind, num_bits, data = row
+        if kind == 'record':
+            packed = np.frombuffer(data, dtype=np.uint8).reshape(-1, max(1, -(-num_bits // 8)))
+            return ShotRecord(packed, num_bits)
+        return json.loads(data)
+
+    def _save(self, digest, kind, value):
+        if kind == 'record':
+            num_bits, data = value.num_bits, value.packed.tobytes()
+        else:
+            num_bits, data = 0, json.dumps(value).encode()
+        if len(data) > self.max_bytes:
+            return
+
+        with self._connect() as connection:
+            connection.execute(
+                'INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?, ?)',
+                (digest, kind, num_bits, data, len(data), time.time())
+            )
+            # Evict least recently used entries until the store fits
+            total = connection.execute('SELECT COALESCE(SUM(size), 0) FROM results').fetchone()[0]
+            if total > self.max_bytes:
+                evicted = 0
+                for key, size in connection.execute('SELECT key, size FROM results ORDER BY used').fetchall():
+                    if total - evicted <= self.max_bytes:
+                        break
+                    connection.execute('DELETE FROM results WHERE key = ?', (key,))
+                    evicted += size
+
+
+def get_result_store():
+    """Return the process-wide :class:`ResultStore`, opening it on first use.
+
+    Its path and size cap come from :data:`STORE_PATH_ENV` and
+    :data:`STORE_MAX_BYTES_ENV` when set.
+    """
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = ResultStore(
+                os.environ.get(STORE_PATH_ENV, DEFAULT_STORE_PATH),
+                int(os.environ.get(STORE_MAX_BYTES_ENV, DEFAULT_STORE_MAX_BYTES))
+            )
+        return _store
+
+
+class SeededBackend:
+    """Runs every call of ``backend`` with a derived seed, caching in ``store``.
+
+    Create one per job: the call counter starts at zero, so a replayed job
+    meets the same seeds, and the same stored results, as the first run.
+    """
+
+    def __init__(self, backend, seed, store=None):
+        self.backend = backend
+        self.seed = seed
+        self.store = store
+        self.name = backend.name
+        self._calls = itertools.count()
+
+    def supports(self, circuit, allow_parameters=False):
+        return self.backend.supports(circuit, allow_parameters)
+
+    def method_for(self, circuit):
+        return self.backend.method_for(circuit)
+
+    def run(self, circuit, shots, memory=False):
+        # Per-shot memory is not stored; coin games use sample() instead
+        return self.backend.run(circuit, shots, memory=memory, seed=self._next_seed())
+
+    def sample(self, circuit, shots):
+        seed = self._next_seed()
+        return self._cached(
+            ('sample', shots, seed), [circuit], 'record',
+            lambda: self.backend.sample(circuit, shots, seed=seed)
+        )
+
+    def run_batch(self, circuits, shots):
+        circuits = list(circuits)
+        seed = self._next_seed()
+        return self._cached(
+            ('batch', shots, seed), circuits, 'counts',
+            lambda: self.backend.run_batch(circuits, shots, seed=seed)
+        )
+
+    def run_bound(self, template, parameter_binds, shots):
+        seed = self._next_seed()
+        binds = tuple(
+            (str(parameter), tuple(float(value) for value in values))
+            for parameter, values in sorted(parameter_binds.items(), key=lambda item: str(item[0]))
+        )
+        return self._cached(
+            ('bound', shots, seed, binds), [template], 'counts',
+            lambda: self.backend.run_bound(template, parameter_binds, shots, seed=seed)
+        )
+
+    def _next_seed(self):
+        call = next(self._calls)
+        return int(np.random.SeedSequence([self.seed, call]).generate_state(1)[0])
+
+    def _cached(self, call_key, circuits, kind, build):
+        if self.store is None:
+            return build()
+        key = (
+            STORE_FORMAT,
+            package_version('qiskit-aer'),
+            getattr(self.backend, 'noise', None),
+            tuple(self.backend.method_for(circuit) for circuit in circuits),
+            tuple(circuit_fingerprint(circuit) for circuit in circuits),
+            call_key
+        )
+        return self.store.get(key, kind, build)
+
+
+def _digest(key):
+    return hashlib.sha256(repr(key).encode()).hexdigest()
+
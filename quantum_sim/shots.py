@@ -0,0 +1,111 @@
+# ==========================================
+# Packed Per-Shot Results
+# ==========================================
+"""Compact per-shot measurement records.
+
+A :class:`ShotRecord` keeps every shot of one circuit in order, with the
+classical register bit-packed little-endian into ``ceil(n / 8)`` bytes
+per shot: 10,000 shots of a two-qubit circuit take 10 kB, where a list
+of bitstrings takes over half a megabyte. Counts are derived on demand
+with ``bincount`` (or a row ``unique`` for wide registers), so the apps
+keep one record per result and rebuild ``get_counts()``-style dicts only
+for plotting. Nothing here imports Qiskit or Streamlit.
+"""
+
+from quantum_sim.lazy import lazy_import
+
+np = lazy_import('numpy')
+
+# Registers up to this width are counted with a dense ``bincount``
+BINCOUNT_MAX_BITS = 16
+
+# Widest register whose outcomes fit in one ``uint64`` per shot
+MAX_INTEGER_BITS = 64
+
+
+class ShotRecord:
+    """Per-shot outcomes of one circuit, packed into a ``(shots, bytes)`` array.
+
+    Bit ``k`` of a shot is classical bit ``k``, matching the rightmost
+    character of a ``get_counts()`` key.
+    """
+
+    __slots__ = ('packed', 'num_bits')
+
+    def __init__(self, packed, num_bits):
+        self.packed = packed
+        self.num_bits = num_bits
+
+    @classmethod
+    def empty(cls, num_bits):
+        return cls(np.zeros((0, _num_bytes(num_bits)), dtype=np.uint8), num_bits)
+
+    @classmethod
+    def from_integers(cls, outcomes, num_bits):
+        """Pack outcome integers (at most :data:`MAX_INTEGER_BITS` wide)."""
+        if num_bits > MAX_INTEGER_BITS:
+            raise ValueError(f"Integer outcomes are limited to {MAX_INTEGER_BITS} bits")
+        as_bytes = np.asarray(outcomes, dtype='<u8').reshape(-1, 1).view(np.uint8)
+        return cls(np.ascontiguousarray(as_bytes[:, :_num_bytes(num_bits)]), num_bits)
+
+    @classmethod
+    def from_memory(cls, memory, num_bits):
+        """Pack Aer's per-shot hex memory (``'0x5'``) of any width."""
+        num_bytes = _num_bytes(num_bits)
+        buffer = b''.join(int(shot, 16).to_bytes(num_bytes, 'little') for shot in memory)
+        return cls(np.frombuffer(buffer, dtype=np.uint8).reshape(len(memory), num_bytes), num_bits)
+
+    @classmethod
+    def concatenate(cls, records):
+        """Join records of the same register, keeping shot order."""
+        records = list(records)
+        return cls(np.concatenate([record.packed for record in records]), records[0].num_bits)
+
+    @property
+    def shots(self):
+        return len(self.packed)
+
+    def __len__(self):
+        return self.shots
+
+    @property
+    def nbytes(self):
+        return self.packed.nbytes
+
+    def bits(self):
+        """``(shots, num_bits)`` array of 0/1, classical bit ``k`` in column ``k``."""
+        return np.unpackbits(self.packed, axis=1, count=self.num_bits, bitorder='little')
+
+    def integers(self):
+        """Each shot's outcome as a ``uint64`` (registers up to 64 bits)."""
+        if self.num_bits > MAX_INTEGER_BITS:
+            raise ValueError(f"Integer outcomes are limited to {MAX_INTEGER_BITS} bits")
+        padded = np.zeros((self.shots, 8), dtype=np.uint8)
+        padded[:, :self.packed.shape[1]] = self.packed
+        return padded.view('<u8')[:, 0]
+
+    def count_array(self):
+        """Dense counts indexed by outcome, for registers up to :data:`BINCOUNT_MAX_BITS`."""
+        if self.num_bits > BINCOUNT_MAX_BITS:
+            raise ValueError(f"Dense counts are limited to {BINCOUNT_MAX_BITS} bits")
+        return np.bincount(self.integers().astype(np.intp), minlength=2 ** self.num_bits)
+
+    def counts(self):
+        """``get_counts()``-style ``{bitstring: count}`` of the observed outcomes."""
+        if self.num_bits <= BINCOUNT_MAX_BITS:
+            count_array = self.count_array()
+            return {
+                format(index, f'0{self.num_bits}b'): int(count_array[index])
+                for index in np.flatnonzero(count_array)
+            }
+
+        rows, row_counts = np.unique(self.packed, axis=0, return_counts=True)
+        bits = np.unpackbits(rows, axis=1, count=self.num_bits, bitorder='little')
+        return {
+            ''.join('1' if bit else '0' for bit in row[::-1]): int(count)
+            for row, count in zip(bits, row_counts)
+        }
+
+
+def _num_bytes(num_bits):
+    return max(1, -(-num_bits // 8))
@@ -0,0 +1,30 @@
+# ==========================================
+# Sampling Statistics
+# ==========================================
+"""Confidence intervals for win rates and other sampled proportions."""
+
+import math
+from statistics import NormalDist
+
+
+def z_score(confidence):
+    """Two-sided standard normal quantile for a confidence level in ``(0, 1)``."""
+    return NormalDist().inv_cdf(0.5 + confidence / 2)
+
+
+def wilson_interval(successes, trials, confidence=0.95):
+    """Wilson score interval ``(low, high)`` for a binomial proportion.
+
+    Unlike the normal approximation it stays inside ``[0, 1]`` and behaves
+    sensibly when the observed rate is 0 or 1, which the coin game hits
+    for deterministic strategies.
+    """
+    if trials == 0:
+        return 0.0, 1.0
+
+    z = z_score(confidence)
+    rate = successes / trials
+    denominator = 1 + z * z / trials
+    centre = (rate + z * z / (2 * trials)) / denominator
+    half_width = z * math.sqrt(rate * (1 - rate) / trials + z * z / (4 * trials * trials)) / denominator
+    return max(0.0, centre - half_width), min(1.0, centre + half_width)
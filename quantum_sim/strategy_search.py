@@ -0,0 +1,246 @@
+# ==========================================
+# Optimal Coin-Game Strategy Search
+# ==========================================
+"""Search the single-qubit gates for the player's best coin-game strategy.
+
+The player applies ``u(θ, φ, λ)`` before the referee's move and, when
+``second_move`` is set, another ``u`` after it. Only the state the first
+gate prepares from ``|0⟩`` matters, so it is searched over a ``(θ, φ)``
+grid of the Bloch sphere (``λ`` only adds a global phase). The whole grid
+is scored at once: the prepared states are stacked and multiplied by the
+three referee matrices in one ``einsum``, then weighted by the referee
+policy. The best second gate needs no grid: against a fixed first gate
+the win probability is ``⟨v|M|v⟩`` for ``M = Σ p_r |ψ_r⟩⟨ψ_r|``, so its
+maximum is the top eigenvalue of a stacked batch of 2×2 matrices and the
+gate rotates that eigenvector onto ``|0⟩``. The grid is then zoomed in
+around the best candidate a few times.
+
+The winner's exact win probability comes from the tournament's
+:func:`~quantum_sim.tournament.expected_payoff`, and sampled games on the
+chosen backend confirm it. Nothing here imports Streamlit.
+"""
+
+import math
+
+from quantum_sim.backends import gate_matrices
+from quantum_sim.coin_game import REFEREE_MOVES
+from quantum_sim.jobs import MIN_CHUNK_GAMES, split_work
+from quantum_sim.lazy import lazy_import
+from quantum_sim.profiling import span
+from quantum_sim.resources import get_compiled_circuit
+from quantum_sim.stats import wilson_interval
+from quantum_sim.tournament import REFEREE_TURN, expected_payoff, validate_policy
+
+np = lazy_import('numpy')
+qiskit = lazy_import('qiskit')
+
+# Grid points per angle for the first pass, and the choices offered
+DEFAULT_SEARCH_RESOLUTION = 61
+SEARCH_RESOLUTIONS = [31, 61, 121, 241]
+
+# Zoomed passes around the best candidate after the first grid
+SEARCH_REFINEMENTS = 3
+
+# Sampled games confirming the winner by default
+DEFAULT_CONFIRM_GAMES = 100_000
+
+# Win probabilities closer than this to the best count as ties
+SCORE_TOLERANCE = 1e-9
+
+
+def bloch_states(thetas, phis):
+    """States ``u(θ, φ, 0)|0⟩`` for every ``(θ, φ)`` pair of the two axes.
+
+    Returns the ``(n, 2)`` stacked states and the ``θ`` and ``φ`` of each row.
+    """
+    theta, phi = (grid.ravel() for grid in np.meshgrid(thetas, phis, indexing='ij'))
+    states = np.stack([np.cos(theta / 2), np.exp(1j * phi) * np.sin(theta / 2)], axis=1)
+    return states, theta, phi
+
+
+def score_states(states, weights, second_move=False):
+    """Win probabilities of stacked first-move states against a referee policy.
+
+    Returns ``(score, per_move, finish)``: the policy-weighted win
+    probability of each state, its win probability against each referee
+    move as an ``(n, 3)`` array, and for ``second_move`` the state each
+    best second gate rotates onto ``|0⟩`` (``None`` otherwise).
+    """
+    move_probabilities = np.asarray(weights, dtype=float) / sum(weights)
+    referee = np.stack([gate_matrices()[move if move != 'i' else 'id'] for move in REFEREE_MOVES])
+    after = np.einsum('rij,nj->nri', referee, states)
+
+    if not second_move:
+        per_move = np.abs(after[:, :, 0]) ** 2
+        return per_move @ move_probabilities, per_move, None
+
+    mixture = np.einsum('r,nri,nrj->nij', move_probabilities, after, after.conj())
+    eigenvalues, eigenvectors = np.linalg.eigh(mixture)
+    finish = eigenvectors[:, :, -1]
+    per_move = np.abs(np.einsum('ni,nri->nr', finish.conj(), after)) ** 2
+    return eigenvalues[:, -1], per_move, finish
+
+
+def u_angles(matrix):
+    """``(θ, φ, λ)`` with ``u(θ, φ, λ)`` equal to ``matrix`` up to a global phase."""
+    theta = 2 * math.atan2(abs(matrix[1, 0]), abs(matrix[0, 0]))
+    if abs(matrix[0, 0]) <= SCORE_TOLERANCE:
+        # θ = π: only φ + λ is defined, so put it all in λ
+        phi, lam = 0.0, np.angle(-matrix[0, 1]) - np.angle(matrix[1, 0])
+    elif abs(matrix[1, 0]) <= SCORE_TOLERANCE:
+        # θ = 0: likewise
+        phi, lam = 0.0, np.angle(matrix[1, 1]) - np.angle(matrix[0, 0])
+    else:
+        phase = np.angle(matrix[0, 0])
+        phi, lam = np.angle(matrix[1, 0]) - phase, np.angle(-matrix[0, 1]) - phase
+    return tuple(float(_wrap(angle)) for angle in (theta, phi, lam))
+
+
+def search_strategy(weights, second_move=False, resolution=DEFAULT_SEARCH_RESOLUTION,
+                    refinements=SEARCH_REFINEMENTS):
+    """Best strategy against referee ``weights`` (I:X:H), from a zoomed grid search.
+
+    Returns a dict with the strategy ``steps`` (tournament format), its
+    exact ``win_probability`` overall and per referee move, the number of
+    ``candidates`` scored and whether a ``second_move`` was allowed.
+    """
+    validate_policy(weights)
+    theta_range, phi_range = (0.0, math.pi), (0.0, 2 * math.pi)
+    candidates = 0
+    best = None
+
+    for _ in range(refinements + 1):
+        thetas = np.linspace(*theta_range, resolution)
+        phis = np.linspace(*phi_range, resolution)
+        states, theta, phi = bloch_states(thetas, phis)
+        score, _, finish = score_states(states, weights, second_move)
+        candidates += score.size
+
+        # Prefer the simplest gate among ties: the first in grid order
+        index = int(np.flatnonzero(score >= score.max() - SCORE_TOLERANCE)[0])
+        if best is None or score[index] > best[0] + SCORE_TOLERANCE:
+            best = (float(score[index]), float(theta[index]), float(phi[index]),
+                    None if finish is None else finish[index])
+
+        # Zoom in to a few grid steps either side of the best so far
+        theta_step = (theta_range[1] - theta_range[0]) / (resolution - 1)
+        phi_step = (phi_range[1] - phi_range[0]) / (resolution - 1)
+        theta_range = (max(0.0, best[1] - 2 * theta_step), min(math.pi, best[1] + 2 * theta_step))
+        phi_range = (best[2] - 2 * phi_step, best[2] + 2 * phi_step)
+
+    _, theta, phi, finish = best
+    steps = (('u', _round(theta), _round(_wrap(phi)), 0.0), REFEREE_TURN)
+    if second_move:
+        # First row maps the best final state onto |0⟩; the second completes a unitary
+        gate = np.array([finish.conj(), [-finish[1], finish[0]]], dtype=complex)
+        steps += (('u',) + tuple(_round(angle) for angle in u_angles(gate)),)
+
+    return {
+        'steps': steps,
+        'weights': tuple(weights),
+        'second_move': second_move,
+        'candidates': candidates,
+        'win_probability': expected_payoff(steps, weights),
+        'move_probabilities': {
+            referee_move: expected_payoff(steps, tuple(float(code == index) for code in range(len(REFEREE_MOVES))))
+            for index, referee_move in enumerate(REFEREE_MOVES)
+        }
+    }
+
+
+def build_strategy_circuit(steps, referee_move):
+    """Coin circuit for tournament-format ``steps`` with one referee turn."""
+    if steps.count(REFEREE_TURN) != 1:
+        raise ValueError("Only strategies with a single referee turn can be sampled")
+    qc = qiskit.QuantumCircuit(1, 1)
+    for step in steps:
+        if step == REFEREE_TURN:
+            if referee_move != 'i':
+                getattr(qc, referee_move)(0)
+        elif isinstance(step, tuple):
+            getattr(qc, step[0])(*step[1:], 0)
+        else:
+            getattr(qc, step)(0)
+    qc.measure(0, 0)
+    return qc
+
+
+def play_strategy_games(steps, weights, num_games, backend, rng=None):
+    """Play ``num_games`` games of ``steps`` against a referee drawing from ``weights``.
+
+    As in :func:`~quantum_sim.coin_game.play_coin_games`, each distinct
+    circuit runs once with one shot per game. Returns the per-move
+    ``(games, wins)`` arrays and the simulation methods used.
+    """
+    rng = np.random.default_rng() if rng is None else rng
+    move_probabilities = np.asarray(weights, dtype=float) / sum(weights)
+    games = rng.multinomial(num_games, move_probabilities)
+    wins = np.zeros(len(REFEREE_MOVES), dtype=np.int64)
+    methods = set()
+
+    for code, referee_move in enumerate(REFEREE_MOVES):
+        if games[code] == 0:
+            continue
+        _, compiled = get_compiled_circuit(
+            ('strategy', steps, referee_move),
+            lambda referee_move=referee_move: build_strategy_circuit(steps, referee_move)
+        )
+        with span('simulate'):
+            record = backend.sample(compiled, int(games[code]))
+        with span('counts'):
+            wins[code] = games[code] - np.count_nonzero(record.bits()[:, 0])
+        methods.add(backend.method_for(compiled))
+
+    return games, wins, methods
+
+
+def iter_strategy_search(weights, second_move, resolution, confirm_games, backend, rng=None,
+                         confidence=0.95):
+    """:func:`search_strategy`, then sampled confirmation, as ``(fraction, results)`` steps.
+
+    ``results`` is the search result plus the sampled ``games`` and
+    ``wins`` (overall and per referee move), the observed ``win_rate``
+    with its Wilson interval, and the simulation ``methods``.
+    """
+    rng = np.random.default_rng() if rng is None else rng
+    with span('simulate'):
+        search = search_strategy(weights, second_move, resolution)
+
+    move_games = np.zeros(len(REFEREE_MOVES), dtype=np.int64)
+    move_wins = np.zeros_like(move_games)
+    methods = set()
+
+    def results():
+        games, wins = int(move_games.sum()), int(move_wins.sum())
+        ci_low, ci_high = wilson_interval(wins, games, confidence) if games else (0.0, 1.0)
+        return {
+            **search,
+            'games': games,
+            'wins': wins,
+            'move_games': move_games.tolist(),
+            'move_wins': move_wins.tolist(),
+            'win_rate': wins / games if games else float('nan'),
+            'ci_low': ci_low,
+            'ci_high': ci_high,
+            'confidence': confidence,
+            'methods': sorted(methods)
+        }
+
+    yield 0.1, results()
+    done = 0
+    for chunk in split_work(confirm_games, minimum=MIN_CHUNK_GAMES):
+        games, wins, chunk_methods = play_strategy_games(search['steps'], weights, chunk, backend, rng)
+        move_games += games
+        move_wins += wins
+        methods.update(chunk_methods)
+        done += chunk
+        yield 0.1 + 0.9 * done / confirm_games, results()
+
+
+def _wrap(angle):
+    # Angles in (-π, π], so printed strategies stay short
+    return math.remainder(angle, 2 * math.pi)
+
+
+def _round(angle):
+    return round(float(angle), 6)
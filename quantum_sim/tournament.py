@@ -0,0 +1,338 @@
+# ==========================================
+# Coin-Game Strategy Tournament
+# ==========================================
+"""Payoff matrix of player strategies against referee policies.
+
+A player strategy is a sequence of steps: single-qubit gates the player
+applies and :data:`REFEREE_TURN` markers where the referee moves. The
+classic game is ``('h', 'R')``; Meyer's penny flip is ``('h', 'R', 'h')``.
+A gate is a name such as ``'h'`` or ``'sdg'``, or ``(name, *angles)`` for
+``rx``/``ry``/``rz``/``p`` and the general ``u(θ, φ, λ)``. A referee
+policy is a weight for each of I, X and H, drawn independently per turn.
+
+The win probability of a strategy depends only on the referee moves it
+meets, so each strategy is evolved once for every referee move sequence
+as one stacked NumPy product. Each matchup then draws its games from
+those probabilities with its own RNG stream, spawned from one
+``SeedSequence`` in matrix order, so the payoff matrix depends on the
+seed alone and not on the number of workers. The cost of a matchup
+grows with its referee sequences, not with the number of games, so small
+tournaments run in-process; only ones with enough sequences to repay
+spawning workers fan their strategies out over a process pool. Nothing
+here imports Streamlit or Qiskit.
+"""
+
+import itertools
+import math
+import multiprocessing
+import os
+import re
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from quantum_sim.backends import gate_matrices
+from quantum_sim.coin_game import REFEREE_MOVES
+from quantum_sim.lazy import lazy_import
+from quantum_sim.profiling import span
+
+np = lazy_import('numpy')
+
+# Marks the referee's move in a strategy's steps
+REFEREE_TURN = 'R'
+
+# 3^turns referee sequences are evolved per strategy, so cap the turns
+MAX_REFEREE_TURNS = 10
+
+# Named single-qubit gates a strategy may use, beyond ``gate_matrices()``
+EXTRA_GATES = ('sdg', 'tdg')
+
+# Gates taking angles, and how many
+ANGLE_GATES = {'rx': 1, 'ry': 1, 'rz': 1, 'p': 1, 'u': 3}
+
+PLAYER_STRATEGY_PRESETS = {
+    'classical': (REFEREE_TURN,),
+    'quantum': ('h', REFEREE_TURN),
+    'flip': ('x', REFEREE_TURN),
+    'tilted': (('ry', math.pi / 4), REFEREE_TURN),
+    'meyer': ('h', REFEREE_TURN, 'h'),
+    'two-round': ('h', REFEREE_TURN, 'h', REFEREE_TURN)
+}
+
+# Relative weights of the referee's I, X and H moves
+REFEREE_POLICIES = {
+    'uniform': (1, 1, 1),
+    'no-hadamard': (1, 1, 0),
+    'flip-heavy': (1, 4, 1),
+    'hadamard-heavy': (1, 1, 4),
+    'passive': (1, 0, 0)
+}
+
+# Spawned workers import only this package and NumPy; forking a threaded
+# Streamlit server is not safe
+POOL_START_METHOD = 'spawn'
+
+# Referee sequences × policies (about 1 µs each in-process) a tournament
+# needs before a process pool, which takes about 0.5 s to spawn, pays off
+PARALLEL_MIN_WORK = 1_000_000
+
+_GATE_PATTERN = re.compile(r'^([a-z]+)(?:\(([^()]*)\))?$')
+
+
+def parse_strategy(text):
+    """Parse steps such as ``'h R u(1.57,0,3.14)'`` into a strategy tuple.
+
+    Steps are separated by whitespace and ``R`` is the referee's turn.
+    A preset name from :data:`PLAYER_STRATEGY_PRESETS` is also accepted.
+    """
+    text = text.strip()
+    if text in PLAYER_STRATEGY_PRESETS:
+        return PLAYER_STRATEGY_PRESETS[text]
+
+    steps = []
+    for token in text.split():
+        if token == REFEREE_TURN:
+            steps.append(REFEREE_TURN)
+            continue
+        match = _GATE_PATTERN.match(token.lower())
+        if match is None:
+            raise ValueError(f"Cannot parse strategy step {token!r}")
+        name, angles = match.groups()
+        if angles is None:
+            steps.append(name)
+        else:
+            try:
+                steps.append((name,) + tuple(float(angle) for angle in angles.split(',')))
+            except ValueError:
+                raise ValueError(f"Angles of {token!r} must be numbers") from None
+
+    steps = tuple(steps)
+    validate_strategy(steps)
+    return steps
+
+
+def format_strategy(steps):
+    """Inverse of :func:`parse_strategy`."""
+    tokens = []
+    for step in steps:
+        if isinstance(step, tuple):
+            tokens.append(f"{step[0]}({','.join(f'{angle:g}' for angle in step[1:])})")
+        else:
+            tokens.append(step)
+    return ' '.join(tokens)
+
+
+def validate_strategy(steps):
+    """Raise ``ValueError`` unless ``steps`` is a playable strategy."""
+    turns = steps.count(REFEREE_TURN)
+    if turns == 0:
+        raise ValueError("A strategy needs at least one referee turn (R)")
+    if turns > MAX_REFEREE_TURNS:
+        raise ValueError(f"A strategy may give the referee at most {MAX_REFEREE_TURNS} turns")
+    for step in steps:
+        if step != REFEREE_TURN:
+            gate_matrix(step)
+
+
+def parse_policy(text):
+    """Parse ``'1:1:2'`` (I:X:H weights) or a preset name into weights."""
+    text = text.strip()
+    if text in REFEREE_POLICIES:
+        return REFEREE_POLICIES[text]
+
+    try:
+        weights = tuple(float(weight) for weight in text.split(':'))
+    except ValueError:
+        raise ValueError(f"Cannot parse referee policy {text!r}; expected I:X:H weights") from None
+    validate_policy(weights)
+    return weights
+
+
+def validate_policy(weights):
+    """Raise ``ValueError`` unless ``weights`` is a valid I/X/H weighting."""
+    if len(weights) != len(REFEREE_MOVES):
+        raise ValueError(f"A referee policy needs {len(REFEREE_MOVES)} weights (I:X:H)")
+    if min(weights) < 0 or sum(weights) <= 0:
+        raise ValueError("Referee policy weights must be non-negative and not all zero")
+
+
+def gate_matrix(gate):
+    """2×2 unitary of a named gate or a ``(name, *angles)`` tuple.
+
+    Rotations are expressed through ``u`` and so may differ from Qiskit's
+    by a global phase, which no measurement can see.
+    """
+    if isinstance(gate, tuple):
+        name, angles = gate[0], gate[1:]
+        if ANGLE_GATES.get(name) != len(angles):
+            raise ValueError(f"Unknown gate {name!r} with {len(angles)} angle(s)")
+        if name == 'rx':
+            return _u_matrix(angles[0], -math.pi / 2, math.pi / 2)
+        if name == 'ry':
+            return _u_matrix(angles[0], 0.0, 0.0)
+        if name in ('rz', 'p'):
+            return _u_matrix(0.0, 0.0, angles[0])
+        return _u_matrix(*angles)
+
+    if gate == 'sdg':
+        return gate_matrices()['s'].conj().T
+    if gate == 'tdg':
+        return gate_matrices()['t'].conj().T
+    if gate == 'cx' or gate not in gate_matrices():
+        raise ValueError(f"Unknown single-qubit gate {gate!r}")
+    return gate_matrices()[gate]
+
+
+def referee_sequences(turns):
+    """Every referee move-code sequence for ``turns`` turns, one per row."""
+    return np.array(list(itertools.product(range(len(REFEREE_MOVES)), repeat=turns)), dtype=np.uint8).reshape(-1, turns)
+
+
+def sequence_win_probabilities(steps):
+    """Probability of Heads after ``steps`` for every referee sequence.
+
+    Row ``k`` of :func:`referee_sequences` gives the moves met in game
+    ``k``; all sequences are evolved together as a stack of states.
+    """
+    sequences = referee_sequences(steps.count(REFEREE_TURN))
+    referee_matrices = np.stack([gate_matrices()[move if move != 'i' else 'id'] for move in REFEREE_MOVES])
+
+    states = np.zeros((len(sequences), 2), dtype=complex)
+    states[:, 0] = 1
+    turn = 0
+    for step in steps:
+        if step == REFEREE_TURN:
+            states = np.einsum('sij,sj->si', referee_matrices[sequences[:, turn]], states)
+            turn += 1
+        else:
+            states = states @ gate_matrix(step).T
+    return np.abs(states[:, 0]) ** 2
+
+
+def sequence_probabilities(weights, sequences):
+    """Probability of each referee sequence under a policy's weights."""
+    move_probabilities = np.asarray(weights, dtype=float) / sum(weights)
+    return np.prod(move_probabilities[sequences], axis=1)
+
+
+def expected_payoff(steps, weights):
+    """Exact win probability of a strategy against a referee policy."""
+    sequences = referee_sequences(steps.count(REFEREE_TURN))
+    return float(sequence_probabilities(weights, sequences) @ sequence_win_probabilities(steps))
+
+
+def tournament_work(strategies, policies):
+    """Referee sequences evolved and drawn across every matchup."""
+    return sum(len(REFEREE_MOVES) ** steps.count(REFEREE_TURN) for steps in strategies) * len(policies)
+
+
+def default_workers(strategies, policies):
+    """Worker processes for a tournament when none are requested.
+
+    One (in-process) unless :func:`tournament_work` reaches
+    :data:`PARALLEL_MIN_WORK`, then every core.
+    """
+    if tournament_work(strategies, policies) < PARALLEL_MIN_WORK:
+        return 1
+    return os.cpu_count() or 1
+
+
+def play_strategy_row(steps, policies, num_games, seeds):
+    """Play one strategy against every policy; runs inside a pool worker.
+
+    Each matchup draws how many games meet each referee sequence, then how
+    many of those are won, from its own seed. Returns ``(wins, expected)``
+    lists aligned with ``policies``.
+    """
+    sequences = referee_sequences(steps.count(REFEREE_TURN))
+    win_probabilities = sequence_win_probabilities(steps)
+
+    wins, expected = [], []
+    for weights, seed in zip(policies, seeds):
+        rng = np.random.default_rng(seed)
+        probabilities = sequence_probabilities(weights, sequences)
+        games_per_sequence = rng.multinomial(num_games, probabilities / probabilities.sum())
+        wins.append(int(rng.binomial(games_per_sequence, win_probabilities).sum()))
+        expected.append(float(probabilities @ win_probabilities))
+    return wins, expected
+
+
+def iter_tournament(strategies, policies, num_games, workers=None, seed=None):
+    """Play every strategy against every policy, yielding ``(fraction, results)``.
+
+    ``strategies`` and ``policies`` map display names to steps and weights.
+    ``workers`` processes share the strategy rows (default: see
+    :func:`default_workers`); with one worker the rows run in this process. ``results`` holds the
+    ``wins``, ``win_rate`` and ``expected`` matrices, with NaN rates for
+    rows still running, and the ``seed`` entropy that reproduces them.
+    """
+    names, steps_list = list(strategies), list(strategies.values())
+    policy_names, weights_list = list(policies), list(policies.values())
+    for steps in steps_list:
+        validate_strategy(steps)
+    for weights in weights_list:
+        validate_policy(weights)
+
+    root = np.random.SeedSequence(seed)
+    matchup_seeds = root.spawn(len(names) * len(policy_names))
+    row_seeds = [
+        matchup_seeds[row * len(policy_names):(row + 1) * len(policy_names)]
+        for row in range(len(names))
+    ]
+
+    wins = np.zeros((len(names), len(policy_names)), dtype=np.int64)
+    expected = np.full(wins.shape, np.nan)
+    done = 0
+
+    def results():
+        win_rate = np.where(np.isnan(expected), np.nan, wins / num_games)
+        return {
+            'strategies': names,
+            'policies': policy_names,
+            'games': num_games,
+            'wins': wins.copy(),
+            'win_rate': win_rate,
+            'expected': expected.copy(),
+            'seed': root.entropy
+        }
+
+    workers = min(workers or default_workers(steps_list, weights_list), len(names))
+    if workers <= 1:
+        for row, (steps, seeds) in enumerate(zip(steps_list, row_seeds)):
+            with span('simulate'):
+                wins[row], expected[row] = play_strategy_row(steps, weights_list, num_games, seeds)
+            done += 1
+            yield done / len(names), results()
+        return
+
+    executor = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context(POOL_START_METHOD))
+    try:
+        pending = {
+            executor.submit(play_strategy_row, steps, weights_list, num_games, seeds): row
+            for row, (steps, seeds) in enumerate(zip(steps_list, row_seeds))
+        }
+        while pending:
+            with span('simulate'):
+                finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in finished:
+                row = pending.pop(future)
+                wins[row], expected[row] = future.result()
+                done += 1
+            yield done / len(names), results()
+    finally:
+        # A cancelled job closes this generator: drop rows not yet started
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+def run_tournament(strategies, policies, num_games, workers=None, seed=None):
+    """:func:`iter_tournament` run to completion."""
+    results = None
+    for _, results in iter_tournament(strategies, policies, num_games, workers, seed):
+        pass
+    return results
+
+
+def _u_matrix(theta, phi, lam):
+    cos, sin = math.cos(theta / 2), math.sin(theta / 2)
+    return np.array([
+        [cos, -np.exp(1j * lam) * sin],
+        [np.exp(1j * phi) * sin, np.exp(1j * (phi + lam)) * cos]
+    ], dtype=complex)
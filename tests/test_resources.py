@@ -0,0 +1,32 @@
+"""Compilation and method selection for circuits wider than the simulator target."""
+
+import qiskit
+
+from quantum_sim.backends import get_backend
+from quantum_sim.multipair import run_graph_correlations, topology_edges
+from quantum_sim.resources import compile_circuits, get_target, select_method
+
+
+def test_wide_non_clifford_circuit_runs_on_matrix_product_state():
+    num_qubits = max(30, get_target().num_qubits + 2)
+    qc = qiskit.QuantumCircuit(num_qubits, num_qubits)
+    qc.h(0)
+    for qubit in range(num_qubits - 1):
+        qc.cx(qubit, qubit + 1)
+    qc.t(0)
+    qc.measure(range(num_qubits), range(num_qubits))
+
+    (compiled,) = compile_circuits([qc])
+    assert compiled.num_qubits == num_qubits
+    assert select_method(compiled) == 'matrix_product_state'
+
+    counts = get_backend('aer').run(compiled, 200, seed=7).get_counts()
+    assert set(counts) <= {'0' * num_qubits, '1' * num_qubits}
+    assert sum(counts.values()) == 200
+
+
+def test_wide_graph_mode_with_t_rotation():
+    num_qubits = 30
+    results = run_graph_correlations(num_qubits, topology_edges('ghz', num_qubits), 200, rotation='t', backend='auto')
+    assert results['method'] == 'matrix_product_state'
+    assert results['correlation'].shape == (num_qubits, num_qubits)